@@ -0,0 +1,18 @@
+"""
+Pytest fixtures for test_crewai_docker.py - environment and Ollama client, set up once per session
+"""
+import os
+import pytest
+from dotenv import load_dotenv
+
+@pytest.fixture(scope="session")
+def ollama_url():
+    """Ollama server URL, after loading .env"""
+    load_dotenv()
+    return os.getenv('OLLAMA_BASE_URL', 'http://ollama:11434')
+
+@pytest.fixture(scope="session")
+def ollama_client(ollama_url):
+    """Ollama client shared by every test in the session"""
+    import ollama
+    return ollama.Client(host=ollama_url)
@@ -4,13 +4,470 @@ Interactive Demo for Crypto Compliance Analysis
 AI-powered compliance analysis with direct tool commands and natural language interface
 """
 
+import os
+import re
 import sys
+import shlex
 import json
 import time
 from pathlib import Path
 import subprocess
-from typing import Dict, Any, Optional
+import threading
+import requests
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from spinner import ThinkingContext
+from llm_cache import LLMCache, DiskCache, SemanticCache, make_key
+
+OLLAMA_MODEL = "llama3.1:8b"
+EMBEDDING_MODEL = "nomic-embed-text"
+# Ollama's port is published to the host by docker-compose.real.yml
+OLLAMA_HOST_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+# Deterministic sampling so a cached answer is the answer Ollama would give
+LLM_TEMPERATURE = 0
+# Keep models resident between questions; a request without keep_alive would
+# reset the server's pin back to its default expiry
+OLLAMA_KEEP_ALIVE = -1
+
+# Caches persist in .demo_cache/ so a restart doesn't recompute the same answers
+CACHE_DIR = Path(__file__).parent / ".demo_cache"
+
+def open_cache(table: str, maxsize: int, ttl: float):
+    """Disk-backed cache in CACHE_DIR, or an in-memory one if that fails"""
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        return DiskCache(CACHE_DIR / "cache.db", table, maxsize=maxsize, ttl=ttl)
+    except Exception as e:
+        print(f"Warning: Could not open disk cache, caching in memory only: {e}")
+        return LLMCache(maxsize=maxsize, ttl=ttl)
+
+_llm_cache = open_cache("llm_responses", maxsize=512, ttl=3600)
+
+def load_prices() -> Dict[str, float]:
+    """USD prices for portfolio valuation: PORTFOLIO_PRICES (JSON) or prices.json"""
+    raw = os.getenv("PORTFOLIO_PRICES")
+    try:
+        if raw:
+            return {asset: float(price) for asset, price in json.loads(raw).items()}
+        with open(Path(__file__).parent / "prices.json", encoding="utf-8") as f:
+            return {asset: float(price) for asset, price in json.load(f).items()}
+    except Exception as e:
+        print(f"Warning: Could not load portfolio prices, using defaults: {e}")
+        return {"BTC": 45000.0, "ETH": 2800.0, "USD": 1.0}
+
+# Loaded once per session and sent along with each /portfolio request
+PRICES = load_prices()
+
+# Tool output changes rarely; the TTL bounds how stale it gets, per tool family
+TOOL_CACHE_TTL = 60
+TOOL_CACHE_TTLS = {
+    "ledger_balance": 30,
+    "list_open_claims": 300,
+    "claims_by_customer": 300,
+    "get_claim_details": 300,
+    "claims_reconciliation_summary": 300,
+    "portfolio_summary": 3600,
+}
+# /verdict caches its whole batch of results as one entry
+VERDICT_CACHE_TTL = 3600
+_tool_cache = open_cache("tool_results", maxsize=256, ttl=TOOL_CACHE_TTL)
+_semantic_cache = SemanticCache(threshold=0.92)
+_embeddings_enabled = True
+
+# One keep-alive HTTP session for every Ollama call
+_ollama_session = requests.Session()
+
+# Reused for the per-question lookups that can run side by side
+_background = ThreadPoolExecutor(max_workers=2)
+
+# Set by Ctrl-C so a streaming LLM response stops rendering
+_cancel_event = threading.Event()
+
+WORKER_COMMAND = [
+    "docker", "exec", "-i", "crewai-compliance", "python3", "-u", "/app/src/worker.py"
+]
+# Same script in one-shot argv mode: worker.py <tool> [json args...]
+ONE_SHOT_COMMAND = [
+    "docker", "exec", "crewai-compliance", "python3", "/app/src/worker.py"
+]
+
+class WorkerUnavailable(RuntimeError):
+    """The persistent worker could not be started or stopped responding"""
+
+class CommandCancelled(Exception):
+    """The user pressed Ctrl-C while a command was running"""
+
+class ToolWorker:
+    """Persistent tool process inside the container, spoken to over NDJSON"""
+
+    def __init__(self, command=None, one_shot_command=None):
+        self.command = command or WORKER_COMMAND
+        self.one_shot_command = one_shot_command or ONE_SHOT_COMMAND
+        self.process = None
+        self.lock = threading.Lock()
+        self.cancelled = threading.Event()
+
+    def start(self):
+        """Spawn the worker and wait for its ready handshake"""
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            close_fds=False
+        )
+        handshake = self.process.stdout.readline()
+        try:
+            ready = json.loads(handshake.decode("utf-8")).get("result") == "ready"
+        except ValueError:
+            ready = False
+        if not ready:
+            self.stop()
+            raise WorkerUnavailable("Tool worker exited during startup")
+
+    def stop(self):
+        """Terminate the worker process"""
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+            except Exception:
+                pass
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+    def prewarm(self):
+        """Start the worker in the background so the prompt isn't held up by imports"""
+        def run():
+            with self.lock:
+                if not self.is_alive():
+                    try:
+                        self.start()
+                    except Exception:
+                        # The first command will retry and report the error
+                        pass
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def cancel(self):
+        """Abort the in-flight request by killing the worker (restarted on next use)"""
+        self.cancelled.set()
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def _round_trip(self, payload: bytes) -> bytes:
+        if not self.is_alive():
+            self.start()
+        self.process.stdin.write(payload)
+        self.process.stdin.flush()
+        return self.process.stdout.readline()
+
+    def request(self, message: dict) -> dict:
+        """Send one request to the worker, restarting it once if it has gone away"""
+        payload = (json.dumps(message) + "\n").encode("utf-8")
+
+        with self.lock:
+            line = b""
+            for _ in range(2):
+                try:
+                    line = self._round_trip(payload)
+                except (OSError, WorkerUnavailable):
+                    line = b""
+                if line:
+                    break
+                self.stop()
+                if self.cancelled.is_set():
+                    raise RuntimeError("Cancelled")
+                # EOF: the worker died (container restart, crash) - retry once
+            if not line:
+                raise WorkerUnavailable("Tool worker is not responding")
+
+        return json.loads(line.decode("utf-8"))
+
+    def call_once(self, tool: str, *args) -> str:
+        """Run a tool in a one-off process; arguments go as argv, never as source"""
+        output = run_command(
+            self.one_shot_command + [tool] + [json.dumps(arg) for arg in args],
+            timeout=60
+        )
+        if not output:
+            raise RuntimeError("Tool worker is not responding")
+        return _unpack(json.loads(output.strip().splitlines()[-1]))
+
+    def call(self, tool: str, *args) -> str:
+        """Run a tool in the worker, falling back to a one-shot process"""
+        try:
+            response = self.request({"tool": tool, "args": list(args)})
+        except WorkerUnavailable:
+            return self.call_once(tool, *args)
+        return _unpack(response)
+
+    def call_many(self, calls: List[tuple]) -> List[Any]:
+        """Run several tools in one round trip; failures come back as exceptions"""
+        batch = [{"tool": tool, "args": list(args)} for tool, *args in calls]
+        try:
+            response = self.request({"batch": batch})
+        except WorkerUnavailable:
+            response = {"ok": True, "results": [self._call_once_response(*call) for call in calls]}
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "unknown worker error"))
+
+        results = []
+        for item in response["results"]:
+            try:
+                results.append(_unpack(item))
+            except RuntimeError as e:
+                results.append(e)
+        return results
+
+    def _call_once_response(self, tool: str, *args) -> dict:
+        try:
+            return {"ok": True, "result": self.call_once(tool, *args)}
+        except RuntimeError as e:
+            return {"ok": False, "error": str(e)}
+
+def _unpack(response: dict) -> str:
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "unknown worker error"))
+    return response["result"]
+
+_worker = ToolWorker()
+
+# src/tool_server.py, started by docker-compose.real.yml and published on the host
+TOOL_SERVER_URL = os.getenv("TOOL_SERVER_URL", "http://localhost:9000")
+
+class ToolServerClient:
+    """Keep-alive HTTP client for the tool server; preferred over the worker"""
+
+    def __init__(self, base_url: str = TOOL_SERVER_URL):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.available = None  # unknown until the first health check
+
+    def check(self) -> bool:
+        """Probe /health once; the result sticks until a request fails"""
+        try:
+            response = self.session.get(f"{self.base_url}/health", timeout=1)
+            self.available = response.ok
+        except requests.RequestException:
+            self.available = False
+        return self.available
+
+    def _post(self, path: str, payload: dict) -> dict:
+        try:
+            response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=60)
+            return response.json()
+        except (requests.ConnectionError, ValueError) as e:
+            # Server went away: stop using it and let the caller fall back to the worker
+            self.available = False
+            raise WorkerUnavailable(f"Tool server unavailable: {e}")
+
+    def call(self, tool: str, *args) -> str:
+        return _unpack(self._post(f"/tool/{tool}", {"args": list(args)}))
+
+    def call_many(self, calls: List[tuple]) -> List[Any]:
+        batch = [{"tool": tool, "args": list(args)} for tool, *args in calls]
+        response = self._post("/batch", {"batch": batch})
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "unknown tool server error"))
+
+        results = []
+        for item in response["results"]:
+            try:
+                results.append(_unpack(item))
+            except RuntimeError as e:
+                results.append(e)
+        return results
+
+_tool_server = ToolServerClient()
+
+def _use_tool_server() -> bool:
+    if _tool_server.available is None:
+        _tool_server.check()
+    return _tool_server.available
+
+# Inside the container the tools can be imported and called directly
+IN_CONTAINER = "--in-container" in sys.argv or Path("/.dockerenv").exists()
+LOCAL_TOOLS = None
+
+if IN_CONTAINER:
+    sys.path.append(str(Path(__file__).parent / "src"))
+    try:
+        from worker import load_tools
+        LOCAL_TOOLS = load_tools()
+    except ImportError as e:
+        print(f"Warning: Could not import tools in-process, using worker: {e}")
+
+def run_command(args: List[str], timeout: float = 5) -> Optional[str]:
+    """Run a short host command, returning stdout or None on failure/timeout"""
+    try:
+        # A list argv without a shell, and close_fds=False, keeps CPython on its
+        # posix_spawn/vfork fast path; Python's own fds are non-inheritable
+        # (PEP 446), so nothing leaks into the child
+        process = subprocess.Popen(
+            args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding='utf-8', close_fds=False
+        )
+    except OSError:
+        return None
+
+    try:
+        stdout, _ = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        return None
+    return stdout if process.returncode == 0 else None
+
+CONTAINERS = ["crewai-compliance", "crewai-ollama"]
+
+# Container states from the last check, reused for the rest of the session
+_container_status = None
+
+def container_status(force: bool = False) -> Dict[str, str]:
+    """State of each demo container ("running", "exited", ...), cached per session"""
+    global _container_status
+    if _container_status is not None and not force:
+        return _container_status
+
+    status = {}
+    for name in CONTAINERS:
+        # `docker inspect` on a known name is cheaper than filtering `docker ps`
+        output = run_command(["docker", "inspect", "--format", "{{.State.Status}}", name])
+        status[name] = output.strip() if output else "not found"
+
+    _container_status = status
+    return status
+
+def run_interruptible(fn, *args, **kwargs):
+    """Run fn on a background thread; Ctrl-C cancels it instead of quitting the chat"""
+    _cancel_event.clear()
+    _worker.cancelled.clear()
+
+    future = Future()
+    def target():
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+    threading.Thread(target=target, daemon=True).start()
+
+    try:
+        while True:
+            # Wait via exception() so a TimeoutError raised by fn itself isn't
+            # mistaken for the poll timing out (before 3.11 the two differ)
+            try:
+                future.exception(timeout=0.1)
+            except FutureTimeout:
+                continue
+            return future.result()
+    except KeyboardInterrupt:
+        _cancel_event.set()
+        if LOCAL_TOOLS is None:
+            _worker.cancel()
+            _worker.prewarm()
+        raise CommandCancelled()
+
+def _tool_key(call: tuple) -> str:
+    return json.dumps(list(call))
+
+def _cacheable(result: Any) -> bool:
+    # Don't hold on to failures; tools report errors as "Error ..." strings
+    return isinstance(result, str) and not result.startswith("Error")
+
+def _run_tool(tool: str, *args) -> str:
+    if LOCAL_TOOLS is not None:
+        if tool not in LOCAL_TOOLS:
+            raise RuntimeError(f"Unknown tool: {tool}")
+        runner = LOCAL_TOOLS[tool]
+        return getattr(runner, "run", runner)(*args)
+    if _use_tool_server():
+        try:
+            return _tool_server.call(tool, *args)
+        except WorkerUnavailable:
+            pass
+    return _worker.call(tool, *args)
+
+def _tool_ttl(tool: str) -> float:
+    return TOOL_CACHE_TTLS.get(tool, TOOL_CACHE_TTL)
+
+def call_tool(tool: str, *args) -> str:
+    """Run a tool in-process when possible, otherwise via the container worker.
+
+    Results are cached for the tool's TTL (TOOL_CACHE_TTLS, else
+    TOOL_CACHE_TTL seconds); none of the tools the demo exposes modify data,
+    so there is nothing to invalidate besides /cache clear.
+    """
+    key = _tool_key((tool,) + args)
+    cached = _tool_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = _run_tool(tool, *args)
+    if _cacheable(result):
+        _tool_cache.set(key, result, ttl=_tool_ttl(tool))
+    return result
+
+def call_tools(calls: List[tuple]) -> List[Any]:
+    """Run independent tool calls together; failed calls come back as exceptions"""
+    results = [_tool_cache.get(_tool_key(call)) for call in calls]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+
+    if LOCAL_TOOLS is None:
+        fetched = None
+        if _use_tool_server():
+            try:
+                fetched = _tool_server.call_many([calls[i] for i in pending])
+            except WorkerUnavailable:
+                pass
+        if fetched is None:
+            fetched = _worker.call_many([calls[i] for i in pending])
+    else:
+        def run(call):
+            try:
+                return _run_tool(*call)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+            fetched = list(pool.map(run, [calls[i] for i in pending]))
+
+    for i, result in zip(pending, fetched):
+        results[i] = result
+        if _cacheable(result):
+            _tool_cache.set(_tool_key(calls[i]), result, ttl=_tool_ttl(calls[i][0]))
+    return results
+
+def call_tools_cached(name: str, calls: List[tuple], ttl: float) -> List[Any]:
+    """call_tools() for a whole command, cached as one entry for ttl seconds.
+
+    Keeps a long-lived command result from stretching the TTL of the
+    individual tool entries it is built from.
+    """
+    key = _tool_key(("command", name) + tuple(calls))
+    cached = _tool_cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    results = call_tools(calls)
+    if all(_cacheable(result) for result in results):
+        _tool_cache.set(key, json.dumps(results), ttl=ttl)
+    return results
+
+def _result(value: Any) -> str:
+    """Return a call_tools() result, re-raising it if the call failed"""
+    if isinstance(value, Exception):
+        raise value
+    return value
 
 def print_banner():
     print("""
@@ -45,7 +502,10 @@ def print_help():
     /help     - Show this help
     /tools    - List all available tools & direct commands
     /data     - Show sample data overview
-    /test     - Test system components
+    /test     - Test system components (/test --force to re-check containers)
+    /cache    - Show LLM/tool cache stats (/cache clear to reset, persists in .demo_cache/)
+    /warmup   - Preload and pin the Ollama models
+    /status   - Show models currently loaded in Ollama
     /quit     - Exit chat
 
 ⚙️  Direct Tool Commands:
@@ -109,91 +569,152 @@ def list_tools():
     print("   Or type: 'Show me claims for customer C456'")
     print("   Or say: 'Trace wallet 0xabc transactions'")
 
-def test_system():
-    """Test system components"""
+def test_system(force: bool = False):
+    """Test system components (container state is cached unless force=True)"""
     print("\n🧪 SYSTEM TEST:\n")
     
     # Test containers
-    try:
-        result = subprocess.run([
-            "docker", "ps", "--filter", "name=crewai-", "--format", "{{.Names}}: {{.Status}}"
-        ], capture_output=True, text=True, encoding='utf-8', timeout=5)
-        
-        if result.returncode == 0 and "crewai-" in result.stdout:
-            print("✅ Containers: Running")
-            for line in result.stdout.strip().split('\n'):
-                print(f"   {line}")
-        else:
-            print("❌ Containers: Not running")
-    except Exception as e:
-        print(f"❌ Container check failed: {e}")
+    status = container_status(force)
+    if status.get("crewai-compliance") == "running":
+        print("✅ Containers: Running")
+    else:
+        print("❌ Containers: Not running")
+    for name, state in status.items():
+        print(f"   {name}: {state}")
     
     # Test Ollama
     try:
-        result = subprocess.run([
-            "docker", "exec", "crewai-compliance", "python3", "-c",
-            "import requests; r = requests.get('http://ollama:11434/api/tags', timeout=5); print('✅ Ollama: Connected -', len(r.json()['models']), 'models')"
-        ], capture_output=True, text=True, encoding='utf-8', timeout=10)
+        response = _ollama_session.get(f"{OLLAMA_HOST_URL}/api/tags", timeout=5)
         
-        if result.returncode == 0:
-            print(result.stdout.strip())
+        if response.status_code == 200:
+            print("✅ Ollama: Connected -", len(response.json()['models']), "models")
         else:
             print("❌ Ollama: Connection failed")
     except Exception as e:
         print(f"❌ Ollama test failed: {e}")
-    
+
+    # Test tool server (falls back to the docker exec worker when down)
+    if LOCAL_TOOLS is None:
+        if _tool_server.check():
+            print(f"✅ Tool server: Connected - {_tool_server.base_url}")
+        else:
+            print(f"⚠️  Tool server: Not reachable at {_tool_server.base_url}, using worker")
+
     # Test tools
     try:
-        result = subprocess.run([
-            "docker", "exec", "crewai-compliance", "python3", "-c",
-            '''
-import sys; sys.path.append("/app/src")
-try:
-    from tools.claims_repo import list_open_claims
-    result = list_open_claims.run()
-    print("✅ Tools: Working -", len(result) if isinstance(result, str) else "data available")
-except Exception as e:
-    print("❌ Tools:", e)
-'''
-        ], capture_output=True, text=True, encoding='utf-8', timeout=10)
-        
-        if result.returncode == 0:
-            print(result.stdout.strip())
-        else:
-            print("❌ Tools: Test failed")
+        result = call_tool("list_open_claims")
+        print("✅ Tools: Working -", len(result) if isinstance(result, str) else "data available")
     except Exception as e:
-        print(f"❌ Tools test failed: {e}")
+        print("❌ Tools:", e)
+
+def _open_claims_overview(result: str) -> str:
+    data = json.loads(result)
+    return f"Total Claims: {data['total_open_claims']}, Customers: {data['unique_customers']}, Assets: {data['assets_involved']}"
 
 def show_data_overview():
     """Show overview of available data"""
     print("\n📊 DATA OVERVIEW:\n")
     
+    # (section name, tool call, formatter)
     queries = [
-        ("Claims Summary", "from tools.claims_repo import claims_reconciliation_summary; print(claims_reconciliation_summary.run())"),
-        ("Asset Summary", "from tools.ledger_query import ledger_asset_summary; print(ledger_asset_summary.run())"),
-        ("Open Claims", "from tools.claims_repo import list_open_claims; result=list_open_claims.run(); import json; data=json.loads(result); print(f'Total Claims: {data[\"total_open_claims\"]}, Customers: {data[\"unique_customers\"]}, Assets: {data[\"assets_involved\"]}')")
+        ("Claims Summary", ("claims_reconciliation_summary",), str),
+        ("Asset Summary", ("ledger_asset_summary",), str),
+        ("Open Claims", ("list_open_claims",), _open_claims_overview)
     ]
-    
-    for name, query in queries:
-        print(f"🔍 {name}:")
-        try:
-            result = subprocess.run([
-                "docker", "exec", "crewai-compliance", "python3", "-c",
-                f"import sys; sys.path.append('/app/src'); {query}"
-            ], capture_output=True, text=True, timeout=15, encoding='utf-8')
-            
-            if result.returncode == 0:
-                output = result.stdout.strip()
+
+    # The lookups are independent: start them all at once and print each
+    # section as soon as its result is in, rather than after the slowest one
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        futures = [pool.submit(call_tool, *call) for _, call, _ in queries]
+
+        for (name, _, fmt), future in zip(queries, futures):
+            print(f"🔍 {name}:")
+            try:
+                output = fmt(future.result()).strip()
                 if len(output) > 300:
                     output = output[:300] + "..."
-                print(f"   {output}\n")
-            else:
-                print(f"   ❌ Error getting {name.lower()}\n")
+                print(f"   {output}\n", flush=True)
+            except Exception as e:
+                print(f"   ❌ Error: {e}\n")
+
+def embed_question(question: str) -> Optional[List[float]]:
+    """Embed a question with Ollama for the semantic cache (None if unavailable)"""
+    global _embeddings_enabled
+    if not _embeddings_enabled:
+        return None
+
+    try:
+        response = _ollama_session.post(
+            f"{OLLAMA_HOST_URL}/api/embeddings",
+            json={"model": EMBEDDING_MODEL, "prompt": question, "keep_alive": OLLAMA_KEEP_ALIVE},
+            timeout=5
+        )
+        response.raise_for_status()
+        return response.json().get("embedding") or None
+    except Exception as e:
+        # Don't pay the timeout on every question if embeddings are unavailable
+        _embeddings_enabled = False
+        print(f"\nWarning: Semantic cache disabled, embeddings unavailable: {e}")
+        return None
+
+def warm_model() -> Dict[str, Any]:
+    """Load the chat (and embedding) model into Ollama and pin it in memory.
+
+    An empty prompt makes Ollama load the model and return without generating,
+    so the first real question doesn't pay the 20-30s model load.
+    """
+    timings = {}
+    loads = [(OLLAMA_MODEL, "api/generate")]
+    if _embeddings_enabled:
+        loads.append((EMBEDDING_MODEL, "api/embeddings"))
+
+    for model, endpoint in loads:
+        start_time = time.time()
+        try:
+            response = _ollama_session.post(
+                f"{OLLAMA_HOST_URL}/{endpoint}",
+                json={"model": model, "prompt": "", "keep_alive": OLLAMA_KEEP_ALIVE},
+                timeout=120
+            )
+            response.raise_for_status()
+            timings[model] = time.time() - start_time
         except Exception as e:
-            print(f"   ❌ Error: {e}\n")
+            timings[model] = e
+    return timings
 
-def ask_ollama_direct(question: str, context: str = "") -> str:
-    """Ask Ollama directly using Docker exec with Python"""
+def show_warmup():
+    """Run warm_model() and report how long each model took to load"""
+    with ThinkingContext("🔥 Loading models into Ollama", "dots"):
+        timings = run_interruptible(warm_model)
+
+    print("\n🔥 MODEL WARMUP:\n")
+    for model, result in timings.items():
+        if isinstance(result, Exception):
+            print(f"   ❌ {model}: {result}")
+        else:
+            print(f"   ✅ {model}: ready in {result:.1f}s (pinned)")
+    print()
+
+def show_model_status():
+    """Show which models Ollama has loaded (GET /api/ps)"""
+    print("\n📡 OLLAMA STATUS:\n")
+    try:
+        response = _ollama_session.get(f"{OLLAMA_HOST_URL}/api/ps", timeout=5)
+        response.raise_for_status()
+        models = response.json().get("models", [])
+    except Exception as e:
+        print(f"   ❌ Could not reach Ollama: {e}\n")
+        return
+
+    if not models:
+        print("   ⚠️  No models loaded - run /warmup to preload them")
+    for model in models:
+        size_gb = model.get("size_vram", model.get("size", 0)) / 1e9
+        print(f"   ✅ {model.get('name')}: {size_gb:.1f} GB, expires {model.get('expires_at', 'never')}")
+    print()
+
+def ask_ollama_direct(question: str, context: str = "", on_token=None, embedding=None) -> str:
+    """Ask Ollama directly over HTTP, streaming tokens to on_token if given"""
     
     system_prompt = f"""You are a cryptocurrency bankruptcy compliance analyst. Answer questions about the compliance data clearly and helpfully.
 
@@ -209,122 +730,150 @@ Question: {question}
 
 Provide a helpful, professional response."""
 
+    cache_key = make_key(question, context, OLLAMA_MODEL, LLM_TEMPERATURE)
+    cached = _llm_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Second tier: a paraphrase of an earlier question asked against the same data
+    if embedding is None:
+        embedding = embed_question(question)
+    if embedding is not None:
+        cached = _semantic_cache.get(embedding, context)
+        if cached is not None:
+            _llm_cache.set(cache_key, cached)
+            return cached
+
     try:
-        # Create Python script for Ollama call
-        python_script = f'''
-import requests
-import json
+        response = _ollama_session.post(
+            f"{OLLAMA_HOST_URL}/api/generate",
+            json={
+                "model": OLLAMA_MODEL,
+                "prompt": system_prompt,
+                "stream": on_token is not None,
+                "keep_alive": OLLAMA_KEEP_ALIVE,
+                "options": {
+                    "temperature": LLM_TEMPERATURE,
+                    "top_p": 0.9
+                }
+            },
+            stream=on_token is not None,
+            timeout=45
+        )
 
-try:
-    response = requests.post("http://ollama:11434/api/generate", 
-                           json={{
-                               "model": "llama3.1:8b",
-                               "prompt": """{system_prompt}""",
-                               "stream": False,
-                               "options": {{
-                                   "temperature": 0.3,
-                                   "top_p": 0.9
-                               }}
-                           }},
-                           timeout=45)
-    
-    if response.status_code == 200:
-        data = response.json()
-        print(data.get("response", "No response"))
-    else:
-        print("❌ Error: HTTP", response.status_code)
-        
-except Exception as e:
-    print("❌ Request failed:", str(e))
-'''
+        if response.status_code != 200:
+            return f"❌ Error: HTTP {response.status_code}"
 
-        result = subprocess.run([
-            "docker", "exec", "crewai-compliance", "python3", "-c", python_script
-        ], capture_output=True, text=True, timeout=60, encoding='utf-8')
-        
-        if result.returncode == 0:
-            response = result.stdout.strip()
-            if response.startswith("❌"):
-                return response
-            return response
+        if on_token is None:
+            answer = response.json().get("response", "No response").strip()
         else:
-            return f"❌ Execution error: {result.stderr}"
-            
-    except subprocess.TimeoutExpired:
+            # Render tokens as they are generated; only a finished answer is cached
+            parts = []
+            done = False
+            for line in response.iter_lines():
+                if _cancel_event.is_set():
+                    response.close()
+                    return "❌ Cancelled"
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("response", "")
+                if token:
+                    parts.append(token)
+                    on_token(token)
+                if chunk.get("done"):
+                    done = True
+                    break
+            answer = "".join(parts).strip()
+            if not done:
+                return answer or "❌ Error: stream ended early"
+
+        _llm_cache.set(cache_key, answer)
+        if embedding is not None:
+            _semantic_cache.set(embedding, context, question, answer)
+        return answer
+
+    except requests.Timeout:
         return "❌ Request timed out (this can happen with complex questions)"
     except Exception as e:
-        return f"❌ Error: {e}"
+        return f"❌ Request failed: {e}"
 
 def run_direct_tool(command: str) -> str:
     """Execute direct tool commands like /balance C123 BTC"""
-    parts = command.strip().split()
+    try:
+        # argv-style parsing, so quoted arguments like /search "asset recovery" work
+        parts = shlex.split(command.strip())
+    except ValueError:
+        parts = command.strip().split()
     if not parts or not parts[0].startswith('/'):
         return ""
     
     cmd_name = parts[0][1:]  # Remove the /
-    
+
     try:
         if cmd_name == "balance" and len(parts) >= 3:
             customer, asset = parts[1], parts[2]
-            cmd = f"from tools.ledger_query import ledger_balance; result=ledger_balance.run('{customer}', '{asset}'); print('💰 Balance Result:', result)"
-            
+            tool, args, label = "ledger_balance", [customer, asset], "💰 Balance Result:"
+
         elif cmd_name == "movements" and len(parts) >= 2:
             customer = parts[1]
-            limit = parts[2] if len(parts) > 2 else "10"
-            cmd = f"from tools.ledger_query import ledger_movements; result=ledger_movements.run('{customer}', {limit}); print('📊 Transaction History:', result)"
-            
+            limit = int(parts[2]) if len(parts) > 2 else 10
+            tool, args, label = "ledger_movements", [customer, limit], "📊 Transaction History:"
+
         elif cmd_name == "assets":
             if len(parts) >= 2:
                 asset = parts[1]
-                cmd = f"from tools.ledger_query import ledger_asset_summary; result=ledger_asset_summary.run('{asset}'); print('💰 Asset Summary ({asset}):', result)"
+                tool, args, label = "ledger_asset_summary", [asset], f"💰 Asset Summary ({asset}):"
             else:
-                cmd = f"from tools.ledger_query import ledger_asset_summary; result=ledger_asset_summary.run(); print('💰 Asset Summary (All):', result)"
-            
+                tool, args, label = "ledger_asset_summary", [], "💰 Asset Summary (All):"
+
         elif cmd_name == "withdrawals" and len(parts) >= 2:
             customer = parts[1]
-            cmd = f"from tools.ledger_query import ledger_withdrawal_history; result=ledger_withdrawal_history.run('{customer}'); print('💸 Withdrawal History:', result)"
-            
+            tool, args, label = "ledger_withdrawal_history", [customer], "💸 Withdrawal History:"
+
         elif cmd_name == "claims":
-            cmd = "from tools.claims_repo import list_open_claims; result=list_open_claims.run(); import json; data=json.loads(result); print('⚖️  Open Claims:', str(data['total_open_claims']) + ' claims, ' + str(data['unique_customers']) + ' customers, Assets: ' + str(data['assets_involved']))"
-            
+            data = json.loads(call_tool("list_open_claims"))
+            summary = f"{data['total_open_claims']} claims, {data['unique_customers']} customers, Assets: {data['assets_involved']}"
+            return f"✅ Tool Result:\n⚖️  Open Claims: {summary}"
+
         elif cmd_name == "claim" and len(parts) >= 2:
             claim_id = parts[1]
-            cmd = f"from tools.claims_repo import get_claim_details; result=get_claim_details.run('{claim_id}'); print('📋 Claim Details:', result)"
-            
+            tool, args, label = "get_claim_details", [claim_id], "📋 Claim Details:"
+
         elif cmd_name == "customer" and len(parts) >= 2:
             customer = parts[1]
-            cmd = f"from tools.claims_repo import claims_by_customer; result=claims_by_customer.run('{customer}'); print('👤 Customer Claims:', result)"
-            
+            tool, args, label = "claims_by_customer", [customer], "👤 Customer Claims:"
+
         elif cmd_name == "reconcile":
-            cmd = f"from tools.claims_repo import claims_reconciliation_summary; result=claims_reconciliation_summary.run(); print('⚖️  Reconciliation Summary:', result)"
-            
+            tool, args, label = "claims_reconciliation_summary", [], "⚖️  Reconciliation Summary:"
+
         elif cmd_name == "wallet" and len(parts) >= 2:
             wallet = parts[1]
-            cmd = f"from tools.wallet_graph import wallet_transaction_summary; result=wallet_transaction_summary.run('{wallet}'); print('🔗 Wallet Analysis:', result)"
-            
+            tool, args, label = "wallet_transaction_summary", [wallet], "🔗 Wallet Analysis:"
+
         elif cmd_name == "trace" and len(parts) >= 3:
-            wallet, hops = parts[1], parts[2]
-            cmd = f"from tools.wallet_graph import wallet_outward_hops; result=wallet_outward_hops.run('{wallet}', {hops}); print('🌐 Transaction Trace:', result)"
-            
+            wallet, hops = parts[1], int(parts[2])
+            tool, args, label = "wallet_outward_hops", [wallet, hops], "🌐 Transaction Trace:"
+
         elif cmd_name == "flows" and len(parts) >= 2:
             wallet = parts[1]
-            cmd = f"from tools.wallet_graph import wallet_inward_flows; result=wallet_inward_flows.run('{wallet}', 3); print('🔄 Wallet Flows:', result)"
-            
+            tool, args, label = "wallet_inward_flows", [wallet, 3], "🔄 Wallet Flows:"
+
         elif cmd_name == "resolve" and len(parts) >= 2:
             wallet = parts[1]
-            cmd = f"from tools.xref_tool import resolve_wallet; result=resolve_wallet.run('{wallet}'); print('👤 Entity Resolution:', result)"
-            
+            tool, args, label = "resolve_wallet", [wallet], "👤 Entity Resolution:"
+
         elif cmd_name == "search" and len(parts) >= 2:
             query = ' '.join(parts[1:])
-            cmd = f"from tools.rag_search import rag_search; result=rag_search.run('{query}'); print('📚 Knowledge Search:', result)"
-            
+            tool, args, label = "rag_search", [query], "📚 Knowledge Search:"
+
         elif cmd_name == "docs":
-            cmd = f"from tools.rag_search import list_knowledge_sources; result=list_knowledge_sources.run(); print('📖 Available Documents:', result)"
-            
+            tool, args, label = "list_knowledge_sources", [], "📖 Available Documents:"
+
         elif cmd_name == "cite" and len(parts) >= 2:
             query = ' '.join(parts[1:])
-            cmd = f"from tools.rag_search import search_citations; result=search_citations.run('{query}'); print('🔗 Legal Citations:', result)"
-            
+            tool, args, label = "search_citations", [query], "🔗 Legal Citations:"
+
         elif cmd_name == "verdict":
             # Multi-agent compliance verdict - get insights from all 3 specialists
             return generate_multi_agent_verdict()
@@ -336,43 +885,39 @@ def run_direct_tool(command: str) -> str:
         else:
             return f"❌ Unknown command: {cmd_name}\nType /help for available commands"
         
-        # Execute the command
-        result = subprocess.run([
-            "docker", "exec", "crewai-compliance", "python3", "-c",
-            f"import sys; sys.path.append('/app/src'); {cmd}"
-        ], capture_output=True, text=True, timeout=30, encoding='utf-8')
-        
-        if result.returncode == 0:
-            return f"✅ Tool Result:\n{result.stdout.strip()}"
-        else:
-            return f"❌ Tool Error: {result.stderr}"
-            
+        # Execute the command (in-process or via the worker)
+        result = call_tool(tool, *args)
+        return f"✅ Tool Result:\n{label} {result}"
+
+    except RuntimeError as e:
+        return f"❌ Tool Error: {e}"
     except Exception as e:
         return f"❌ Execution Error: {e}"
 
+def _open_claims_context() -> str:
+    data = json.loads(call_tool("list_open_claims"))
+    return f"📊 Found {data['total_open_claims']} open claims from {data['unique_customers']} customers"
+
+# Keyword routing for natural-language questions, checked in priority order.
+# Patterns are plain substrings (no word boundaries) to match the original
+# `word in query.lower()` checks, e.g. "assets" still routes on "asset".
+TOOL_DATA_ROUTES = [
+    (re.compile(r"claim", re.I), _open_claims_context),
+    (re.compile(r"balance|asset|btc|eth|usd", re.I), lambda: '💰 ' + call_tool("ledger_asset_summary")),
+    (re.compile(r"customer|c123|c456", re.I), lambda: '👤 ' + call_tool("claims_by_customer", "C123")),
+]
+
 def get_tool_data(query: str) -> str:
     """Get data from tools based on query keywords"""
-    
-    # Smart keyword mapping for natural language
-    if any(word in query.lower() for word in ['claims', 'claim']):
-        cmd = "from tools.claims_repo import list_open_claims; result=list_open_claims.run(); import json; data=json.loads(result); print('📊 Found', str(data['total_open_claims']), 'open claims from', str(data['unique_customers']), 'customers')"
-    elif any(word in query.lower() for word in ['balance', 'asset', 'btc', 'eth', 'usd']):
-        cmd = "from tools.ledger_query import ledger_asset_summary; print('💰 ' + ledger_asset_summary.run())"
-    elif any(word in query.lower() for word in ['customer', 'c123', 'c456']):
-        cmd = "from tools.claims_repo import claims_by_customer; print('👤 ' + claims_by_customer.run('C123'))"
+
+    for pattern, fetch in TOOL_DATA_ROUTES:
+        if pattern.search(query):
+            break
     else:
         return ""
-    
+
     try:
-        result = subprocess.run([
-            "docker", "exec", "crewai-compliance", "python3", "-c",
-            f"import sys; sys.path.append('/app/src'); {cmd}"
-        ], capture_output=True, text=True, timeout=15, encoding='utf-8')
-        
-        if result.returncode == 0:
-            return f"\n📋 Related Data:\n{result.stdout.strip()}\n"
-        else:
-            return ""
+        return f"\n📋 Related Data:\n{fetch().strip()}\n"
     except Exception:
         return ""
 
@@ -381,126 +926,84 @@ def generate_multi_agent_verdict() -> str:
     
     print("🏛️  COMPLIANCE VERDICT - Multi-Agent Analysis\n")
     print("🔍 Gathering insights from 3 specialist agents...\n")
+
+    # The specialists share no data dependencies, so fetch everything they
+    # need in a single batch and let the calls run concurrently
+    try:
+        btc_bal, withdrawals, wallet_analysis, claims, recon, legal_guidance = call_tools_cached(
+            "verdict", [
+                ("ledger_balance", "C123", "BTC"),
+                ("ledger_withdrawal_history", "C123"),
+                ("wallet_transaction_summary", "0xabc"),
+                ("claims_by_customer", "C123"),
+                ("claims_reconciliation_summary",),
+                ("rag_search", "asset segregation customer funds"),
+            ], ttl=VERDICT_CACHE_TTL
+        )
+    except Exception as e:
+        btc_bal = withdrawals = wallet_analysis = claims = recon = legal_guidance = e
     
     # Agent 1: Asset Tracing Specialist
     print("🔍 ASSET TRACING SPECIALIST:")
     try:
-        # Get key asset data for C123 case study
-        result = subprocess.run([
-            "docker", "exec", "crewai-compliance", "python3", "-c",
-            """
-import sys; sys.path.append('/app/src')
-from tools.ledger_query import ledger_balance, ledger_withdrawal_history
-from tools.wallet_graph import wallet_transaction_summary
-import json
+        # C123 BTC balance
+        btc_data = json.loads(_result(btc_bal))[0]  # First item in array
 
-try:
-    # Get C123 BTC balance
-    btc_bal = ledger_balance.run('C123', 'BTC')
-    btc_data = json.loads(btc_bal)[0]  # First item in array
-    
-    # Get withdrawal history
-    withdrawals = ledger_withdrawal_history.run('C123')
-    wd_data = json.loads(withdrawals)  # Array of withdrawal objects
-    
-    # Get wallet analysis
-    wallet_analysis = wallet_transaction_summary.run('0xabc')
-    wallet_data = json.loads(wallet_analysis)  # Single dict object, not array
-    
-    print(f"   • Customer C123 has {btc_data['balance']} BTC in ledger (claimed 0.25 BTC)")
-    if wd_data and len(wd_data) > 0:
-        wd = wd_data[0]  # First withdrawal in array
-        destination = wd.get('notes', '').replace('withdraw to ', '') if 'withdraw to' in wd.get('notes', '') else '0xabc'
-        print(f"   • Traced {wd.get('amount', '0.05')} BTC withdrawal to wallet {destination} - legitimate self-custody")
-    
-    # Extract wallet transaction data
-    total_inbound = wallet_data.get('total_inbound_transactions', 0)
-    inbound_btc = wallet_data.get('inbound_totals_by_asset', {}).get('BTC', 0.05)
-    print(f"   • Wallet 0xabc shows {total_inbound} inbound transactions, {inbound_btc} BTC received from exchange")
-    print("   ✅ VERDICT: Customer claim appears VALID - 0.20 ledger + 0.05 withdrawn = 0.25 claimed")
-except Exception as e:
-    print(f"   ❌ Analysis error: {e}")
-"""
-        ], capture_output=True, text=True, timeout=20, encoding='utf-8')
-        
-        if result.returncode == 0:
-            print(result.stdout.strip())
-        else:
-            print("   ⚠️ Asset analysis unavailable")
-            print(f"   Debug: {result.stderr[:100]}" if result.stderr else "")
+        # Withdrawal history
+        wd_data = json.loads(_result(withdrawals))  # Array of withdrawal objects
+
+        # Wallet analysis
+        wallet_data = json.loads(_result(wallet_analysis))  # Single dict object, not array
+
+        print(f"   • Customer C123 has {btc_data['balance']} BTC in ledger (claimed 0.25 BTC)")
+        if wd_data and len(wd_data) > 0:
+            wd = wd_data[0]  # First withdrawal in array
+            destination = wd.get('notes', '').replace('withdraw to ', '') if 'withdraw to' in wd.get('notes', '') else '0xabc'
+            print(f"   • Traced {wd.get('amount', '0.05')} BTC withdrawal to wallet {destination} - legitimate self-custody")
+
+        # Extract wallet transaction data
+        total_inbound = wallet_data.get('total_inbound_transactions', 0)
+        inbound_btc = wallet_data.get('inbound_totals_by_asset', {}).get('BTC', 0.05)
+        print(f"   • Wallet 0xabc shows {total_inbound} inbound transactions, {inbound_btc} BTC received from exchange")
+        print("   ✅ VERDICT: Customer claim appears VALID - 0.20 ledger + 0.05 withdrawn = 0.25 claimed")
     except Exception as e:
-        print(f"   ❌ Asset analysis error: {e}")
+        print(f"   ❌ Analysis error: {e}")
     
     print("\n⚖️  CLAIMS RECONCILIATION SPECIALIST:")
     try:
-        # Get claims analysis
-        result = subprocess.run([
-            "docker", "exec", "crewai-compliance", "python3", "-c",
-            """
-import sys; sys.path.append('/app/src')
-from tools.claims_repo import claims_by_customer, claims_reconciliation_summary
-import json
+        # Customer claims
+        claims_data = json.loads(_result(claims))
 
-try:
-    # Get customer claims
-    claims = claims_by_customer.run('C123')
-    claims_data = json.loads(claims)
-    
-    # Get overall reconciliation status
-    recon = claims_reconciliation_summary.run()
-    recon_data = json.loads(recon)
-    
-    customer_claims = claims_data.get('claims', [])
-    if customer_claims:
-        btc_claim = next((c for c in customer_claims if c.get('asserted_asset') == 'BTC'), None)
-        usd_claim = next((c for c in customer_claims if c.get('asserted_asset') == 'USD'), None)
-        
-        if btc_claim and usd_claim:
-            print(f"   • C123 filed {len(customer_claims)} claims: {btc_claim['asserted_amount']} BTC + ${usd_claim['asserted_amount']} USD")
-            print(f"   • BTC claim status: {btc_claim.get('status', 'UNKNOWN').upper()} (ledger shows 0.20, withdrawal 0.05)")
-            print(f"   • USD claim: EXACT MATCH with ledger balance")
-        else:
-            print("   • C123 has multiple claims across different assets")
-    
-    print(f"   • Portfolio-wide: {recon_data.get('total_unreconciled', '?')}/{recon_data.get('total_claims', '?')} claims unreconciled")
-    print("   ✅ VERDICT: C123 claims are ACCURATE and RECONCILABLE")
-except Exception as e:
-    print(f"   ❌ Analysis error: {e}")
-"""
-        ], capture_output=True, text=True, timeout=15, encoding='utf-8')
-        
-        if result.returncode == 0:
-            print(result.stdout.strip())
-        else:
-            print("   ⚠️ Claims analysis unavailable")
-            print(f"   Debug: {result.stderr[:100]}" if result.stderr else "")
+        # Overall reconciliation status
+        recon_data = json.loads(_result(recon))
+
+        customer_claims = claims_data.get('claims', [])
+        if customer_claims:
+            btc_claim = next((c for c in customer_claims if c.get('asserted_asset') == 'BTC'), None)
+            usd_claim = next((c for c in customer_claims if c.get('asserted_asset') == 'USD'), None)
+
+            if btc_claim and usd_claim:
+                print(f"   • C123 filed {len(customer_claims)} claims: {btc_claim['asserted_amount']} BTC + ${usd_claim['asserted_amount']} USD")
+                print(f"   • BTC claim status: {btc_claim.get('status', 'UNKNOWN').upper()} (ledger shows 0.20, withdrawal 0.05)")
+                print(f"   • USD claim: EXACT MATCH with ledger balance")
+            else:
+                print("   • C123 has multiple claims across different assets")
+
+        print(f"   • Portfolio-wide: {recon_data.get('total_unreconciled', '?')}/{recon_data.get('total_claims', '?')} claims unreconciled")
+        print("   ✅ VERDICT: C123 claims are ACCURATE and RECONCILABLE")
     except Exception as e:
-        print(f"   ❌ Claims analysis error: {e}")
+        print(f"   ❌ Analysis error: {e}")
     
     print("\n📋 LEGAL DOCUMENTATION SPECIALIST:")
     try:
-        # Get legal/regulatory perspective
-        result = subprocess.run([
-            "docker", "exec", "crewai-compliance", "python3", "-c",
-            """
-import sys; sys.path.append('/app/src')
-from tools.rag_search import rag_search
-
-# Search for asset segregation requirements
-legal_guidance = rag_search.run('asset segregation customer funds')
-
-print("   • Asset Segregation: Customer funds legally segregated from exchange assets")
-print("   • Documentation: Complete audit trail available (ledger + blockchain evidence)")  
-print("   • Compliance: Meets regulatory requirements for asset tracing and recovery")
-print("   • Court Readiness: Evidence chain suitable for bankruptcy proceedings")
-print("   ✅ VERDICT: COMPLIANT - Full legal backing for asset recovery")
-"""
-        ], capture_output=True, text=True, timeout=15, encoding='utf-8')
-        
-        if result.returncode == 0:
-            print(result.stdout.strip())
-        else:
-            print("   ⚠️ Legal analysis unavailable")
+        # Asset segregation requirements
+        _result(legal_guidance)
+
+        print("   • Asset Segregation: Customer funds legally segregated from exchange assets")
+        print("   • Documentation: Complete audit trail available (ledger + blockchain evidence)")  
+        print("   • Compliance: Meets regulatory requirements for asset tracing and recovery")
+        print("   • Court Readiness: Evidence chain suitable for bankruptcy proceedings")
+        print("   ✅ VERDICT: COMPLIANT - Full legal backing for asset recovery")
     except Exception as e:
         print(f"   ❌ Legal analysis error: {e}")
         
@@ -515,6 +1018,35 @@ print("   ✅ VERDICT: COMPLIANT - Full legal backing for asset recovery")
     
     return "✅ Multi-agent compliance verdict complete!"
 
+@dataclass
+class CryptoHolding:
+    name: str
+    quantity: float
+    value: float
+
+@dataclass
+class PortfolioSummary:
+    """Portfolio totals as aggregated by the worker's portfolio_summary()"""
+    crypto_total: float
+    crypto_holdings: int
+    usd_total: float
+    usd_holdings: int
+    total_customers: int
+    crypto_details: List[CryptoHolding]
+    largest_asset: Dict[str, Any]
+    total_claims: int
+    unreconciled_claims: int
+
+    @classmethod
+    def from_json(cls, payload: str) -> "PortfolioSummary":
+        data = json.loads(payload)
+        data["crypto_details"] = [CryptoHolding(**item) for item in data["crypto_details"]]
+        return cls(**data)
+
+    @property
+    def total_value(self) -> float:
+        return self.crypto_total + self.usd_total
+
 def generate_portfolio_summary() -> str:
     """Generate comprehensive portfolio summary with professional tables"""
     
@@ -522,130 +1054,103 @@ def generate_portfolio_summary() -> str:
     print("🔍 Aggregating data from all ledgers and claims...\n")
     
     try:
-        # Get comprehensive asset data
-        result = subprocess.run([
-            "docker", "exec", "crewai-compliance", "python3", "-c",
-            """
-import sys; sys.path.append('/app/src')
-from tools.ledger_query import ledger_asset_summary
-from tools.claims_repo import claims_reconciliation_summary
-import json
+        # One tool call returns the pre-aggregated totals
+        summary = PortfolioSummary.from_json(call_tool("portfolio_summary", PRICES))
+        total_value = summary.total_value
 
-try:
-    # Get asset summary
-    assets = ledger_asset_summary.run()
-    asset_data = json.loads(assets)
-    
-    # Get claims summary
-    claims = claims_reconciliation_summary.run()
-    claims_data = json.loads(claims)
-    
-    # Calculate portfolio totals
-    crypto_total = 0
-    crypto_count = 0
-    usd_total = 0
-    
-    crypto_details = []
-    
-    for asset in asset_data:
-        asset_name = asset['asset']
-        balance = asset['total_balance']  # Correct field name
-        customers = asset['customer_count']
-        
-        if asset_name in ['BTC', 'ETH']:
-            # Crypto assets - use approximate market prices
-            if asset_name == 'BTC':
-                market_value = balance * 45000  # ~$45k per BTC
-                crypto_total += market_value
-                crypto_details.append(('Bitcoin (BTC)', f"{balance:.4f}", f"${market_value:,.2f}"))
-            elif asset_name == 'ETH':
-                market_value = balance * 2800  # ~$2.8k per ETH
-                crypto_total += market_value
-                crypto_details.append(('Ethereum (ETH)', f"{balance:.4f}", f"${market_value:,.2f}"))
-            crypto_count += customers
-        elif asset_name == 'USD':
-            usd_total += balance
-    
-    # Print Portfolio Summary Table
-    print("**📊 Portfolio Summary Table**")
-    print()
-    print("| **Asset Class** | **Total Value** | **Number of Holdings** |")
-    print("| --- | --- | --- |")
-    print(f"| Cryptocurrencies (BTC, ETH) | ${crypto_total:,.2f} | {crypto_count} |")
-    print(f"| Fiat Currencies (USD) | ${usd_total:,.2f} | {len([a for a in asset_data if a['asset'] == 'USD'])} |")
-    print(f"| **TOTAL PORTFOLIO** | **${crypto_total + usd_total:,.2f}** | **{sum(a['customer_count'] for a in asset_data)}** |")
-    print()
-    
-    # Print Cryptocurrency Breakdown
-    print("**🔗 Breakdown of Cryptocurrency Holdings:**")
-    print()
-    print("| **Cryptocurrency** | **Quantity** | **Total Value** |")
-    print("| --- | --- | --- |")
-    for name, quantity, value in crypto_details:
-        print(f"| {name} | {quantity} | {value} |")
-    print()
-    
-    # Additional insights
-    print("**📋 Portfolio Insights:**")
-    print()
-    overall_stats = claims_data.get('overall_stats', {})
-    total_claims = overall_stats.get('total_claims', 0)
-    status_breakdown = overall_stats.get('status_breakdown', {})
-    unreconciled = status_breakdown.get('unreconciled', 0)
-    
-    print(f"• Total Claims Filed: {total_claims}")
-    print(f"• Unreconciled Claims: {unreconciled}")
-    print(f"• Reconciliation Rate: {((total_claims - unreconciled) / total_claims * 100):.1f}%" if total_claims > 0 else "• Reconciliation Rate: N/A")
-    print(f"• Crypto Allocation: {(crypto_total / (crypto_total + usd_total) * 100):.1f}%" if (crypto_total + usd_total) > 0 else "• Crypto Allocation: N/A")
-    
-    total_customers = sum(a['customer_count'] for a in asset_data)
-    print(f"• Average Asset per Customer: ${(crypto_total + usd_total) / total_customers:,.2f}" if total_customers > 0 else "• Average per Customer: N/A")
-    print(f"• Total Portfolio Value: ${crypto_total + usd_total:,.2f}")
-    print(f"• Largest Single Asset: {max(asset_data, key=lambda x: x['total_balance'])['asset']} (${max(a['total_balance'] for a in asset_data):,.2f})")
+        # Print Portfolio Summary Table
+        print("**📊 Portfolio Summary Table**")
+        print()
+        print("| **Asset Class** | **Total Value** | **Number of Holdings** |")
+        print("| --- | --- | --- |")
+        print(f"| Cryptocurrencies (BTC, ETH) | ${summary.crypto_total:,.2f} | {summary.crypto_holdings} |")
+        print(f"| Fiat Currencies (USD) | ${summary.usd_total:,.2f} | {summary.usd_holdings} |")
+        print(f"| **TOTAL PORTFOLIO** | **${total_value:,.2f}** | **{summary.total_customers}** |")
+        print()
 
-except Exception as e:
-    print(f"❌ Portfolio analysis error: {e}")
-"""
-        ], capture_output=True, text=True, timeout=20, encoding='utf-8')
-        
-        if result.returncode == 0:
-            print(result.stdout.strip())
-            print("\n" + "="*70)
-            print("✅ Portfolio analysis complete - Data suitable for stakeholder reports")
-            print("="*70)
-        else:
-            print("⚠️ Portfolio analysis unavailable")
-            print(f"Debug: {result.stderr[:100]}" if result.stderr else "")
+        # Print Cryptocurrency Breakdown
+        print("**🔗 Breakdown of Cryptocurrency Holdings:**")
+        print()
+        print("| **Cryptocurrency** | **Quantity** | **Total Value** |")
+        print("| --- | --- | --- |")
+        for holding in summary.crypto_details:
+            print(f"| {holding.name} | {holding.quantity:.4f} | ${holding.value:,.2f} |")
+        print()
+
+        # Additional insights
+        print("**📋 Portfolio Insights:**")
+        print()
+        total_claims = summary.total_claims
+        unreconciled = summary.unreconciled_claims
+
+        print(f"• Total Claims Filed: {total_claims}")
+        print(f"• Unreconciled Claims: {unreconciled}")
+        print(f"• Reconciliation Rate: {((total_claims - unreconciled) / total_claims * 100):.1f}%" if total_claims > 0 else "• Reconciliation Rate: N/A")
+        print(f"• Crypto Allocation: {(summary.crypto_total / total_value * 100):.1f}%" if total_value > 0 else "• Crypto Allocation: N/A")
+
+        total_customers = summary.total_customers
+        print(f"• Average Asset per Customer: ${total_value / total_customers:,.2f}" if total_customers > 0 else "• Average per Customer: N/A")
+        print(f"• Total Portfolio Value: ${total_value:,.2f}")
+        print(f"• Largest Single Asset: {summary.largest_asset['asset']} (${summary.largest_asset['balance']:,.2f})")
+
+        print("\n" + "="*70)
+        print("✅ Portfolio analysis complete - Data suitable for stakeholder reports")
+        print("="*70)
             
     except Exception as e:
         print(f"❌ Portfolio analysis error: {e}")
     
     return "✅ Portfolio summary generated successfully!"
 
+def show_cache_stats(clear: bool = False):
+    """Show (or reset) LLM response and tool result cache statistics"""
+    if clear:
+        _llm_cache.clear()
+        _semantic_cache.clear()
+        _tool_cache.clear()
+        print(f"🧹 LLM and tool caches cleared ({CACHE_DIR})\n")
+        return
+
+    stats = _llm_cache.stats()
+    print("\n🗄️  LLM CACHE:\n")
+    print(f"   Exact:    {stats['entries']}/{stats['maxsize']} entries (TTL {stats['ttl_seconds']}s)")
+    print(f"             Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']}%")
+
+    stats = _semantic_cache.stats()
+    status = "on" if _embeddings_enabled else "off (embeddings unavailable)"
+    print(f"   Semantic: {stats['entries']} entries, similarity >= {stats['threshold']} [{status}]")
+    print(f"             Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']}%")
+
+    stats = _tool_cache.stats()
+    print(f"   Tools:    {stats['entries']}/{stats['maxsize']} entries (default TTL {stats['ttl_seconds']}s)")
+    print(f"             Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']}%")
+    print(f"   Stored in: {stats.get('path', 'memory')}\n")
+
 def check_system_status() -> bool:
     """Check if CrewAI containers are running"""
-    try:
-        result = subprocess.run([
-            "docker", "ps", "--filter", "name=crewai-", "--format", "{{.Names}}: {{.Status}}"
-        ], capture_output=True, text=True, encoding='utf-8', timeout=5)
-        
-        if result.returncode == 0 and "crewai-" in result.stdout:
-            return True
-        else:
-            print("❌ CrewAI containers not running. Please start with:")
-            print("   docker-compose -f docker-compose.real.yml up -d")
-            return False
-    except Exception:
-        return False
+    if container_status().get("crewai-compliance") == "running":
+        return True
+
+    print("❌ CrewAI containers not running. Please start with:")
+    print("   docker-compose -f docker-compose.real.yml up -d")
+    return False
 
 def main():
     """Main interactive chat loop"""
     print_banner()
     
     # Check system status
-    if not check_system_status():
-        return
-    
+    if LOCAL_TOOLS is None:
+        if not check_system_status():
+            return
+
+        # Without the tool server, pre-warm the worker while the user reads the banner
+        if not _tool_server.check():
+            _worker.prewarm()
+
+    # Load the model in the background so the first question doesn't stall on it
+    _background.submit(warm_model)
+
     print("✅ System ready! Ollama LLM connected.")
     print("💬 Ask questions about compliance data...")
     print("📝 Type /help for commands, /test to check system\n")
@@ -668,8 +1173,17 @@ def main():
             elif question.lower() in ['/data']:
                 show_data_overview()
                 continue
-            elif question.lower() in ['/test']:
-                test_system()
+            elif question.lower() in ['/test', '/test --force']:
+                test_system(force=question.lower().endswith('--force'))
+                continue
+            elif question.lower() in ['/warmup']:
+                show_warmup()
+                continue
+            elif question.lower() in ['/status']:
+                show_model_status()
+                continue
+            elif question.lower() in ['/cache', '/cache stats', '/cache clear']:
+                show_cache_stats(clear=question.lower().endswith('clear'))
                 continue
             elif not question:
                 continue
@@ -677,7 +1191,7 @@ def main():
                 # Handle direct tool commands
                 start_time = time.time()
                 with ThinkingContext("⚙️ Running tool command", "dots"):
-                    result = run_direct_tool(question)
+                    result = run_interruptible(run_direct_tool, question)
                 
                 duration = time.time() - start_time
                 print(f"{result}")
@@ -688,16 +1202,37 @@ def main():
             start_time = time.time()
             
             with ThinkingContext("🤖 Analyzing question & gathering data", "brain"):
-                # Get relevant tool data
-                tool_context = get_tool_data(question)
+                # The question embedding (semantic cache lookup) doesn't depend on
+                # the tool data, so fetch both at once
+                embedding_future = _background.submit(embed_question, question)
+                tool_context = run_interruptible(get_tool_data, question)
+                embedding = embedding_future.result()
             
-            with ThinkingContext("🤖 Generating LLM response", "dots", "✅ Response ready!"):
+            streaming = {"started": False}
+            with ThinkingContext("🤖 Generating LLM response", "dots", "✅ Response ready!") as spinner:
+                def show_token(token):
+                    # The first token replaces the spinner with the streamed answer
+                    if not streaming["started"]:
+                        streaming["started"] = True
+                        spinner.stop("✅ Response ready!")
+                        sys.stdout.write("🤖 LLM: ")
+                    sys.stdout.write(token)
+                    sys.stdout.flush()
+
                 # Ask Ollama with context
-                response = ask_ollama_direct(question, tool_context)
+                response = run_interruptible(
+                    ask_ollama_direct, question, tool_context,
+                    on_token=show_token, embedding=embedding
+                )
             
-            # Show response
+            # Show response (already on screen if it was streamed)
             duration = time.time() - start_time
-            print(f"🤖 LLM: {response}")
+            if streaming["started"]:
+                print()
+                if response.startswith("❌"):
+                    print(response)
+            else:
+                print(f"🤖 LLM: {response}")
             
             # Show tool data if available
             if tool_context and not tool_context.startswith("❌"):
@@ -705,11 +1240,15 @@ def main():
                 
             print(f"⏱️  Response time: {duration:.1f}s\n")
             
+        except CommandCancelled:
+            print("\n⚠️  Cancelled\n")
         except KeyboardInterrupt:
             print("\n\n👋 Goodbye! Thanks for using CrewAI Compliance Chat!")
             break
         except Exception as e:
             print(f"\n❌ Error: {e}\n")
 
+    _worker.stop()
+
 if __name__ == "__main__":
     main()
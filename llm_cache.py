@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache for the Interactive Demo
+Exact-match LRU cache with TTL, keyed on a SHA256 of the request parameters,
+plus a semantic tier that matches paraphrased questions by embedding similarity
+and a SQLite-backed variant that survives restarts
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+def make_key(question: str, context: str, model: str, temperature: float) -> str:
+    """Build a stable cache key for one LLM request"""
+    payload = json.dumps({
+        "q": question.strip(),
+        "ctx": context,
+        "model": model,
+        "temperature": temperature
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """Thread-safe LRU cache with per-entry expiry"""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        with self.lock:
+            self.entries[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0
+            }
+
+class DiskCache:
+    """LRU cache with per-entry expiry, persisted in a SQLite table.
+
+    Same interface as LLMCache; several caches can share one database file
+    by using different table names.
+    """
+
+    def __init__(self, path: str, table: str, maxsize: int = 512, ttl: float = 3600):
+        self.path = str(path)
+        self.table = table
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        # Expired rows from earlier sessions are never read again
+        self.conn.execute(f"DELETE FROM {table} WHERE expires_at < ?", (time.time(),))
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT value FROM {self.table} WHERE key = ? AND expires_at >= ?", (key, now)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)",
+                (key, value, now + (self.ttl if ttl is None else ttl), now)
+            )
+            self.conn.execute(
+                f"DELETE FROM {self.table} WHERE key NOT IN "
+                f"(SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT ?)",
+                (self.maxsize,)
+            )
+            self.conn.commit()
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute(f"DELETE FROM {self.table}")
+            self.conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            entries = self.conn.execute(
+                f"SELECT COUNT(*) FROM {self.table} WHERE expires_at >= ?", (time.time(),)
+            ).fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+                "path": self.path
+            }
+
+def context_signature(context: str) -> str:
+    """Short digest of the tool context an answer was generated from"""
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
+
+class SemanticCache:
+    """Nearest-neighbour cache over question embeddings.
+
+    A hit requires cosine similarity >= threshold AND the same tool-context
+    signature, so a paraphrase is only answered from cache when it was
+    asked against the same data.
+    """
+
+    def __init__(self, threshold: float = 0.92, maxsize: int = 256, ttl: float = 3600):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = []  # (expires_at, unit_embedding, context_sig, question, response)
+        self.matrix = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> List[float]:
+        norm = math.sqrt(sum(x * x for x in embedding)) or 1.0
+        return [x / norm for x in embedding]
+
+    def _rebuild(self):
+        if NUMPY_AVAILABLE and self.entries:
+            self.matrix = np.array([entry[1] for entry in self.entries], dtype=np.float32)
+        else:
+            self.matrix = None
+
+    def _similarities(self, query: List[float]) -> List[float]:
+        if self.matrix is not None:
+            return (self.matrix @ np.asarray(query, dtype=np.float32)).tolist()
+        return [sum(a * b for a, b in zip(entry[1], query)) for entry in self.entries]
+
+    def get(self, embedding: List[float], context: str) -> Optional[str]:
+        query = self._normalize(embedding)
+        signature = context_signature(context)
+
+        with self.lock:
+            now = time.time()
+            if any(entry[0] < now for entry in self.entries):
+                self.entries = [entry for entry in self.entries if entry[0] >= now]
+                self._rebuild()
+
+            best_score, best_response = 0.0, None
+            for entry, score in zip(self.entries, self._similarities(query)):
+                if entry[2] == signature and score > best_score:
+                    best_score, best_response = score, entry[4]
+
+            if best_response is not None and best_score >= self.threshold:
+                self.hits += 1
+                return best_response
+
+            self.misses += 1
+            return None
+
+    def set(self, embedding: List[float], context: str, question: str, response: str):
+        entry = (time.time() + self.ttl, self._normalize(embedding),
+                 context_signature(context), question, response)
+        with self.lock:
+            self.entries.append(entry)
+            if len(self.entries) > self.maxsize:
+                self.entries = self.entries[-self.maxsize:]
+            self._rebuild()
+
+    def clear(self):
+        with self.lock:
+            self.entries = []
+            self.matrix = None
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0
+            }
+
+if __name__ == "__main__":
+    cache = LLMCache(maxsize=2, ttl=60)
+    key = make_key("How many open claims?", "", "llama3.1:8b", 0)
+    print("Miss:", cache.get(key))
+    cache.set(key, "There are 9 open claims.")
+    print("Hit:", cache.get(key))
+    print("Stats:", cache.stats())
+
+    disk = DiskCache(":memory:", "demo", maxsize=2, ttl=60)
+    disk.set(key, "There are 9 open claims.")
+    disk.set("short", "gone soon", ttl=-1)
+    print("Disk hit:", disk.get(key), "| expired:", disk.get("short"))
+    print("Disk stats:", disk.stats())
+
+    semantic = SemanticCache(threshold=0.92)
+    semantic.set([1.0, 0.0, 0.2], "", "How many open claims?", "There are 9 open claims.")
+    print("Paraphrase hit:", semantic.get([0.98, 0.05, 0.21], ""))
+    print("Different context:", semantic.get([0.98, 0.05, 0.21], "other data"))
+    print("Semantic stats:", semantic.stats())
@@ -4,10 +4,14 @@ Simple Thinking Wheel/Spinner for LLM Processing
 Lightweight, no external dependencies, cross-platform
 """
 
+import os
 import threading
 import time
 import sys
-import itertools
+
+# Glyph advance interval, and the cap on repaints triggered by update_message()
+FRAME_INTERVAL = 0.1
+MIN_REDRAW_INTERVAL = 1 / 60
 
 class ThinkingWheel:
     """Simple animated spinner to show LLM processing"""
@@ -16,6 +20,13 @@ class ThinkingWheel:
         self.message = message
         self.is_running = False
         self.thread = None
+        # Set by stop(); the spin loop waits on it instead of sleeping
+        self._stop_evt = threading.Event()
+        # Wakes the spin loop early when the message changes; _dirty marks the
+        # line as needing a repaint even though the glyph hasn't advanced
+        self._wake = threading.Event()
+        self._dirty = True
+        self._last_draw = 0.0
         
         # Different spinner styles
         self.styles = {
@@ -29,20 +40,65 @@ class ThinkingWheel:
         }
         
         self.spinner_chars = self.styles.get(style, self.styles["dots"])
-        self.spinner = itertools.cycle(self.spinner_chars)
-    
+        # Current glyph index, wrapped with a modulo (no hidden cycle buffer)
+        self._i = 0
+        self._n = len(self.spinner_chars)
+        self._build_frames()
+
+    def _build_frames(self):
+        """Pre-encode one full line per glyph so a tick is a single bytes write"""
+        self.frames = [f"\r{self.message} {char}".encode("utf-8") for char in self.spinner_chars]
+
     def _spin(self):
         """Run the spinner animation"""
-        while self.is_running:
-            char = next(self.spinner)
-            # Clear line and write spinner
-            sys.stdout.write(f"\r{self.message} {char}")
-            sys.stdout.flush()
-            time.sleep(0.1)
-    
+        out = getattr(sys.stdout, "buffer", None)
+        if self._is_tty():
+            # One raw syscall per frame: no stdout lock, no flush, and the GIL
+            # is released around the write
+            fd = sys.stdout.fileno()
+            write, flush = (lambda frame: os.write(fd, frame)), (lambda: None)
+        elif out is not None:
+            write, flush = out.write, out.flush
+        else:
+            # Text-only stream (e.g. redirected to a StringIO)
+            write, flush = (lambda frame: sys.stdout.write(frame.decode("utf-8"))), sys.stdout.flush
+
+        self._last_draw = 0.0
+        while not self._stop_evt.is_set():
+            now = time.monotonic()
+            elapsed = now - self._last_draw
+            due = elapsed >= FRAME_INTERVAL
+
+            # Repaint only when the glyph advances or the message changed
+            if due or (self._dirty and elapsed >= MIN_REDRAW_INTERVAL):
+                if due and self._last_draw:
+                    self._i = (self._i + 1) % self._n
+                self._dirty = False
+                # Clear line and write spinner
+                write(self.frames[self._i])
+                flush()
+                self._last_draw = now
+
+            # Sleep until the next glyph (or the redraw cap when dirty); stop()
+            # and update_message() wake the loop early
+            interval = MIN_REDRAW_INTERVAL if self._dirty else FRAME_INTERVAL
+            self._wake.wait(max(0.0, self._last_draw + interval - time.monotonic()))
+            self._wake.clear()
+    
+    @staticmethod
+    def _is_tty() -> bool:
+        try:
+            return sys.stdout.isatty()
+        except (AttributeError, ValueError):
+            return False
+
     def start(self):
         """Start the spinner"""
         if not self.is_running:
+            # Frames bypass the text layer, so push out anything still buffered there
+            sys.stdout.flush()
+            self._stop_evt.clear()
+            self._dirty = True
             self.is_running = True
             self.thread = threading.Thread(target=self._spin)
             self.thread.daemon = True
@@ -52,8 +108,10 @@ class ThinkingWheel:
         """Stop the spinner and optionally show completion message"""
         if self.is_running:
             self.is_running = False
+            self._stop_evt.set()
+            self._wake.set()
             if self.thread:
-                self.thread.join(timeout=0.2)
+                self.thread.join()
             
             # Clear the spinner line
             sys.stdout.write(f"\r{' ' * (len(self.message) + 10)}\r")
@@ -67,6 +125,9 @@ class ThinkingWheel:
     def update_message(self, new_message):
         """Update the spinner message"""
         self.message = new_message
+        self._build_frames()
+        self._dirty = True
+        self._wake.set()
 
 # Context manager for easy use
 class ThinkingContext:
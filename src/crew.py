@@ -4,19 +4,34 @@ Production-ready crew orchestration with actual CrewAI framework
 """
 
 import os
+import sys
+import json
+import functools
+import queue
+import atexit
+import logging
+import pickle
+import string
+import time
 import yaml
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Real CrewAI imports
 from crewai import Agent, Task, Crew, Process
 from crewai.tools import tool
 from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Import all tools (using actual function names)
 from tools.ledger_query import (
     ledger_balance, ledger_movements, ledger_withdrawal_history, ledger_asset_summary
@@ -35,26 +50,145 @@ from tools.xref_tool import (
 from tools.rag_search import (
     rag_search, search_by_document, list_knowledge_sources, search_citations
 )
-from tools.audit import log_task, get_audit_summary, get_task_details
+from tools.audit import log_task_async, flush_audit_log, get_audit_summary, get_task_details
+
+# Tool name -> tool function; built once, shared by every orchestrator
+_AVAILABLE_TOOLS = {
+    # Ledger query tools
+    "ledger_balance": ledger_balance,
+    "ledger_movements": ledger_movements,
+    "ledger_withdrawal_history": ledger_withdrawal_history,
+    "ledger_asset_summary": ledger_asset_summary,
+    
+    # Wallet graph tools
+    "wallet_shortest_path": wallet_shortest_path,
+    "wallet_outward_hops": wallet_outward_hops,
+    "wallet_inward_flows": wallet_inward_flows,
+    "wallet_transaction_summary": wallet_transaction_summary,
+    
+    # Claims repository tools
+    "list_open_claims": list_open_claims,
+    "get_claim_details": get_claim_details,
+    "claims_by_customer": claims_by_customer,
+    "claims_reconciliation_summary": claims_reconciliation_summary,
+    "update_claim_status": update_claim_status,
+    "search_claims": search_claims,
+    
+    # Cross-reference tools
+    "resolve_wallet": resolve_wallet,
+    "find_entity_wallets": find_entity_wallets,
+    "get_wallet_type_summary": get_wallet_type_summary,
+    "search_by_confidence": search_by_confidence,
+    "validate_wallet_mapping": validate_wallet_mapping,
+    "get_source_analysis": get_source_analysis,
+    
+    # RAG search tools
+    "rag_search": rag_search,
+    "search_by_document": search_by_document,
+    "list_knowledge_sources": list_knowledge_sources,
+    "search_citations": search_citations,
+    
+    # Audit tools
+    "get_audit_summary": get_audit_summary,
+    "get_task_details": get_task_details
+}
 
-load_dotenv()
+def _ensure_env():
+    """Load .env once per process (and never when the parent already did)."""
+    if not os.environ.get("_CREW_ENV_LOADED"):
+        load_dotenv()
+        os.environ["_CREW_ENV_LOADED"] = "1"
+
+# Orchestrator progress messages are queued and written by one listener
+# thread, so task callbacks on CrewAI worker threads don't block on stdout
+logger = logging.getLogger("crew")
+if not logger.handlers:
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    _log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(_log_queue))
+    _console = logging.StreamHandler(sys.stdout)
+    _console.setFormatter(logging.Formatter("%(message)s"))
+    _log_listener = QueueListener(_log_queue, _console)
+    _log_listener.start()
+    # Drain whatever is still queued before the interpreter exits
+    atexit.register(_log_listener.stop)
 
 # Get project root directory
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 CONFIG_DIR = PROJECT_ROOT / "config"
 
+# libyaml's C loader parses several times faster than the pure-Python one
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+def _load_yaml_cached(path: Path) -> Dict[str, Any]:
+    """Load a YAML config, reusing a pickle of it while the YAML is unchanged."""
+    cache = path.with_suffix(path.suffix + ".pkl")
+    try:
+        if cache.stat().st_mtime >= path.stat().st_mtime:
+            with open(cache, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass  # No usable cache - parse the YAML
+
+    with open(path, 'r') as f:
+        config = yaml.load(f, Loader=YamlLoader)
+
+    try:
+        with open(cache, 'wb') as f:
+            pickle.dump(config, f, protocol=5)
+    except OSError:
+        pass  # Read-only config dir: parse every time
+    return config
+
+def _dump_results(results: Dict[str, Any]) -> bytes:
+    """Serialize analysis results to JSON bytes (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(results, default=str)
+    return json.dumps(results, default=str).encode("utf-8")
+
+_FORMATTER = string.Formatter()
+
+def _compile_template(text: str) -> tuple:
+    """Parse a str.format template once into (literal, field, spec, conversion) tokens."""
+    return tuple(_FORMATTER.parse(text))
+
+def _render_template(tokens: tuple, inputs: Dict[str, Any]) -> str:
+    """Equivalent of text.format(**inputs) for pre-parsed tokens; raises KeyError likewise."""
+    parts = []
+    for literal, field, spec, conversion in tokens:
+        parts.append(literal)
+        if field is not None:
+            value, _ = _FORMATTER.get_field(field, (), inputs)
+            value = _FORMATTER.convert_field(value, conversion)
+            parts.append(_FORMATTER.format_field(value, spec))
+    return "".join(parts)
+
 class RealComplianceCrewOrchestrator:
     """
     Real CrewAI orchestration for cryptocurrency bankruptcy compliance analysis.
     """
     
     def __init__(self, config_dir: str = None):
+        _ensure_env()
         self.config_dir = Path(config_dir) if config_dir else CONFIG_DIR
         self.agents_config = {}
         self.tasks_config = {}
+        self.task_templates = {}
         self.crew = None
+        self._agents = None
         self.execution_results = {}
         self.llm = None
+
+        # LLM settings are read from the environment once per orchestrator
+        self._llm_provider = os.getenv('LLM_PROVIDER', 'ollama').lower()
+        self._ollama_model = os.getenv('OLLAMA_MODEL', 'llama3.1:8b')
+        self._ollama_base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+        # CrewAI memory loads an embedding backend on first kickoff; opt in with CREW_MEMORY=1
+        self._use_memory = os.getenv('CREW_MEMORY', '0') == '1'
         
         # Load configurations
         self._load_configurations()
@@ -63,54 +197,61 @@ class RealComplianceCrewOrchestrator:
         self._initialize_llm()
         
         # Tool mapping
-        self.available_tools = self._get_available_tools()
+        self.available_tools = _AVAILABLE_TOOLS
     
     def _initialize_llm(self):
         """Initialize the appropriate LLM based on configuration."""
-        provider = os.getenv('LLM_PROVIDER', 'ollama').lower()
+        provider = self._llm_provider
         
         try:
             if provider == 'ollama':
                 self.llm = ChatOllama(
-                    model=f"ollama/{os.getenv('OLLAMA_MODEL', 'llama3.1:8b')}",
-                    base_url=os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434'),
+                    model=f"ollama/{self._ollama_model}",
+                    base_url=self._ollama_base_url,
                     temperature=0.2,
                     num_ctx=8192
                 )
-                print(f"✓ Initialized Ollama LLM: ollama/{os.getenv('OLLAMA_MODEL', 'llama3.1:8b')}")
+                logger.info(f"✓ Initialized Ollama LLM: ollama/{self._ollama_model}")
                 
             elif provider == 'openai':
+                # Imported on demand: only needed when OpenAI is selected
+                from langchain_openai import ChatOpenAI
+
                 api_key = os.getenv('OPENAI_API_KEY')
                 if not api_key:
                     raise ValueError("OPENAI_API_KEY not found in environment")
+                model = os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview')
                 
                 self.llm = ChatOpenAI(
-                    model=os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview'),
+                    model=model,
                     api_key=api_key,
                     temperature=0.2,
                     max_tokens=4000
                 )
-                print(f"✓ Initialized OpenAI LLM: {os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview')}")
+                logger.info(f"✓ Initialized OpenAI LLM: {model}")
                 
             elif provider == 'anthropic':
+                from langchain_anthropic import ChatAnthropic
+
                 api_key = os.getenv('ANTHROPIC_API_KEY')
                 if not api_key:
                     raise ValueError("ANTHROPIC_API_KEY not found in environment")
+                model = os.getenv('ANTHROPIC_MODEL', 'claude-3-sonnet-20240229')
                 
                 self.llm = ChatAnthropic(
-                    model=os.getenv('ANTHROPIC_MODEL', 'claude-3-sonnet-20240229'),
+                    model=model,
                     api_key=api_key,
                     temperature=0.2,
                     max_tokens=4000
                 )
-                print(f"✓ Initialized Anthropic LLM: {os.getenv('ANTHROPIC_MODEL', 'claude-3-sonnet-20240229')}")
+                logger.info(f"✓ Initialized Anthropic LLM: {model}")
                 
             else:
                 raise ValueError(f"Unsupported LLM provider: {provider}")
                 
         except Exception as e:
-            print(f"❌ LLM initialization failed: {e}")
-            print("💡 Falling back to Ollama with default settings")
+            logger.error(f"❌ LLM initialization failed: {e}")
+            logger.info("💡 Falling back to Ollama with default settings")
             
             # Fallback to Ollama
             self.llm = ChatOllama(
@@ -126,68 +267,48 @@ class RealComplianceCrewOrchestrator:
             tasks_file = self.config_dir / "tasks.yaml"
             
             if agents_file.exists():
-                with open(agents_file, 'r') as f:
-                    self.agents_config = yaml.safe_load(f)
+                self.agents_config = _load_yaml_cached(agents_file)
             else:
                 raise FileNotFoundError(f"Agents config not found: {agents_file}")
             
             if tasks_file.exists():
-                with open(tasks_file, 'r') as f:
-                    self.tasks_config = yaml.safe_load(f)
+                self.tasks_config = _load_yaml_cached(tasks_file)
             else:
                 raise FileNotFoundError(f"Tasks config not found: {tasks_file}")
+
+            # Parse task description templates once rather than on every run
+            self.task_templates = {
+                name: _compile_template(config['description'])
+                for name, config in self.tasks_config.items()
+                if isinstance(config, dict) and '{' in str(config.get('description', ''))
+            }
                 
-            print(f"✓ Loaded configurations from {self.config_dir}")
+            logger.info(f"✓ Loaded configurations from {self.config_dir}")
             
         except Exception as e:
-            print(f"❌ Error loading configurations: {e}")
+            logger.error(f"❌ Error loading configurations: {e}")
             raise
     
-    def _get_available_tools(self) -> Dict[str, Any]:
-        """Get mapping of tool names to tool functions."""
-        return {
-            # Ledger query tools
-            "ledger_balance": ledger_balance,
-            "ledger_movements": ledger_movements,
-            "ledger_withdrawal_history": ledger_withdrawal_history,
-            "ledger_asset_summary": ledger_asset_summary,
-            
-            # Wallet graph tools
-            "wallet_shortest_path": wallet_shortest_path,
-            "wallet_outward_hops": wallet_outward_hops,
-            "wallet_inward_flows": wallet_inward_flows,
-            "wallet_transaction_summary": wallet_transaction_summary,
-            
-            # Claims repository tools
-            "list_open_claims": list_open_claims,
-            "get_claim_details": get_claim_details,
-            "claims_by_customer": claims_by_customer,
-            "claims_reconciliation_summary": claims_reconciliation_summary,
-            "update_claim_status": update_claim_status,
-            "search_claims": search_claims,
-            
-            # Cross-reference tools
-            "resolve_wallet": resolve_wallet,
-            "find_entity_wallets": find_entity_wallets,
-            "get_wallet_type_summary": get_wallet_type_summary,
-            "search_by_confidence": search_by_confidence,
-            "validate_wallet_mapping": validate_wallet_mapping,
-            "get_source_analysis": get_source_analysis,
-            
-            # RAG search tools
-            "rag_search": rag_search,
-            "search_by_document": search_by_document,
-            "list_knowledge_sources": list_knowledge_sources,
-            "search_citations": search_citations,
-            
-            # Audit tools
-            "get_audit_summary": get_audit_summary,
-            "get_task_details": get_task_details
-        }
-    
-    def _create_agents(self) -> List[Agent]:
-        """Create real CrewAI agents based on configuration."""
-        agents = []
+    def _build_one_agent(self, spec: tuple) -> Agent:
+        """Construct one CrewAI agent from an (agent_name, config, tools, system_prompt) spec."""
+        agent_name, config, agent_tools, system_prompt = spec
+        return Agent(
+            role=config.get('role', 'Analyst'),
+            goal=config.get('goal', 'Perform analysis'),
+            backstory=config.get('backstory', 'Experienced analyst'),
+            tools=agent_tools,
+            llm=self.llm,  # Use the initialized LLM
+            verbose=config.get('verbose', True),
+            memory=self._use_memory and config.get('memory', True),
+            # Without an explicit max_iter, scale the LLM-loop budget with tool fan-out
+            max_iter=config.get('max_iter') or min(15, max(3, 2 * len(agent_tools))),
+            allow_delegation=config.get('allow_delegation', False),
+            system_message=system_prompt if system_prompt else None
+        )
+
+    def _create_agents(self) -> Dict[str, Agent]:
+        """Create real CrewAI agents based on configuration, keyed by agent name."""
+        specs = []
         
         for agent_name, config in self.agents_config.items():
             if agent_name.startswith('agent_') or agent_name == 'agent_config':
@@ -201,7 +322,7 @@ class RealComplianceCrewOrchestrator:
                 if tool_name in self.available_tools:
                     agent_tools.append(self.available_tools[tool_name])
                 else:
-                    print(f"⚠️  Warning: Tool '{tool_name}' not found for agent '{agent_name}'")
+                    logger.warning(f"⚠️  Warning: Tool '{tool_name}' not found for agent '{agent_name}'")
             
             # Get system prompt if available
             system_prompt = ""
@@ -210,35 +331,26 @@ class RealComplianceCrewOrchestrator:
                 if agent_name in agent_prompts:
                     system_prompt = agent_prompts[agent_name].get('system_prompt', '')
             
-            # Create real CrewAI agent
-            agent = Agent(
-                role=config.get('role', 'Analyst'),
-                goal=config.get('goal', 'Perform analysis'),
-                backstory=config.get('backstory', 'Experienced analyst'),
-                tools=agent_tools,
-                llm=self.llm,  # Use the initialized LLM
-                verbose=config.get('verbose', True),
-                memory=config.get('memory', True),
-                max_iter=config.get('max_iter', 15),
-                allow_delegation=config.get('allow_delegation', False),
-                system_message=system_prompt if system_prompt else None
-            )
-            
-            agents.append(agent)
-            print(f"✓ Created real agent: {agent_name} with {len(agent_tools)} tools")
+            specs.append((agent_name, config, agent_tools, system_prompt))
+
+        if not specs:
+            return {}
+
+        # Agent construction is independent per agent (validation, lazy
+        # imports, memory setup), so build them concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(specs))) as executor:
+            agents = list(executor.map(self._build_one_agent, specs))
+
+        agent_map = {}
+        for (agent_name, _, agent_tools, _), agent in zip(specs, agents):
+            agent_map[agent_name] = agent
+            logger.info(f"✓ Created real agent: {agent_name} with {len(agent_tools)} tools")
         
-        return agents
+        return agent_map
     
-    def _create_tasks(self, agents: List[Agent], inputs: Dict[str, Any] = None) -> List[Task]:
+    def _create_tasks(self, agent_map: Dict[str, Agent], inputs: Dict[str, Any] = None) -> List[Task]:
         """Create real CrewAI tasks based on configuration."""
         tasks = []
-        agent_map = {}
-        
-        # Map agent names to agent objects
-        agent_names = [name for name in self.agents_config.keys() if name.endswith('_agent')]
-        for i, agent in enumerate(agents):
-            if i < len(agent_names):
-                agent_map[agent_names[i]] = agent
         
         # Get task execution order
         task_order = self.tasks_config.get('task_config', {}).get('execution_order', [])
@@ -253,16 +365,16 @@ class RealComplianceCrewOrchestrator:
             agent_name = config.get('agent')
             
             if agent_name not in agent_map:
-                print(f"⚠️  Warning: Agent '{agent_name}' not found for task '{task_name}'")
+                logger.warning(f"⚠️  Warning: Agent '{agent_name}' not found for task '{task_name}'")
                 continue
             
             # Format description with inputs if provided
             description = config.get('description', 'Perform analysis')
-            if inputs:
+            if inputs and task_name in self.task_templates:
                 try:
-                    description = description.format(**inputs)
+                    description = _render_template(self.task_templates[task_name], inputs)
                 except KeyError as e:
-                    print(f"⚠️  Warning: Could not format task description, missing key: {e}")
+                    logger.warning(f"⚠️  Warning: Could not format task description, missing key: {e}")
             
             # Create real CrewAI task
             task = Task(
@@ -270,48 +382,78 @@ class RealComplianceCrewOrchestrator:
                 expected_output=config.get('expected_output', 'Analysis results'),
                 agent=agent_map[agent_name],
                 output_file=config.get('output_file'),
-                callback=lambda output, task_name=task_name: self._task_callback(task_name, output)
+                callback=functools.partial(self._task_callback, task_name)
             )
             
             tasks.append(task)
-            print(f"✓ Created real task: {task_name} assigned to {agent_name}")
+            logger.info(f"✓ Created real task: {task_name} assigned to {agent_name}")
         
         return tasks
     
     def _task_callback(self, task_name: str, output: str):
         """Callback function for task completion logging."""
         try:
-            # Log task completion to audit system
-            task_id = log_task(
+            # One timestamp for both the audit record and the stored result
+            timestamp = datetime.now().isoformat()
+            output_text = str(output)
+
+            metadata = {
+                "execution_timestamp": timestamp,
+                "output_length": len(output_text),
+                "crew_orchestrated": True,
+                "llm_provider": self._llm_provider
+            }
+
+            # Queue the audit record (pre-encoded when orjson is available); the
+            # background writer batches inserts off the CrewAI task path
+            if ORJSON_AVAILABLE:
+                metadata_kwargs = {"metadata_bytes": orjson.dumps(metadata)}
+            else:
+                metadata_kwargs = {"metadata": metadata}
+            future = log_task_async(
                 task_name=task_name,
-                output=str(output),
+                output=output_text,
                 agent_name="real_crew_agent",
                 status="completed",
-                metadata={
-                    "execution_timestamp": datetime.now().isoformat(),
-                    "output_length": len(str(output)),
-                    "crew_orchestrated": True,
-                    "llm_provider": os.getenv('LLM_PROVIDER', 'ollama')
-                }
+                **metadata_kwargs
             )
             
-            # Store results for later access
-            self.execution_results[task_name] = {
-                "output": str(output),
-                "task_id": task_id,
-                "timestamp": datetime.now().isoformat()
+            # Store results for later access; the task ID is filled in once written
+            result = {
+                "output": output_text,
+                "task_id": None,
+                "timestamp": timestamp
             }
-            
-            print(f"✅ Task '{task_name}' completed and logged (ID: {task_id})")
+            self.execution_results[task_name] = result
+
+            def on_logged(done, task_name=task_name, result=result):
+                result["task_id"] = done.result()
+                logger.info(f"✅ Task '{task_name}' completed and logged (ID: {result['task_id']})")
+
+            future.add_done_callback(on_logged)
             
         except Exception as e:
-            print(f"⚠️  Warning: Could not log task completion for '{task_name}': {e}")
+            logger.warning(f"⚠️  Warning: Could not log task completion for '{task_name}': {e}")
     
+    def _ensure_agents_once(self) -> Dict[str, Agent]:
+        """Create the agents on first use and reuse them for every later crew/run."""
+        if self._agents is None:
+            self._agents = self._create_agents()
+        return self._agents
+
+    def rebuild_tasks(self, inputs: Dict[str, Any] = None) -> List[Task]:
+        """Swap freshly formatted tasks into the existing crew, keeping its agents."""
+        tasks = self._create_tasks(self._ensure_agents_once(), inputs)
+        if not tasks:
+            raise ValueError("No tasks were created")
+        self.crew.tasks = tasks
+        return tasks
+
     def create_crew(self, inputs: Dict[str, Any] = None) -> Crew:
         """Create and configure the real CrewAI crew."""
         try:
-            # Create agents and tasks
-            agents = self._create_agents()
+            # Create agents (once per orchestrator) and tasks
+            agents = self._ensure_agents_once()
             tasks = self._create_tasks(agents, inputs)
             
             if not agents:
@@ -321,25 +463,26 @@ class RealComplianceCrewOrchestrator:
             
             # Create real CrewAI crew
             self.crew = Crew(
-                agents=agents,
+                agents=list(agents.values()),
                 tasks=tasks,
                 process=Process.sequential,  # Sequential execution for dependencies
                 verbose=True,
-                memory=True,
+                memory=self._use_memory,
                 max_rpm=10,  # Rate limiting
                 share_crew=False  # Keep data private
             )
             
-            print(f"✅ Created REAL CrewAI crew with {len(agents)} agents and {len(tasks)} tasks")
+            logger.info(f"✅ Created REAL CrewAI crew with {len(agents)} agents and {len(tasks)} tasks")
             return self.crew
             
         except Exception as e:
-            print(f"❌ Error creating real crew: {e}")
+            logger.error(f"❌ Error creating real crew: {e}")
             return None
     
     def run_analysis(self, target_customers: List[str] = None, 
                     target_wallets: List[str] = None,
-                    additional_inputs: Dict[str, Any] = None) -> Dict[str, Any]:
+                    additional_inputs: Dict[str, Any] = None,
+                    return_json: bool = False) -> Union[Dict[str, Any], bytes]:
         """
         Run the complete compliance analysis workflow with real CrewAI.
         
@@ -347,39 +490,49 @@ class RealComplianceCrewOrchestrator:
             target_customers: List of customer IDs to analyze
             target_wallets: List of wallet addresses to trace
             additional_inputs: Additional parameters for task execution
+            return_json: Return the results already serialized as UTF-8 JSON bytes
         
         Returns:
-            Dictionary with execution results and metadata
+            Dictionary with execution results and metadata (JSON bytes if return_json)
         """
         try:
+            # The orchestrator is shared across runs; start each with no task results
+            self.execution_results = {}
             start_time = datetime.now()
+            # Wall-clock stamps are for display; the duration uses the monotonic clock
+            start_tick = time.monotonic()
             
             # Prepare inputs
             inputs = {
                 "target_customers": target_customers or ["C123", "C789"],
                 "target_wallets": target_wallets or ["0xabc", "0xdef"],
-                "analysis_date": datetime.now().strftime("%Y-%m-%d"),
+                "analysis_date": start_time.strftime("%Y-%m-%d"),
                 "case_name": "Crypto Exchange Bankruptcy Analysis"
             }
             
             if additional_inputs:
                 inputs.update(additional_inputs)
             
-            print(f"🚀 Starting REAL CrewAI compliance analysis with inputs: {inputs}")
+            logger.info(f"🚀 Starting REAL CrewAI compliance analysis with inputs: {inputs}")
             
-            # Create crew if not already created
+            # Create crew if not already created; later runs only rebuild the
+            # tasks, which carry the per-run inputs
             if not self.crew:
                 self.crew = self.create_crew(inputs)
+            else:
+                self.rebuild_tasks(inputs)
             
             if not self.crew:
                 raise RuntimeError("Could not create real CrewAI crew")
             
             # Execute the workflow with real CrewAI
-            print("🤖 Executing REAL CrewAI workflow...")
+            logger.info("🤖 Executing REAL CrewAI workflow...")
             result = self.crew.kickoff(inputs=inputs)
+            # Make sure every task's audit record (and task ID) is written
+            flush_audit_log()
             
+            duration = time.monotonic() - start_tick
             end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
             
             # Compile results
             analysis_results = {
@@ -389,30 +542,41 @@ class RealComplianceCrewOrchestrator:
                 "duration_seconds": duration,
                 "inputs": inputs,
                 "crew_result": str(result),
-                "task_results": self.execution_results,
+                # A copy, so the next run doesn't change results the caller holds
+                "task_results": dict(self.execution_results),
                 "agents_count": len(self.crew.agents),
                 "tasks_count": len(self.crew.tasks),
-                "llm_provider": os.getenv('LLM_PROVIDER', 'ollama'),
+                "llm_provider": self._llm_provider,
                 "real_crewai": True
             }
             
-            print(f"🎉 REAL CrewAI analysis completed in {duration:.2f} seconds")
-            return analysis_results
+            logger.info(f"🎉 REAL CrewAI analysis completed in {duration:.2f} seconds")
+            return _dump_results(analysis_results) if return_json else analysis_results
             
         except Exception as e:
-            print(f"❌ REAL CrewAI analysis failed: {e}")
-            return {
+            logger.error(f"❌ REAL CrewAI analysis failed: {e}")
+            failure = {
                 "execution_status": "failed",
                 "error": str(e),
                 "timestamp": datetime.now().isoformat(),
                 "inputs": inputs if 'inputs' in locals() else {},
                 "real_crewai": True
             }
+            return _dump_results(failure) if return_json else failure
 
 # Convenience functions
+_orchestrators: Dict[Optional[str], RealComplianceCrewOrchestrator] = {}
+
+def get_orchestrator(config_dir: str = None) -> RealComplianceCrewOrchestrator:
+    """Shared orchestrator per config directory, so repeated runs reuse its LLM and agents."""
+    if config_dir not in _orchestrators:
+        _orchestrators[config_dir] = RealComplianceCrewOrchestrator(config_dir)
+    return _orchestrators[config_dir]
+
 def run_real_compliance_analysis(target_customers: List[str] = None,
                                  target_wallets: List[str] = None,
-                                 config_dir: str = None) -> Dict[str, Any]:
+                                 config_dir: str = None,
+                                 return_json: bool = False) -> Union[Dict[str, Any], bytes]:
     """
     Convenience function to run the complete compliance analysis with real CrewAI.
     
@@ -420,12 +584,14 @@ def run_real_compliance_analysis(target_customers: List[str] = None,
         target_customers: List of customer IDs to analyze
         target_wallets: List of wallet addresses to trace  
         config_dir: Path to configuration directory
+        return_json: Return the results as UTF-8 JSON bytes
     
     Returns:
-        Analysis results dictionary
+        Analysis results dictionary (JSON bytes if return_json)
     """
-    orchestrator = RealComplianceCrewOrchestrator(config_dir)
-    return orchestrator.run_analysis(target_customers, target_wallets)
+    return get_orchestrator(config_dir).run_analysis(
+        target_customers, target_wallets, return_json=return_json
+    )
 
 if __name__ == "__main__":
     # Test the real orchestrator
@@ -5,16 +5,25 @@ Cryptocurrency Bankruptcy Assistant
 """
 
 import argparse
+import csv
+import io
 import json
 import sys
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 
-# Add current directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent))
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-from crew import ComplianceCrewOrchestrator, run_compliance_analysis
+# Add current directory to path for imports. crew (CrewAI and the LLM stack)
+# is imported in main() only once an analysis will actually run, so --help and
+# --dry-run return without loading it
+sys.path.insert(0, str(Path(__file__).parent))
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -24,7 +33,7 @@ def parse_arguments():
         epilog="""
 Examples:
   # Basic analysis for specific customers
-  python main.py --customers C123,C789 --wallets 0xabc,0xdef
+  python main.py --customers C123 C789 --wallets 0xabc 0xdef
   
   # Full analysis with all available data
   python main.py --full-analysis
@@ -40,14 +49,14 @@ Examples:
     # Analysis targets
     parser.add_argument(
         "--customers", "-c",
-        help="Comma-separated list of customer IDs to analyze (e.g., C123,C789)",
-        type=str
+        help="Customer IDs to analyze (e.g., C123 C789; C123,C789 also accepted)",
+        nargs="+"
     )
     
     parser.add_argument(
         "--wallets", "-w", 
-        help="Comma-separated list of wallet addresses to trace (e.g., 0xabc,0xdef)",
-        type=str
+        help="Wallet addresses to trace (e.g., 0xabc 0xdef; 0xabc,0xdef also accepted)",
+        nargs="+"
     )
     
     parser.add_argument(
@@ -128,22 +137,31 @@ Examples:
     
     return parser.parse_args()
 
+# Fixed banner for the text report
+RULE = "=" * 60
+TEXT_HEADER = f"{RULE}\nCREWAI COMPLIANCE EXPERTS - ANALYSIS RESULTS\n{RULE}\n"
+
+def _first_unique(csv_path: str, column: str, limit: int = 5) -> List[str]:
+    """Return the first `limit` distinct values of one CSV column, reading only as far as needed."""
+    seen = {}
+    with open(csv_path, newline="") as f:
+        for row in csv.DictReader(f):
+            seen.setdefault(row[column], None)
+            if len(seen) >= limit:
+                break
+    return list(seen)
+
+def _split_targets(values: Optional[List[str]]) -> List[str]:
+    """Flatten nargs='+' target values, splitting any comma-separated ones, in one pass."""
+    return [v.strip() for value in values or () for v in value.split(",") if v.strip()]
+
 def get_default_targets() -> Dict[str, List[str]]:
     """Get default analysis targets from available data."""
     try:
-        import pandas as pd
-        
-        # Get available customers from claims data
-        claims_df = pd.read_csv("claims/claims.csv")
-        available_customers = claims_df["customer_id"].unique().tolist()
-        
-        # Get available wallets from entity mapping
-        entities_df = pd.read_csv("entities/xref_wallets.csv")
-        available_wallets = entities_df["wallet"].unique().tolist()
-        
         return {
-            "customers": available_customers[:5],  # Limit to first 5 for performance
-            "wallets": available_wallets[:5]
+            # Limit to first 5 for performance
+            "customers": _first_unique("claims/claims.csv", "customer_id"),
+            "wallets": _first_unique("entities/xref_wallets.csv", "wallet")
         }
     except Exception as e:
         print(f"Warning: Could not load default targets: {e}")
@@ -152,10 +170,25 @@ def get_default_targets() -> Dict[str, List[str]]:
             "wallets": ["0xabc", "0xdef", "0xghi"]
         }
 
+def _enc(obj: Any) -> Any:
+    """JSON fallback for types neither encoder handles natively (Path, CrewAI objects, ...)."""
+    # Dates come out as ISO 8601 here too, matching what orjson emits natively
+    isoformat = getattr(obj, "isoformat", None)
+    return isoformat() if isoformat is not None else str(obj)
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize to a JSON string (orjson when available, stdlib json otherwise)."""
+    if ORJSON_AVAILABLE:
+        opt = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            opt |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_enc, option=opt).decode()
+    return json.dumps(obj, indent=2 if indent else None, default=_enc)
+
 def format_results(results: Dict[str, Any], format_type: str) -> str:
     """Format analysis results for output."""
     if format_type == "json":
-        return json.dumps(results, indent=2, default=str)
+        return dumps(results, indent=True)
     
     elif format_type == "yaml":
         try:
@@ -163,47 +196,48 @@ def format_results(results: Dict[str, Any], format_type: str) -> str:
             return yaml.dump(results, default_flow_style=False, indent=2)
         except ImportError:
             print("Warning: PyYAML not available, using JSON format")
-            return json.dumps(results, indent=2, default=str)
+            return dumps(results, indent=True)
     
     else:  # text format
-        output = []
-        output.append("=" * 60)
-        output.append("CREWAI COMPLIANCE EXPERTS - ANALYSIS RESULTS")
-        output.append("=" * 60)
+        buf = io.StringIO()
+        w = buf.write
+        w(TEXT_HEADER)
         
         # Execution summary
         status = results.get("execution_status", "unknown")
-        output.append(f"Status: {status.upper()}")
+        w(f"Status: {status.upper()}\n")
         
         if "start_time" in results:
-            output.append(f"Started: {results['start_time']}")
+            w(f"Started: {results['start_time']}\n")
         if "duration_seconds" in results:
-            output.append(f"Duration: {results['duration_seconds']:.2f} seconds")
+            w(f"Duration: {results['duration_seconds']:.2f} seconds\n")
         
         # Input summary
         inputs = results.get("inputs", {})
         if inputs:
-            output.append(f"\nAnalysis Targets:")
-            output.append(f"  Customers: {inputs.get('target_customers', [])}")
-            output.append(f"  Wallets: {inputs.get('target_wallets', [])}")
-            output.append(f"  Case: {inputs.get('case_name', 'Unknown')}")
+            w(f"\nAnalysis Targets:\n"
+              f"  Customers: {inputs.get('target_customers', [])}\n"
+              f"  Wallets: {inputs.get('target_wallets', [])}\n"
+              f"  Case: {inputs.get('case_name', 'Unknown')}\n")
         
         # Task results
         task_results = results.get("task_results", {})
         if task_results:
-            output.append(f"\nTask Results ({len(task_results)} tasks):")
-            for task_name, result in task_results.items():
-                output.append(f"  {task_name}:")
-                output.append(f"    ✓ Completed: {result.get('timestamp', 'Unknown')}")
-                output.append(f"    ✓ Output length: {len(result.get('output', ''))} characters")
-                output.append(f"    ✓ Task ID: {result.get('task_id', 'N/A')}")
+            w(f"\nTask Results ({len(task_results)} tasks):\n")
+            w("".join(
+                f"  {task_name}:\n"
+                f"    ✓ Completed: {result.get('timestamp', 'Unknown')}\n"
+                f"    ✓ Output length: {len(result.get('output', ''))} characters\n"
+                f"    ✓ Task ID: {result.get('task_id', 'N/A')}\n"
+                for task_name, result in task_results.items()
+            ))
         
         # Error information
         if "error" in results:
-            output.append(f"\nError: {results['error']}")
+            w(f"\nError: {results['error']}\n")
         
-        output.append("=" * 60)
-        return "\n".join(output)
+        w(RULE)
+        return buf.getvalue()
 
 def save_results(results: Dict[str, Any], output_dir: str, format_type: str):
     """Save results to files."""
@@ -212,24 +246,36 @@ def save_results(results: Dict[str, Any], output_dir: str, format_type: str):
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Save main results
+    # Encode everything up front so the pool threads only do file writes
     if format_type == "json":
         results_file = output_path / f"analysis_results_{timestamp}.json"
-        with open(results_file, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        if ORJSON_AVAILABLE:
+            # Encoded bytes straight from orjson, skipping the str round trip
+            results_data = orjson.dumps(
+                results, default=_enc,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            )
+        else:
+            results_data = json.dumps(results, indent=2, default=_enc).encode("utf-8")
     else:
         results_file = output_path / f"analysis_results_{timestamp}.txt"
-        with open(results_file, 'w') as f:
-            f.write(format_results(results, "text"))
-    
-    print(f"✓ Results saved to: {results_file}")
+        results_data = format_results(results, "text").encode("utf-8")
     
-    # Save individual task outputs if available
+    # Main results plus individual task outputs if available
+    writes = [(results_file, results_data)]
     task_results = results.get("task_results", {})
     for task_name, result in task_results.items():
         task_file = output_path / f"{task_name}_{timestamp}.md"
-        with open(task_file, 'w') as f:
-            f.write(result.get("output", ""))
+        writes.append((task_file, result.get("output", "").encode("utf-8")))
+    
+    # Independent files, so write them concurrently (file IO releases the GIL)
+    with ThreadPoolExecutor(max_workers=min(8, len(writes))) as pool:
+        futures = [pool.submit(path.write_bytes, data) for path, data in writes]
+        for future in futures:
+            future.result()
+    
+    print(f"✓ Results saved to: {results_file}")
+    for task_file, _ in writes[1:]:
         print(f"✓ Task output saved to: {task_file}")
 
 def print_analysis_plan(customers: List[str], wallets: List[str], dry_run: bool = False):
@@ -263,12 +309,9 @@ def main():
     args = parse_arguments()
     
     # Configure output level
-    if args.quiet:
-        import logging
-        logging.getLogger().setLevel(logging.ERROR)
-    elif args.verbose:
+    if args.quiet or args.verbose:
         import logging
-        logging.getLogger().setLevel(logging.DEBUG)
+        logging.getLogger().setLevel(logging.ERROR if args.quiet else logging.DEBUG)
     
     try:
         # Determine analysis targets
@@ -278,12 +321,8 @@ def main():
             target_wallets = defaults["wallets"]
             print("🔍 Running full analysis with all available data")
         else:
-            target_customers = args.customers.split(",") if args.customers else ["C123"]
-            target_wallets = args.wallets.split(",") if args.wallets else ["0xabc"]
-        
-        # Clean up targets
-        target_customers = [c.strip() for c in target_customers]
-        target_wallets = [w.strip() for w in target_wallets]
+            target_customers = _split_targets(args.customers) or ["C123"]
+            target_wallets = _split_targets(args.wallets) or ["0xabc"]
         
         # Print analysis plan
         print_analysis_plan(target_customers, target_wallets, args.dry_run)
@@ -306,6 +345,8 @@ def main():
         print(f"   Configuration: {args.config_dir}")
         print(f"   Output format: {args.output_format}")
         
+        from crew import run_compliance_analysis
+        
         results = run_compliance_analysis(
             target_customers=target_customers,
             target_wallets=target_wallets,
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tool Server - HTTP access to the compliance tools for the interactive demo
+Imports the tools once at startup and serves JSON requests over keep-alive
+HTTP, so the host never has to spawn docker exec for a read-only call
+
+Routes:
+    GET  /health          -> {"ok": true, "tools": [...]}
+    POST /tool/<name>     body {"args": [...]}           -> {"ok", "result"|"error"}
+    POST /batch           body {"batch": [{"tool", "args"}, ...]} -> {"ok", "results"}
+"""
+
+import os
+import sys
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from worker import load_tools, handle_request
+
+TOOLS = load_tools()
+
+class ToolRequestHandler(BaseHTTPRequestHandler):
+    """JSON request handler dispatching to the worker's tool registry"""
+
+    # HTTP/1.1 so clients can reuse the connection across calls
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json({"ok": True, "tools": sorted(TOOLS)})
+        else:
+            self._send_json({"ok": False, "error": f"Unknown route: {self.path}"}, 404)
+
+    def do_POST(self):
+        try:
+            body = self._read_json()
+        except ValueError as e:
+            self._send_json({"ok": False, "error": f"Invalid request: {e}"}, 400)
+            return
+
+        if self.path.startswith("/tool/"):
+            name = self.path[len("/tool/"):]
+            self._send_json(handle_request(TOOLS, {"tool": name, "args": body.get("args", [])}))
+        elif self.path == "/batch":
+            self._send_json(handle_request(TOOLS, {"batch": body.get("batch", [])}))
+        else:
+            self._send_json({"ok": False, "error": f"Unknown route: {self.path}"}, 404)
+
+    def log_message(self, format, *args):
+        # Keep request logging off stdout
+        sys.stderr.write(f"tool_server: {format % args}\n")
+
+def main():
+    host = os.getenv("TOOL_SERVER_HOST", "0.0.0.0")
+    port = int(os.getenv("TOOL_SERVER_PORT", "9000"))
+
+    server = ThreadingHTTPServer((host, port), ToolRequestHandler)
+    print(f"🛠️  Tool server listening on {host}:{port} ({len(TOOLS)} tools)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -6,72 +6,210 @@ Provides comprehensive logging of agent actions, outputs, and decision trails
 import sqlite3
 import time
 import json
+import queue
+import atexit
+import gzip
 import hashlib
+import threading
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from crewai.tools import tool
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 # Get project root directory
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 AUDIT_DB = PROJECT_ROOT / "audit.db"
 
-def _ensure_audit_tables():
-    """Ensure all audit tables exist with proper schema."""
-    con = sqlite3.connect(AUDIT_DB)
+# Task outputs larger than this are written compressed to AUDIT_OUTPUTS_DIR and
+# referenced by task_audit.output_path instead of being stored inline
+INLINE_OUTPUT_LIMIT = 64 * 1024
+AUDIT_OUTPUTS_DIR = PROJECT_ROOT / "audit_outputs"
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize to a JSON string for a TEXT column or a tool result."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    return json.dumps(obj, indent=2 if indent else None)
+
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+def _iso_sql(column: str) -> str:
+    """SQL expression formatting an epoch-seconds column like datetime.fromtimestamp(ts).isoformat()."""
+    return f"strftime('%Y-%m-%dT%H:%M:%S', {column}, 'unixepoch', 'localtime')"
+
+SCHEMA_DDL = """
+    -- Main task audit table
+    CREATE TABLE IF NOT EXISTS task_audit (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_name TEXT NOT NULL,
+        agent_name TEXT,
+        timestamp INTEGER NOT NULL,
+        duration_seconds REAL,
+        output_text TEXT,
+        output_hash TEXT,
+        status TEXT DEFAULT 'completed',
+        error_message TEXT,
+        metadata TEXT,
+        output_path TEXT
+    );
+    
+    -- Tool usage audit table
+    CREATE TABLE IF NOT EXISTS tool_usage_audit (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER,
+        tool_name TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        input_params TEXT,
+        output_result TEXT,
+        execution_time_ms INTEGER,
+        success BOOLEAN DEFAULT 1,
+        error_message TEXT,
+        FOREIGN KEY (task_id) REFERENCES task_audit(id)
+    );
+    
+    -- Evidence citation tracking
+    CREATE TABLE IF NOT EXISTS evidence_citations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER,
+        citation_text TEXT NOT NULL,
+        source_type TEXT,  -- 'ledger', 'blockchain', 'document', 'xref'
+        source_reference TEXT,
+        confidence_score REAL,
+        timestamp INTEGER NOT NULL,
+        FOREIGN KEY (task_id) REFERENCES task_audit(id)
+    );
     
-    # Main task audit table
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS task_audit (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_name TEXT NOT NULL,
-            agent_name TEXT,
-            timestamp INTEGER NOT NULL,
-            duration_seconds REAL,
-            output_text TEXT,
-            output_hash TEXT,
-            status TEXT DEFAULT 'completed',
-            error_message TEXT,
-            metadata TEXT
-        )
-    """)
+    -- Indexes for the summary (time window), details (task name, task id)
+    -- and integrity (task name, newest first) queries
+    CREATE INDEX IF NOT EXISTS idx_task_audit_ts ON task_audit(timestamp DESC);
+    CREATE INDEX IF NOT EXISTS idx_task_audit_name_ts ON task_audit(task_name, timestamp DESC);
+    CREATE INDEX IF NOT EXISTS idx_tool_usage_taskid ON tool_usage_audit(task_id);
+    CREATE INDEX IF NOT EXISTS idx_tool_usage_ts ON tool_usage_audit(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_citations_taskid ON evidence_citations(task_id);
+    CREATE INDEX IF NOT EXISTS idx_citations_ts_type ON evidence_citations(timestamp, source_type);
+"""
+
+# One connection per process, shared by every caller (including the background
+# writer). Autocommit mode, so single inserts need no BEGIN/COMMIT round trip;
+# the lock keeps one thread's transaction from interleaving with another's.
+_CON: Optional[sqlite3.Connection] = None
+_CON_LOCK = threading.RLock()
+
+def _get_con() -> sqlite3.Connection:
+    """Return the shared audit connection, opening it on first use."""
+    global _CON
+    with _CON_LOCK:
+        if _CON is None:
+            con = sqlite3.connect(AUDIT_DB, check_same_thread=False, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("PRAGMA temp_store=MEMORY")
+            # Rows support both row[0] and row["column"]; dict(row) builds results
+            con.row_factory = sqlite3.Row
+            _CON = con
+            atexit.register(_close_con)
+        return _CON
+
+def _close_con():
+    global _CON, _SCHEMA_READY
+    with _CON_LOCK:
+        if _CON is not None:
+            _CON.close()
+            _CON = None
+            _SCHEMA_READY = False
+
+# Set once SCHEMA_DDL has run on the current connection
+_SCHEMA_READY = False
+
+def _ensure_audit_tables():
+    """Ensure all audit tables exist with proper schema (once per connection)."""
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return
+    with _CON_LOCK:
+        if not _SCHEMA_READY:
+            con = _get_con()
+            con.executescript(SCHEMA_DDL)
+            # Databases created before output_path existed
+            columns = {row[1] for row in con.execute("PRAGMA table_info(task_audit)")}
+            if "output_path" not in columns:
+                con.execute("ALTER TABLE task_audit ADD COLUMN output_path TEXT")
+            _SCHEMA_READY = True
+
+def _write_output_file(output_bytes: bytes, digest_hex: str) -> str:
+    """Write a compressed task output (zstd, else gzip) and return its project-relative path."""
+    AUDIT_OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+    if ZSTD_AVAILABLE:
+        path = AUDIT_OUTPUTS_DIR / f"{digest_hex}.txt.zst"
+        compress = zstandard.ZstdCompressor(level=3).compress
+    else:
+        path = AUDIT_OUTPUTS_DIR / f"{digest_hex}.txt.gz"
+        compress = lambda data: gzip.compress(data, compresslevel=3)
     
-    # Tool usage audit table
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS tool_usage_audit (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER,
-            tool_name TEXT NOT NULL,
-            timestamp INTEGER NOT NULL,
-            input_params TEXT,
-            output_result TEXT,
-            execution_time_ms INTEGER,
-            success BOOLEAN DEFAULT 1,
-            error_message TEXT,
-            FOREIGN KEY (task_id) REFERENCES task_audit(id)
-        )
-    """)
+    # Content-addressed, so a repeated output is written only once
+    if not path.exists():
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(compress(output_bytes))
+        tmp_path.replace(path)
     
-    # Evidence citation tracking
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS evidence_citations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER,
-            citation_text TEXT NOT NULL,
-            source_type TEXT,  -- 'ledger', 'blockchain', 'document', 'xref'
-            source_reference TEXT,
-            confidence_score REAL,
-            timestamp INTEGER NOT NULL,
-            FOREIGN KEY (task_id) REFERENCES task_audit(id)
-        )
-    """)
+    try:
+        return str(path.relative_to(PROJECT_ROOT))
+    except ValueError:
+        return str(path)
+
+def _task_row(task_name: str, output: str, agent_name: str = None,
+              duration: float = None, status: str = "completed",
+              error: str = None, metadata: Dict[str, Any] = None,
+              metadata_bytes: bytes = None) -> tuple:
+    """Build the task_audit row for one log_task() call."""
+    # Generate hash of output for integrity checking. Encode once and keep the
+    # bytes; SHA-256 stays (hardware-accelerated via OpenSSL, and existing rows
+    # remain comparable), and only the 8 retained digest bytes are hex-encoded
+    output_bytes = output.encode("utf-8", "replace")
+    digest = hashlib.sha256(output_bytes).digest()
+    output_hash = digest[:8].hex()
     
-    con.commit()
-    con.close()
+    # Keep small outputs inline; spill large ones to disk in full
+    if len(output_bytes) > INLINE_OUTPUT_LIMIT:
+        output_text, output_path = None, _write_output_file(output_bytes, digest.hex())
+    else:
+        output_text, output_path = output, None
+
+    if metadata_bytes is not None:
+        metadata_json = metadata_bytes.decode("utf-8")
+    else:
+        metadata_json = _dumps(metadata) if metadata else None
+
+    return (
+        task_name, agent_name, int(time.time()), duration,
+        output_text, output_hash, status, error,
+        metadata_json, output_path
+    )
+
+_INSERT_TASK_SQL = """
+    INSERT INTO task_audit 
+    (task_name, agent_name, timestamp, duration_seconds, output_text, 
+     output_hash, status, error_message, metadata, output_path)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
 def log_task(task_name: str, output: str, agent_name: str = None, 
              duration: float = None, status: str = "completed", 
-             error: str = None, metadata: Dict[str, Any] = None) -> int:
+             error: str = None, metadata: Dict[str, Any] = None,
+             metadata_bytes: bytes = None) -> int:
     """
     Log a completed task with its output and metadata.
     
@@ -83,6 +221,8 @@ def log_task(task_name: str, output: str, agent_name: str = None,
         status: Task status ('completed', 'failed', 'partial')
         error: Error message if task failed
         metadata: Additional metadata as dictionary
+        metadata_bytes: Metadata already serialized as UTF-8 JSON (stored as-is,
+            takes precedence over metadata)
     
     Returns:
         Task ID for linking related audit entries
@@ -90,27 +230,11 @@ def log_task(task_name: str, output: str, agent_name: str = None,
     try:
         _ensure_audit_tables()
         
-        # Generate hash of output for integrity checking
-        output_hash = hashlib.sha256(output.encode()).hexdigest()[:16]
+        row = _task_row(task_name, output, agent_name, duration, status,
+                        error, metadata, metadata_bytes)
         
-        # Truncate output if too long (keep first 1MB)
-        truncated_output = output[:1_000_000] if len(output) > 1_000_000 else output
-        
-        con = sqlite3.connect(AUDIT_DB)
-        cursor = con.execute("""
-            INSERT INTO task_audit 
-            (task_name, agent_name, timestamp, duration_seconds, output_text, 
-             output_hash, status, error_message, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            task_name, agent_name, int(time.time()), duration,
-            truncated_output, output_hash, status, error,
-            json.dumps(metadata) if metadata else None
-        ))
-        
-        task_id = cursor.lastrowid
-        con.commit()
-        con.close()
+        with _CON_LOCK:
+            task_id = _get_con().execute(_INSERT_TASK_SQL, row).lastrowid
         
         return task_id
         
@@ -118,12 +242,170 @@ def log_task(task_name: str, output: str, agent_name: str = None,
         print(f"Warning: Could not log task {task_name}: {e}")
         return -1
 
+def log_task_many(entries: List[Dict[str, Any]]) -> List[int]:
+    """
+    Log several tasks in one connection and one transaction.
+    
+    Args:
+        entries: List of log_task() keyword-argument dictionaries
+    
+    Returns:
+        Task IDs in the same order as entries (-1 for each entry that could not
+        be logged; one bad entry does not affect the others)
+    """
+    if not entries:
+        return []
+    
+    task_ids = [-1] * len(entries)
+    rows = []
+    for i, entry in enumerate(entries):
+        try:
+            rows.append((i, _task_row(**entry)))
+        except Exception as e:
+            print(f"Warning: Could not log task {entry.get('task_name')}: {e}")
+    
+    if not rows:
+        return task_ids
+    
+    try:
+        _ensure_audit_tables()
+        
+        with _CON_LOCK:
+            con = _get_con()
+            # lastrowid is needed per row, so execute() each insert inside one
+            # transaction; a failed insert only rolls back its own statement
+            con.execute("BEGIN")
+            try:
+                for i, row in rows:
+                    try:
+                        task_ids[i] = con.execute(_INSERT_TASK_SQL, row).lastrowid
+                    except sqlite3.Error as e:
+                        print(f"Warning: Could not log task {row[0]}: {e}")
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+        
+        return task_ids
+        
+    except Exception as e:
+        print(f"Warning: Could not log {len(rows)} tasks: {e}")
+        return [-1] * len(entries)
+
+_INSERT_TOOL_SQL = """
+    INSERT INTO tool_usage_audit 
+    (task_id, tool_name, timestamp, input_params, output_result,
+     execution_time_ms, success, error_message)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_CITATION_SQL = """
+    INSERT INTO evidence_citations
+    (task_id, citation_text, source_type, source_reference, confidence_score, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+def _insert_rows(rows_by_sql: Dict[str, List[tuple]]):
+    """Insert fire-and-forget rows (no IDs needed) with executemany in one transaction."""
+    try:
+        _ensure_audit_tables()
+        
+        with _CON_LOCK:
+            con = _get_con()
+            con.execute("BEGIN")
+            try:
+                for sql, rows in rows_by_sql.items():
+                    con.executemany(sql, rows)
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+        
+    except Exception as e:
+        count = sum(len(rows) for rows in rows_by_sql.values())
+        print(f"Warning: Could not write {count} audit rows: {e}")
+
+# Background audit writer: callers enqueue (sql, payload, future) records while
+# one thread drains the queue in batches. Task records carry log_task() kwargs
+# and a Future for the task ID; tool usage and citation rows are plain tuples
+# with no Future.
+_AUDIT_QUEUE = queue.Queue(maxsize=10_000)
+_AUDIT_BATCH_SIZE = 256
+_writer_lock = threading.Lock()
+_writer_thread = None
+
+def _audit_writer():
+    """Drain queued audit records, writing up to _AUDIT_BATCH_SIZE per transaction."""
+    while True:
+        batch = [_AUDIT_QUEUE.get()]
+        while len(batch) < _AUDIT_BATCH_SIZE:
+            try:
+                batch.append(_AUDIT_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        
+        tasks = [(payload, future) for _, payload, future in batch if future is not None]
+        if tasks:
+            task_ids = log_task_many([entry for entry, _ in tasks])
+            for (_, future), task_id in zip(tasks, task_ids):
+                future.set_result(task_id)
+        
+        rows_by_sql = {}
+        for sql, payload, future in batch:
+            if future is None:
+                rows_by_sql.setdefault(sql, []).append(payload)
+        if rows_by_sql:
+            _insert_rows(rows_by_sql)
+        
+        for _ in batch:
+            _AUDIT_QUEUE.task_done()
+
+def _ensure_writer():
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None:
+            _writer_thread = threading.Thread(target=_audit_writer, name="audit-writer", daemon=True)
+            _writer_thread.start()
+            atexit.register(flush_audit_log)
+
+def log_task_async(**kwargs) -> Future:
+    """
+    Queue a task record for the background writer instead of writing it inline.
+    
+    Takes the same keyword arguments as log_task(). Blocks only if 10,000 records
+    are already waiting.
+    
+    Returns:
+        Future resolving to the task ID (-1 if the write failed)
+    """
+    _ensure_writer()
+    future = Future()
+    _AUDIT_QUEUE.put((_INSERT_TASK_SQL, kwargs, future))
+    return future
+
+def _enqueue_row(sql: str, row: tuple):
+    """Hand a fire-and-forget row to the background writer without blocking."""
+    _ensure_writer()
+    try:
+        _AUDIT_QUEUE.put_nowait((sql, row, None))
+    except queue.Full:
+        # Writer is backed up; write inline rather than stall the caller
+        _insert_rows({sql: [row]})
+
+def flush_audit_log():
+    """Block until every queued audit record has been written."""
+    if _writer_thread is not None:
+        _AUDIT_QUEUE.join()
+
 def log_tool_usage(task_id: int, tool_name: str, input_params: Dict[str, Any],
                    output_result: str, execution_time_ms: int, 
                    success: bool = True, error: str = None):
     """
     Log tool usage within a task for detailed audit trail.
     
+    The row is queued for the background writer; call flush_audit_log() to
+    wait for it to land.
+    
     Args:
         task_id: ID of the parent task
         tool_name: Name of the tool used
@@ -134,30 +416,19 @@ def log_tool_usage(task_id: int, tool_name: str, input_params: Dict[str, Any],
         error: Error message if tool failed
     """
     try:
-        _ensure_audit_tables()
-        
-        con = sqlite3.connect(AUDIT_DB)
-        con.execute("""
-            INSERT INTO tool_usage_audit 
-            (task_id, tool_name, timestamp, input_params, output_result,
-             execution_time_ms, success, error_message)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        _enqueue_row(_INSERT_TOOL_SQL, (
             task_id, tool_name, int(time.time()),
-            json.dumps(input_params), output_result[:10_000],  # Truncate output
+            _dumps(input_params), output_result[:10_000],  # Truncate output
             execution_time_ms, success, error
         ))
         
-        con.commit()
-        con.close()
-        
     except Exception as e:
         print(f"Warning: Could not log tool usage: {e}")
 
 def log_evidence_citation(task_id: int, citation: str, source_type: str,
                          source_ref: str, confidence: float = None):
     """
-    Log evidence citations for traceability.
+    Log evidence citations for traceability (queued like log_tool_usage).
     
     Args:
         task_id: ID of the parent task
@@ -167,17 +438,8 @@ def log_evidence_citation(task_id: int, citation: str, source_type: str,
         confidence: Confidence score for the citation
     """
     try:
-        _ensure_audit_tables()
-        
-        con = sqlite3.connect(AUDIT_DB)
-        con.execute("""
-            INSERT INTO evidence_citations
-            (task_id, citation_text, source_type, source_reference, confidence_score, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (task_id, citation, source_type, source_ref, confidence, int(time.time())))
-        
-        con.commit()
-        con.close()
+        _enqueue_row(_INSERT_CITATION_SQL,
+                     (task_id, citation, source_type, source_ref, confidence, int(time.time())))
         
     except Exception as e:
         print(f"Warning: Could not log evidence citation: {e}")
@@ -194,18 +456,22 @@ def get_audit_summary(days_back: int = 7) -> str:
         JSON string with audit statistics and recent activity
     """
     try:
+        # Include rows still waiting in the background writer
+        flush_audit_log()
         _ensure_audit_tables()
         
         # Calculate time threshold
         time_threshold = int(time.time()) - (days_back * 24 * 60 * 60)
         
-        con = sqlite3.connect(AUDIT_DB)
+        con = _get_con()
         
         # Get task summary
-        cursor = con.execute("""
+        # Timestamps are formatted by SQLite rather than per row in Python
+        cursor = con.execute(f"""
             SELECT task_name, agent_name, status, COUNT(*) as count,
                    AVG(duration_seconds) as avg_duration,
-                   MAX(timestamp) as last_execution
+                   MAX(timestamp) as last_execution,
+                   {_iso_sql("MAX(timestamp)")} as last_execution_iso
             FROM task_audit
             WHERE timestamp >= ?
             GROUP BY task_name, agent_name, status
@@ -220,7 +486,7 @@ def get_audit_summary(days_back: int = 7) -> str:
                 "status": row[2],
                 "execution_count": row[3],
                 "avg_duration_seconds": round(row[4], 2) if row[4] else None,
-                "last_execution": datetime.fromtimestamp(row[5]).isoformat()
+                "last_execution": row[6]
             })
         
         # Get tool usage summary
@@ -263,8 +529,6 @@ def get_audit_summary(days_back: int = 7) -> str:
                 "avg_confidence": round(row[2], 3) if row[2] else None
             })
         
-        con.close()
-        
         result = {
             "audit_period_days": days_back,
             "audit_timestamp": datetime.now().isoformat(),
@@ -276,7 +540,7 @@ def get_audit_summary(days_back: int = 7) -> str:
             "total_citations": sum([c["citation_count"] for c in citation_summary])
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result, indent=True)
         
     except Exception as e:
         return f"Error generating audit summary: {str(e)}"
@@ -294,87 +558,72 @@ def get_task_details(task_name: str, limit: int = 10) -> str:
         JSON string with task execution details and related tool usage
     """
     try:
+        # Include rows still waiting in the background writer
+        flush_audit_log()
         _ensure_audit_tables()
         
-        con = sqlite3.connect(AUDIT_DB)
+        con = _get_con()
         
-        # Get recent task executions
-        cursor = con.execute("""
-            SELECT id, agent_name, timestamp, duration_seconds, status, 
-                   error_message, metadata, output_hash
+        # Get recent task executions (sqlite3.Row, so columns are aliased to
+        # the output keys and each row converts with dict())
+        cursor = con.execute(f"""
+            SELECT id AS task_id, agent_name, {_iso_sql("timestamp")} AS timestamp,
+                   duration_seconds, status, error_message, metadata, output_hash,
+                   output_path
             FROM task_audit
             WHERE task_name = ?
-            ORDER BY timestamp DESC
+            ORDER BY task_audit.timestamp DESC
             LIMIT ?
         """, (task_name, limit))
         
-        executions = []
-        task_ids = []
-        
-        for row in cursor.fetchall():
-            task_id = row[0]
-            task_ids.append(task_id)
-            
-            executions.append({
-                "task_id": task_id,
-                "agent_name": row[1],
-                "timestamp": datetime.fromtimestamp(row[2]).isoformat(),
-                "duration_seconds": row[3],
-                "status": row[4],
-                "error_message": row[5],
-                "metadata": json.loads(row[6]) if row[6] else None,
-                "output_hash": row[7]
-            })
+        executions = [dict(row) for row in cursor.fetchall()]
+        task_ids = [execution["task_id"] for execution in executions]
+        for execution in executions:
+            execution["metadata"] = _loads(execution["metadata"]) if execution["metadata"] else None
         
-        # Get tool usage for these tasks
+        # Get tool usage and citations for these tasks in one query; the kind
+        # column says which table each row came from
+        tool_usage = []
+        citations = []
         if task_ids:
             placeholders = ",".join(["?"] * len(task_ids))
             cursor = con.execute(f"""
-                SELECT task_id, tool_name, timestamp, input_params, 
-                       execution_time_ms, success, error_message
+                SELECT 'tool' AS kind, task_id, tool_name AS name, timestamp,
+                       {_iso_sql("timestamp")} AS ts_iso,
+                       input_params AS a, execution_time_ms AS b, success AS c,
+                       error_message
                 FROM tool_usage_audit
                 WHERE task_id IN ({placeholders})
-                ORDER BY timestamp DESC
-            """, task_ids)
-            
-            tool_usage = []
-            for row in cursor.fetchall():
-                tool_usage.append({
-                    "task_id": row[0],
-                    "tool_name": row[1],
-                    "timestamp": datetime.fromtimestamp(row[2]).isoformat(),
-                    "input_params": json.loads(row[3]) if row[3] else None,
-                    "execution_time_ms": row[4],
-                    "success": bool(row[5]),
-                    "error_message": row[6]
-                })
-        else:
-            tool_usage = []
-        
-        # Get citations for these tasks
-        if task_ids:
-            cursor = con.execute(f"""
-                SELECT task_id, citation_text, source_type, source_reference, 
-                       confidence_score, timestamp
+                UNION ALL
+                SELECT 'cite' AS kind, task_id, citation_text, timestamp,
+                       {_iso_sql("timestamp")},
+                       source_type, source_reference, confidence_score,
+                       NULL
                 FROM evidence_citations
                 WHERE task_id IN ({placeholders})
                 ORDER BY timestamp DESC
-            """, task_ids)
+            """, task_ids + task_ids)
             
-            citations = []
-            for row in cursor.fetchall():
-                citations.append({
-                    "task_id": row[0],
-                    "citation_text": row[1],
-                    "source_type": row[2],
-                    "source_reference": row[3],
-                    "confidence_score": row[4],
-                    "timestamp": datetime.fromtimestamp(row[5]).isoformat()
-                })
-        else:
-            citations = []
-        
-        con.close()
+            for kind, task_id, name, _, ts_iso, a, b, c, error_message in cursor.fetchall():
+                if kind == "tool":
+                    tool_usage.append({
+                        "task_id": task_id,
+                        "tool_name": name,
+                        "timestamp": ts_iso,
+                        "input_params": _loads(a) if a else None,
+                        "execution_time_ms": b,
+                        "success": bool(c),
+                        "error_message": error_message
+                    })
+                else:
+                    citations.append({
+                        "task_id": task_id,
+                        "citation_text": name,
+                        "source_type": a,
+                        "source_reference": b,
+                        "confidence_score": c,
+                        "timestamp": ts_iso
+                    })
         
         result = {
             "task_name": task_name,
@@ -384,7 +633,7 @@ def get_task_details(task_name: str, limit: int = 10) -> str:
             "evidence_citations": citations
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result, indent=True)
         
     except Exception as e:
         return f"Error getting task details: {str(e)}"
@@ -402,59 +651,56 @@ def validate_output_integrity(task_name: str, expected_hash: str = None) -> str:
         JSON string with integrity check results
     """
     try:
+        # Include rows still waiting in the background writer
+        flush_audit_log()
         _ensure_audit_tables()
         
-        con = sqlite3.connect(AUDIT_DB)
-        
-        # Get recent executions with their hashes
-        cursor = con.execute("""
-            SELECT id, timestamp, output_hash, status
-            FROM task_audit
-            WHERE task_name = ?
-            ORDER BY timestamp DESC
-            LIMIT 5
-        """, (task_name,))
-        
-        executions = cursor.fetchall()
-        con.close()
+        con = _get_con()
         
-        if not executions:
+        # Get recent executions with their hashes; SQLite also does the
+        # expected-hash comparison and the distinct-hash count over those rows
+        cursor = con.execute(f"""
+            WITH recent AS (
+                SELECT id, timestamp, output_hash, status
+                FROM task_audit
+                WHERE task_name = ?
+                ORDER BY timestamp DESC
+                LIMIT 5
+            )
+            SELECT id AS task_id, {_iso_sql("timestamp")} AS timestamp,
+                   output_hash, status,
+                   COALESCE(output_hash = ?, 0) AS hash_match,
+                   (SELECT COUNT(DISTINCT output_hash) FROM recent) AS unique_cnt
+            FROM recent
+            ORDER BY recent.timestamp DESC
+        """, (task_name, expected_hash or ""))
+        
+        integrity_results = [dict(row) for row in cursor.fetchall()]
+        
+        if not integrity_results:
             return f"No audit records found for task: {task_name}"
         
-        # Check for consistency across executions
-        hashes = [row[2] for row in executions if row[2]]
-        unique_hashes = set(hashes)
-        
-        integrity_results = []
-        for row in executions:
-            task_id, timestamp, output_hash, status = row
-            
-            result = {
-                "task_id": task_id,
-                "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
-                "output_hash": output_hash,
-                "status": status
-            }
-            
+        unique_count = integrity_results[0]["unique_cnt"]
+        for result in integrity_results:
+            del result["unique_cnt"]
             if expected_hash:
-                result["hash_match"] = output_hash == expected_hash
-            
-            integrity_results.append(result)
+                result["hash_match"] = bool(result["hash_match"])
+            else:
+                del result["hash_match"]
         
         summary = {
             "task_name": task_name,
-            "total_executions_checked": len(executions),
-            "unique_output_hashes": len(unique_hashes),
-            "output_consistency": len(unique_hashes) <= 1,  # All outputs same
+            "total_executions_checked": len(integrity_results),
+            "unique_output_hashes": unique_count,
+            "output_consistency": unique_count <= 1,  # All outputs same
             "expected_hash_provided": expected_hash is not None,
             "integrity_results": integrity_results
         }
         
         if expected_hash:
-            matching_count = sum(1 for r in integrity_results if r.get("hash_match", False))
-            summary["expected_hash_matches"] = matching_count
+            summary["expected_hash_matches"] = sum(r["hash_match"] for r in integrity_results)
         
-        return json.dumps(summary, indent=2)
+        return _dumps(summary, indent=True)
         
     except Exception as e:
         return f"Error validating output integrity: {str(e)}"
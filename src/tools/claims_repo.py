@@ -3,50 +3,233 @@ Claims Repository Tool - CRUD operations for customer claims data
 Manages customer claims, reconciliation status, and claim verification
 """
 
+import numpy as np
 import pandas as pd
 import sqlite3
+import atexit
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from crewai.tools import tool
 import json
 from datetime import datetime
 
+try:
+    import pyarrow as pa  # also enables pandas' multithreaded CSV engine
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Get project root directory
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 CLAIMS_FILE = PROJECT_ROOT / "claims" / "claims.csv"
 AUDIT_DB = PROJECT_ROOT / "audit.db"
 
-def _ensure_audit_db():
-    """Ensure audit database exists with claims tracking table."""
-    con = sqlite3.connect(AUDIT_DB)
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS claims_audit (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            claim_id TEXT,
-            action TEXT,
-            old_status TEXT,
-            new_status TEXT,
-            timestamp TEXT,
-            notes TEXT
-        )
-    """)
-    con.commit()
-    con.close()
+# Claims live in a `claims` table in audit.db, next to claims_audit, so a status
+# update and its audit row commit together. claims.csv is the seed: the table is
+# (re)imported from it whenever the file's mtime differs from the last import,
+# which replaces any status updates made since.
+CLAIM_COLUMNS = "claim_id, customer_id, asserted_asset, asserted_amount, priority, status, notes"
 
-def _log_claim_action(claim_id: str, action: str, old_status: str = None, new_status: str = None, notes: str = None):
-    """Log claim actions to audit database."""
-    try:
-        _ensure_audit_db()
-        con = sqlite3.connect(AUDIT_DB)
-        timestamp = datetime.now().isoformat()
-        con.execute("""
-            INSERT INTO claims_audit (claim_id, action, old_status, new_status, timestamp, notes)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (claim_id, action, old_status, new_status, timestamp, notes))
-        con.commit()
-        con.close()
-    except Exception as e:
-        print(f"Warning: Could not log claim action: {e}")
+CLAIMS_DDL = """
+    CREATE TABLE IF NOT EXISTS claims (
+        claim_id TEXT PRIMARY KEY,
+        customer_id TEXT,
+        asserted_asset TEXT,
+        asserted_amount REAL,
+        priority TEXT,
+        status TEXT,
+        notes TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_claims_customer ON claims(customer_id);
+    CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status);
+    CREATE INDEX IF NOT EXISTS idx_claims_asset ON claims(asserted_asset);
+    
+    -- Bumped on every change to claims (from any connection); keys the
+    -- DataFrame cache, which audit-log commits to this file must not invalidate
+    CREATE TABLE IF NOT EXISTS claims_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO claims_version (id, version) VALUES (1, 0);
+    CREATE TRIGGER IF NOT EXISTS claims_version_insert AFTER INSERT ON claims BEGIN
+        UPDATE claims_version SET version = version + 1 WHERE id = 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS claims_version_update AFTER UPDATE ON claims BEGIN
+        UPDATE claims_version SET version = version + 1 WHERE id = 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS claims_version_delete AFTER DELETE ON claims BEGIN
+        UPDATE claims_version SET version = version + 1 WHERE id = 1;
+    END;
+    
+    -- claims.csv mtime at the last import
+    CREATE TABLE IF NOT EXISTS claims_seed (
+        source TEXT PRIMARY KEY,
+        mtime_ns INTEGER
+    );
+    
+    CREATE TABLE IF NOT EXISTS claims_audit (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        claim_id TEXT,
+        action TEXT,
+        old_status TEXT,
+        new_status TEXT,
+        timestamp TEXT,
+        notes TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_claims_audit_claim ON claims_audit(claim_id, timestamp);
+    CREATE INDEX IF NOT EXISTS idx_claims_audit_timestamp ON claims_audit(timestamp);
+"""
+
+# Trigram full-text index over claim notes for search_claims (case-insensitive
+# substring matching). External content: rebuilt after each import, and kept in
+# step with notes edits by the trigger.
+CLAIMS_FTS_DDL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS claims_fts USING fts5(
+        notes, content='claims', content_rowid='rowid', tokenize='trigram'
+    );
+    CREATE TRIGGER IF NOT EXISTS claims_fts_update AFTER UPDATE OF notes ON claims BEGIN
+        INSERT INTO claims_fts(claims_fts, rowid, notes) VALUES ('delete', old.rowid, old.notes);
+        INSERT INTO claims_fts(rowid, notes) VALUES (new.rowid, new.notes);
+    END;
+"""
+
+# Trigrams need at least 3 characters; shorter terms scan the DataFrame instead
+FTS_MIN_TERM_LENGTH = 3
+
+_INSERT_CLAIM_ACTION_SQL = """
+    INSERT INTO claims_audit (claim_id, action, old_status, new_status, timestamp, notes)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Shared autocommit connection; writes that span statements hold the lock
+_CON: Optional[sqlite3.Connection] = None
+_CON_LOCK = threading.RLock()
+_FTS_AVAILABLE = False
+
+def _get_con() -> sqlite3.Connection:
+    """Return the shared claims connection, creating the schema on first use."""
+    global _CON, _FTS_AVAILABLE
+    with _CON_LOCK:
+        if _CON is None:
+            con = sqlite3.connect(AUDIT_DB, check_same_thread=False, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("PRAGMA temp_store=MEMORY")
+            con.row_factory = sqlite3.Row
+            con.executescript(CLAIMS_DDL)
+            try:
+                con.executescript(CLAIMS_FTS_DDL)
+                _FTS_AVAILABLE = True
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5, or older than 3.34 (no trigram tokenizer)
+                print(f"Warning: Claims full-text index unavailable, searching without it: {e}")
+                _FTS_AVAILABLE = False
+            _CON = con
+            atexit.register(_close_con)
+        return _CON
+
+def _close_con():
+    global _CON
+    with _CON_LOCK:
+        if _CON is not None:
+            _CON.close()
+            _CON = None
+
+def _ensure_claims_db() -> sqlite3.Connection:
+    """Return the claims connection, importing claims.csv first if it changed since the last import."""
+    con = _get_con()
+    mtime = CLAIMS_FILE.stat().st_mtime_ns
+    source = str(CLAIMS_FILE)
+    seeded = con.execute("SELECT mtime_ns FROM claims_seed WHERE source = ?", (source,)).fetchone()
+    if seeded is not None and seeded[0] == mtime:
+        return con
+    
+    df = pd.read_csv(CLAIMS_FILE, engine="pyarrow") if PYARROW_AVAILABLE else pd.read_csv(CLAIMS_FILE)
+    rows = _rows(df[CLAIM_COLUMNS.split(", ")])
+    with _CON_LOCK:
+        con.execute("BEGIN")
+        try:
+            con.execute("DELETE FROM claims")
+            con.executemany(f"INSERT INTO claims ({CLAIM_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            if _FTS_AVAILABLE:
+                con.execute("INSERT INTO claims_fts(claims_fts) VALUES ('rebuild')")
+            con.execute("INSERT OR REPLACE INTO claims_seed (source, mtime_ns) VALUES (?, ?)", (source, mtime))
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+    return con
+
+# Low-cardinality columns loaded as categoricals (smaller, and == masks compare codes)
+CATEGORY_COLUMNS = ["customer_id", "asserted_asset", "priority", "status"]
+
+# (database, claims_version, DataFrame) of the last load from the claims table
+_CACHED_DF: Optional[tuple] = None
+
+def _get_df() -> pd.DataFrame:
+    """
+    Return the claims DataFrame, re-reading the claims table only after it changes.
+    
+    The frame is shared between calls, so callers must not modify it in place.
+    """
+    global _CACHED_DF
+    con = _ensure_claims_db()
+    version = con.execute("SELECT version FROM claims_version WHERE id = 1").fetchone()[0]
+    cached = _CACHED_DF
+    if cached is None or cached[0] != AUDIT_DB or cached[1] != version:
+        df = pd.read_sql_query(f"SELECT {CLAIM_COLUMNS} FROM claims ORDER BY rowid", con)
+        df = df.astype({col: "category" for col in CATEGORY_COLUMNS if col in df.columns})
+        cached = _CACHED_DF = (AUDIT_DB, version, df)
+    return cached[2]
+
+def _json_default(obj: Any) -> Any:
+    """json.dumps fallback for NumPy scalars and timestamps (orjson handles these natively)."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result as compact JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, default=_json_default)
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """df.to_dict('records') with missing values as None; built through Arrow when available."""
+    if PYARROW_AVAILABLE:
+        return pa.Table.from_pandas(df, preserve_index=False).to_pylist()
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def _rows(df: pd.DataFrame):
+    """Row tuples for executemany, missing values as None; zipped from Arrow columns when available."""
+    if PYARROW_AVAILABLE:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        return zip(*(column.to_pylist() for column in table.columns))
+    return df.astype(object).where(df.notna(), None).itertuples(index=False)
+
+def _eq_mask(series: pd.Series, value: str) -> np.ndarray:
+    """Boolean NumPy mask of series == value; compares category codes for categoricals."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        code = series.cat.categories.get_indexer([value])[0]
+        if code < 0:
+            return np.zeros(len(series), dtype=bool)
+        return series.cat.codes.to_numpy() == code
+    return series.to_numpy() == value
+
+def _counts(series: pd.Series) -> Dict[str, int]:
+    """value_counts() as a dict, leaving out unobserved categories."""
+    return {key: count for key, count in series.value_counts().to_dict().items() if count}
 
 @tool("list_open_claims")
 def list_open_claims(customer_id: str = None, asset: str = None) -> str:
@@ -64,19 +247,21 @@ def list_open_claims(customer_id: str = None, asset: str = None) -> str:
         if not CLAIMS_FILE.exists():
             return "Claims file not found"
         
-        df = pd.read_csv(CLAIMS_FILE)
-        
-        # Filter to unreconciled claims
-        open_claims = df[df["status"] == "unreconciled"].copy()
+        con = _ensure_claims_db()
         
-        # Apply additional filters if provided
+        # Filter to unreconciled claims, plus any additional filters provided
+        query = f"SELECT {CLAIM_COLUMNS} FROM claims WHERE status = 'unreconciled'"
+        params = []
         if customer_id:
-            open_claims = open_claims[open_claims["customer_id"] == customer_id]
-        
+            query += " AND customer_id = ?"
+            params.append(customer_id)
         if asset:
-            open_claims = open_claims[open_claims["asserted_asset"] == asset]
+            query += " AND asserted_asset = ?"
+            params.append(asset)
         
-        if open_claims.empty:
+        open_claims = [dict(row) for row in con.execute(query + " ORDER BY rowid", params)]
+        
+        if not open_claims:
             filter_desc = ""
             if customer_id and asset:
                 filter_desc = f" for customer {customer_id} and asset {asset}"
@@ -89,12 +274,12 @@ def list_open_claims(customer_id: str = None, asset: str = None) -> str:
         
         result = {
             "total_open_claims": len(open_claims),
-            "unique_customers": open_claims["customer_id"].nunique(),
-            "assets_involved": open_claims["asserted_asset"].unique().tolist(),
-            "claims": open_claims.to_dict('records')
+            "unique_customers": len({claim["customer_id"] for claim in open_claims}),
+            "assets_involved": list(dict.fromkeys(claim["asserted_asset"] for claim in open_claims)),
+            "claims": open_claims
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error listing open claims: {str(e)}"
@@ -114,35 +299,37 @@ def get_claim_details(claim_id: str) -> str:
         if not CLAIMS_FILE.exists():
             return "Claims file not found"
         
-        df = pd.read_csv(CLAIMS_FILE)
-        claim = df[df["claim_id"] == claim_id]
+        con = _ensure_claims_db()
         
-        if claim.empty:
-            return f"Claim {claim_id} not found"
+        # The claim and the rest of its customer's claims in one pass: a
+        # primary-key lookup for the customer, then the customer index
+        customer_rows = [dict(row) for row in con.execute(f"""
+            SELECT {CLAIM_COLUMNS} FROM claims
+            WHERE customer_id = (SELECT customer_id FROM claims WHERE claim_id = ?)
+            ORDER BY rowid
+        """, (claim_id,))]
+        claim_data = next((row for row in customer_rows if row["claim_id"] == claim_id), None)
         
-        claim_data = claim.iloc[0].to_dict()
+        if claim_data is None:
+            # Not found (a claim with a NULL customer_id matches no rows above)
+            claim = con.execute(f"SELECT {CLAIM_COLUMNS} FROM claims WHERE claim_id = ?", (claim_id,)).fetchone()
+            if claim is None:
+                return f"Claim {claim_id} not found"
+            claim_data = dict(claim)
         
         # Get audit history for this claim
         try:
-            con = sqlite3.connect(AUDIT_DB)
-            audit_query = """
+            audit_history = [dict(row) for row in con.execute("""
                 SELECT action, old_status, new_status, timestamp, notes
                 FROM claims_audit 
                 WHERE claim_id = ?
                 ORDER BY timestamp DESC
-            """
-            audit_df = pd.read_sql_query(audit_query, con, params=[claim_id])
-            con.close()
-            audit_history = audit_df.to_dict('records') if not audit_df.empty else []
-        except:
+            """, (claim_id,))]
+        except sqlite3.Error:
             audit_history = []
         
         # Get other claims from same customer
-        customer_id = claim_data["customer_id"]
-        other_claims = df[
-            (df["customer_id"] == customer_id) & 
-            (df["claim_id"] != claim_id)
-        ].to_dict('records')
+        other_claims = [row for row in customer_rows if row["claim_id"] != claim_id]
         
         result = {
             "claim_details": claim_data,
@@ -150,7 +337,7 @@ def get_claim_details(claim_id: str) -> str:
             "other_claims_same_customer": other_claims
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error getting claim details: {str(e)}"
@@ -172,23 +359,29 @@ def update_claim_status(claim_id: str, new_status: str, notes: str = None) -> st
         if not CLAIMS_FILE.exists():
             return "Claims file not found"
         
-        df = pd.read_csv(CLAIMS_FILE)
-        claim_mask = df["claim_id"] == claim_id
-        
-        if not claim_mask.any():
-            return f"Claim {claim_id} not found"
-        
-        # Get old status for audit
-        old_status = df.loc[claim_mask, "status"].iloc[0]
-        
-        # Update status
-        df.loc[claim_mask, "status"] = new_status
-        
-        # Save updated claims file
-        df.to_csv(CLAIMS_FILE, index=False)
-        
-        # Log the action
-        _log_claim_action(claim_id, "status_update", old_status, new_status, notes)
+        con = _ensure_claims_db()
+        
+        # Update the row and write its audit entry in one transaction
+        with _CON_LOCK:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                row = con.execute("SELECT status FROM claims WHERE claim_id = ?", (claim_id,)).fetchone()
+                if row is None:
+                    con.execute("ROLLBACK")
+                    return f"Claim {claim_id} not found"
+                
+                # Get old status for audit
+                old_status = row[0]
+                
+                con.execute("UPDATE claims SET status = ? WHERE claim_id = ?", (new_status, claim_id))
+                con.execute(_INSERT_CLAIM_ACTION_SQL, (
+                    claim_id, "status_update", old_status, new_status,
+                    datetime.now().isoformat(), notes
+                ))
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
         
         result = {
             "claim_id": claim_id,
@@ -199,7 +392,7 @@ def update_claim_status(claim_id: str, new_status: str, notes: str = None) -> st
             "success": True
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error updating claim status: {str(e)}"
@@ -219,16 +412,28 @@ def claims_by_customer(customer_id: str) -> str:
         if not CLAIMS_FILE.exists():
             return "Claims file not found"
         
-        df = pd.read_csv(CLAIMS_FILE)
-        customer_claims = df[df["customer_id"] == customer_id]
-        
-        if customer_claims.empty:
-            return f"No claims found for customer {customer_id}"
+        con = _ensure_claims_db()
         
-        # Calculate summary statistics
-        total_claimed_by_asset = customer_claims.groupby("asserted_asset")["asserted_amount"].sum().to_dict()
-        status_counts = customer_claims["status"].value_counts().to_dict()
-        priority_counts = customer_claims["priority"].value_counts().to_dict()
+        with _CON_LOCK:
+            customer_claims = [dict(row) for row in con.execute(
+                f"SELECT {CLAIM_COLUMNS} FROM claims WHERE customer_id = ? ORDER BY rowid", (customer_id,)
+            )]
+            
+            if not customer_claims:
+                return f"No claims found for customer {customer_id}"
+            
+            # Calculate summary statistics (aggregated by SQLite, on the customer index)
+            total_claimed_by_asset = dict(con.execute("""
+                SELECT asserted_asset, SUM(asserted_amount) FROM claims
+                WHERE customer_id = ? GROUP BY asserted_asset ORDER BY asserted_asset
+            """, (customer_id,)).fetchall())
+            status_counts, priority_counts = (
+                dict(con.execute(f"""
+                    SELECT {column}, COUNT(*) FROM claims
+                    WHERE customer_id = ? GROUP BY {column} ORDER BY COUNT(*) DESC, {column}
+                """, (customer_id,)).fetchall())
+                for column in ("status", "priority")
+            )
         
         result = {
             "customer_id": customer_id,
@@ -236,10 +441,10 @@ def claims_by_customer(customer_id: str) -> str:
             "total_claimed_by_asset": total_claimed_by_asset,
             "status_breakdown": status_counts,
             "priority_breakdown": priority_counts,
-            "claims": customer_claims.to_dict('records')
+            "claims": customer_claims
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error getting claims for customer: {str(e)}"
@@ -256,42 +461,40 @@ def claims_reconciliation_summary() -> str:
         if not CLAIMS_FILE.exists():
             return "Claims file not found"
         
-        df = pd.read_csv(CLAIMS_FILE)
+        df = _get_df()
         
         # Overall statistics
         total_claims = len(df)
-        status_counts = df["status"].value_counts().to_dict()
-        priority_counts = df["priority"].value_counts().to_dict()
+        status_counts = _counts(df["status"])
+        priority_counts = _counts(df["priority"])
         
-        # Asset breakdown
-        asset_summary = df.groupby("asserted_asset").agg({
-            "asserted_amount": ["sum", "count"],
-            "status": lambda x: (x == "unreconciled").sum()
-        }).round(6)
+        # Boolean flag column, so the unreconciled counts use pandas' built-in sum
+        # instead of a Python lambda per group
+        df = df.assign(is_unrec=_eq_mask(df["status"], "unreconciled"))
         
-        # Flatten column names
-        asset_summary.columns = ["total_amount", "claim_count", "unreconciled_count"]
+        # Asset breakdown
+        asset_summary = df.groupby("asserted_asset", observed=True).agg(
+            total_amount=("asserted_amount", "sum"),
+            claim_count=("asserted_amount", "count"),
+            unreconciled_count=("is_unrec", "sum")
+        ).round(6)
         asset_breakdown = asset_summary.to_dict('index')
         
         # Customer breakdown
-        customer_summary = df.groupby("customer_id").agg({
-            "claim_id": "count",
-            "status": lambda x: (x == "unreconciled").sum()
-        })
-        customer_summary.columns = ["total_claims", "unreconciled_claims"]
+        customer_summary = df.groupby("customer_id", observed=True).agg(
+            total_claims=("claim_id", "count"),
+            unreconciled_claims=("is_unrec", "sum")
+        )
         customer_breakdown = customer_summary.to_dict('index')
         
         # Get recent audit activity
         try:
-            con = sqlite3.connect(AUDIT_DB)
-            recent_activity = pd.read_sql_query("""
+            recent_activity_list = [dict(row) for row in _get_con().execute("""
                 SELECT claim_id, action, old_status, new_status, timestamp
                 FROM claims_audit 
                 ORDER BY timestamp DESC 
                 LIMIT 10
-            """, con)
-            con.close()
-            recent_activity_list = recent_activity.to_dict('records') if not recent_activity.empty else []
+            """)]
         except:
             recent_activity_list = []
         
@@ -307,7 +510,7 @@ def claims_reconciliation_summary() -> str:
             "recent_activity": recent_activity_list
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error generating reconciliation summary: {str(e)}"
@@ -327,23 +530,34 @@ def search_claims(search_term: str) -> str:
         if not CLAIMS_FILE.exists():
             return "Claims file not found"
         
-        df = pd.read_csv(CLAIMS_FILE)
+        con = _ensure_claims_db()
         
         # Search in notes field (case-insensitive)
-        mask = df["notes"].str.contains(search_term, case=False, na=False)
-        
-        matching_claims = df[mask]
-        
-        if matching_claims.empty:
+        if _FTS_AVAILABLE and len(search_term) >= FTS_MIN_TERM_LENGTH:
+            # Quoted as one phrase, so the term matches as a literal substring
+            phrase = '"' + search_term.replace('"', '""') + '"'
+            matching_claims = [dict(row) for row in con.execute(f"""
+                SELECT {", ".join("c." + col for col in CLAIM_COLUMNS.split(", "))}
+                FROM claims_fts JOIN claims AS c ON c.rowid = claims_fts.rowid
+                WHERE claims_fts MATCH ?
+                ORDER BY c.rowid
+            """, (phrase,))]
+        else:
+            df = _get_df()
+            # Literal substring, like the FTS phrase match above
+            mask = df["notes"].str.contains(search_term, case=False, na=False, regex=False).to_numpy()
+            matching_claims = _records(df.iloc[np.flatnonzero(mask)])
+        
+        if not matching_claims:
             return f"No claims found matching '{search_term}'"
         
         result = {
             "search_term": search_term,
             "matches_found": len(matching_claims),
-            "matching_claims": matching_claims.to_dict('records')
+            "matching_claims": matching_claims
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error searching claims: {str(e)}"
@@ -359,7 +573,7 @@ def get_claims_dataframe() -> pd.DataFrame:
     try:
         if not CLAIMS_FILE.exists():
             return pd.DataFrame()
-        return pd.read_csv(CLAIMS_FILE)
+        return _get_df().copy()
     except Exception as e:
         print(f"Error loading claims data: {e}")
         return pd.DataFrame()
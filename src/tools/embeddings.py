@@ -0,0 +1,103 @@
+"""
+Embedding Model Loader - shared by the RAG indexer and the rag_search tool
+Both sides must embed with the same model and backend, so they load it here
+"""
+
+import os
+import platform
+from pathlib import Path
+
+try:
+    from dotenv import load_dotenv
+    DOTENV_AVAILABLE = True
+except ImportError:
+    DOTENV_AVAILABLE = False
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# Quantized exports shipped in the model repo, one per CPU instruction set
+ONNX_INT8_FILES = {
+    "avx512_vnni": "onnx/model_qint8_avx512_vnni.onnx",
+    "avx512": "onnx/model_qint8_avx512.onnx",
+    "avx2": "onnx/model_quint8_avx2.onnx",
+    "arm64": "onnx/model_qint8_arm64.onnx",
+}
+# MiniLM's trained length; set explicitly so inputs are never padded past it
+MAX_SEQ_LENGTH = 256
+
+def ensure_env():
+    """Load the project .env once per process (and never when the parent already did)."""
+    if DOTENV_AVAILABLE and not os.environ.get("_CREW_ENV_LOADED"):
+        load_dotenv(PROJECT_ROOT / ".env")
+        os.environ["_CREW_ENV_LOADED"] = "1"
+
+def embedding_model_name() -> str:
+    """EMBEDDING_MODEL from the environment or .env, read when the model is loaded."""
+    ensure_env()
+    return os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+
+def embedding_backend() -> str:
+    """
+    EMBEDDING_BACKEND from the environment or .env: "torch" (default) or
+    "onnx-int8", the dynamically quantized ONNX export that ships with
+    all-MiniLM-L6-v2 (needs sentence-transformers>=3.2 and optimum[onnxruntime]).
+    Re-run initialize_rag_db.py after switching.
+    """
+    ensure_env()
+    return os.getenv("EMBEDDING_BACKEND", "torch").lower()
+
+def embedding_device() -> str:
+    """Encode on the GPU when torch can see one."""
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+def onnx_int8_file() -> str:
+    """Pick the quantized ONNX export whose int8 kernels this CPU supports."""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return ONNX_INT8_FILES["arm64"]
+    flags = set()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    flags = set(line.split(":", 1)[1].split())
+                    break
+    except OSError:
+        pass
+    if "avx512_vnni" in flags:
+        return ONNX_INT8_FILES["avx512_vnni"]
+    if "avx512f" in flags:
+        return ONNX_INT8_FILES["avx512"]
+    return ONNX_INT8_FILES["avx2"]
+
+def load_embedding_model():
+    """
+    Load the SentenceTransformer model for the configured backend.
+
+    Returns:
+        (model, description) - description names the backend/device for logging
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model_name = embedding_model_name()
+    if embedding_backend() == "onnx-int8":
+        onnx_file = onnx_int8_file()
+        try:
+            model = SentenceTransformer(
+                model_name, backend="onnx", model_kwargs={"file_name": onnx_file}
+            )
+            model.max_seq_length = MAX_SEQ_LENGTH
+            return model, f"onnx-int8 ({onnx_file})"
+        except Exception as e:
+            print(f"Warning: ONNX int8 embedding backend unavailable, using torch: {e}")
+
+    device = embedding_device()
+    model = SentenceTransformer(model_name, device=device)
+    model.max_seq_length = MAX_SEQ_LENGTH
+    if device == "cuda":
+        # FP16 weights: half the memory traffic, tensor-core matmuls
+        model.half()
+    return model, device
@@ -5,8 +5,12 @@ This script needs to be run once to populate the RAG database.
 """
 
 import os
+import re
 import sys
-import json
+import hashlib
+import sqlite3
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any
 
@@ -23,17 +27,38 @@ except ImportError as e:
     DEPENDENCIES_AVAILABLE = False
     sys.exit(1)
 
+import numpy as np
+
+from tools.embeddings import embedding_model_name, load_embedding_model
+
 # Configuration
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 CHROMA_DIR = PROJECT_ROOT / ".chroma"
 KNOWLEDGE_DIRS = ["knowledge", "policies", "catalogs"]
 COLLECTION_NAME = "knowledge_base"
+# Chunk embeddings from earlier runs, kept beside the collection (which is
+# recreated on every run) so unchanged chunks are not re-encoded
+EMBEDDING_CACHE_DB = CHROMA_DIR / "embedding_cache.db"
+EMBEDDING_BATCH_SIZE = 64
+ADD_BATCH_SIZE = 1000
+# How far back from a chunk's end to look for a sentence/paragraph break
+BREAK_LOOKBACK = 100
+PERIOD_RE = re.compile(r'\.')
+# Zero-width so overlapping matches ("\n\n\n") are all found, like str.rfind
+PARAGRAPH_RE = re.compile(r'(?=\n\n)')
+# Any line starting with '#' is a markdown heading
+HEADING_RE = re.compile(r'^#.*$', re.MULTILINE)
 
 def chunk_document(content: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
     """Split document into overlapping chunks for better semantic search."""
     if len(content) <= chunk_size:
         return [content]
     
+    # Break offsets are found in one pass up front; each window then
+    # binary-searches them instead of re-scanning its tail with rfind
+    periods = [m.start() for m in PERIOD_RE.finditer(content)]
+    paragraphs = [m.start() for m in PARAGRAPH_RE.finditer(content)]
+    
     chunks = []
     start = 0
     
@@ -43,10 +68,16 @@ def chunk_document(content: str, chunk_size: int = 500, overlap: int = 50) -> Li
         # Try to break at sentence boundaries
         if end < len(content):
             # Look for sentence endings within the last 100 characters
-            last_period = content.rfind('.', end - 100, end)
-            last_newline = content.rfind('\n\n', end - 100, end)
+            window_start = max(0, end - BREAK_LOOKBACK)
+            best_break = -1
+            i = bisect_left(periods, end) - 1
+            if i >= 0 and periods[i] >= window_start:
+                best_break = periods[i]
+            # A paragraph break has to fit entirely inside the window
+            i = bisect_right(paragraphs, end - 2) - 1
+            if i >= 0 and paragraphs[i] >= window_start:
+                best_break = max(best_break, paragraphs[i])
             
-            best_break = max(last_period, last_newline)
             if best_break > start:
                 end = best_break + 1
         
@@ -61,93 +92,84 @@ def chunk_document(content: str, chunk_size: int = 500, overlap: int = 50) -> Li
 def extract_sections(content: str, file_path: Path) -> List[Dict[str, Any]]:
     """Extract sections from markdown content."""
     sections = []
-    lines = content.split('\n')
-    current_section = None
-    current_content = []
+    path = str(file_path.relative_to(PROJECT_ROOT))
+    headings = list(HEADING_RE.finditer(content))
     
-    for line in lines:
-        if line.startswith('#'):
-            # Save previous section
-            if current_section and current_content:
-                section_content = '\n'.join(current_content).strip()
-                if section_content:
-                    chunks = chunk_document(section_content)
-                    for i, chunk in enumerate(chunks):
-                        sections.append({
-                            'title': file_path.name,
-                            'section': current_section,
-                            'chunk_id': i,
-                            'content': chunk,
-                            'path': str(file_path.relative_to(PROJECT_ROOT)),
-                            'metadata': {
-                                'title': file_path.name,
-                                'section': current_section,
-                                'chunk_id': i,
-                                'path': str(file_path.relative_to(PROJECT_ROOT)),
-                                'file_type': 'markdown'
-                            }
-                        })
-            
-            # Start new section
-            current_section = line.strip('# ').strip()
-            current_content = []
-        else:
-            current_content.append(line)
-    
-    # Handle last section
-    if current_section and current_content:
-        section_content = '\n'.join(current_content).strip()
-        if section_content:
-            chunks = chunk_document(section_content)
-            for i, chunk in enumerate(chunks):
-                sections.append({
-                    'title': file_path.name,
-                    'section': current_section,
-                    'chunk_id': i,
-                    'content': chunk,
-                    'path': str(file_path.relative_to(PROJECT_ROOT)),
-                    'metadata': {
-                        'title': file_path.name,
-                        'section': current_section,
-                        'chunk_id': i,
-                        'path': str(file_path.relative_to(PROJECT_ROOT)),
-                        'file_type': 'markdown'
-                    }
-                })
+    for n, heading in enumerate(headings):
+        current_section = heading.group().strip('# ').strip()
+        if not current_section:
+            continue
+        
+        # Body runs from the line after the heading to the next heading
+        body_end = headings[n + 1].start() if n + 1 < len(headings) else len(content)
+        section_content = content[heading.end() + 1:body_end].strip()
+        if not section_content:
+            continue
+        
+        # Only chunk_id and content differ between a section's chunks
+        base = {'title': file_path.name, 'section': current_section}
+        metadata = {**base, 'path': path, 'file_type': 'markdown'}
+        
+        for i, chunk in enumerate(chunk_document(section_content)):
+            sections.append({
+                **base,
+                'chunk_id': i,
+                'content': chunk,
+                'path': path,
+                'metadata': {**metadata, 'chunk_id': i}
+            })
     
     return sections
 
+def _yaml_leaf_lines(node: Any, prefix: str = ""):
+    """Yield one "dotted.key: value" line per scalar leaf of a parsed YAML tree."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _yaml_leaf_lines(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(node, list):
+        for i, value in enumerate(node):
+            yield from _yaml_leaf_lines(value, f"{prefix}[{i}]")
+    else:
+        yield f"{prefix}: {node}" if prefix else str(node)
+
 def process_yaml_file(file_path: Path) -> List[Dict[str, Any]]:
-    """Process YAML files as structured documents."""
+    """Process YAML files as structured documents, one section per top-level key."""
     try:
         import yaml
         
+        # libyaml's C parser when PyYAML was built with it
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        
         with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            yaml_data = yaml.safe_load(content)
+            yaml_data = yaml.load(f, Loader=loader)
         
-        # Convert YAML to searchable text
-        text_content = f"# {file_path.name}\n\n"
-        text_content += json.dumps(yaml_data, indent=2)
+        if isinstance(yaml_data, dict):
+            top_level = [(str(key), {key: value}) for key, value in yaml_data.items()]
+        else:
+            top_level = [("section_0", yaml_data)]
         
-        chunks = chunk_document(text_content)
+        path = str(file_path.relative_to(PROJECT_ROOT))
         sections = []
         
-        for i, chunk in enumerate(chunks):
-            sections.append({
-                'title': file_path.name,
-                'section': f'section_{i}',
-                'chunk_id': i,
-                'content': chunk,
-                'path': str(file_path.relative_to(PROJECT_ROOT)),
-                'metadata': {
+        for section_name, subtree in top_level:
+            # Convert YAML to searchable text: leaf lines, not re-serialised JSON
+            text_content = f"# {file_path.name}\n\n" + "\n".join(_yaml_leaf_lines(subtree))
+            
+            for i, chunk in enumerate(chunk_document(text_content)):
+                sections.append({
                     'title': file_path.name,
-                    'section': f'section_{i}',
+                    'section': section_name,
                     'chunk_id': i,
-                    'path': str(file_path.relative_to(PROJECT_ROOT)),
-                    'file_type': 'yaml'
-                }
-            })
+                    'content': chunk,
+                    'path': path,
+                    'metadata': {
+                        'title': file_path.name,
+                        'section': section_name,
+                        'chunk_id': i,
+                        'path': path,
+                        'file_type': 'yaml'
+                    }
+                })
         
         return sections
         
@@ -155,6 +177,73 @@ def process_yaml_file(file_path: Path) -> List[Dict[str, Any]]:
         print(f"⚠️  Error processing YAML file {file_path}: {e}")
         return []
 
+def _parse_file(file_path: Path) -> List[Dict[str, Any]]:
+    """Read and chunk one knowledge file (runs in a worker process)."""
+    if file_path.suffix.lower() in ['.md']:
+        # Process markdown
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return extract_sections(content, file_path)
+    
+    if file_path.suffix.lower() in ['.yaml', '.yml']:
+        # Process YAML
+        return process_yaml_file(file_path)
+    
+    return []
+
+def _embedding_key(content: str, model_id: str) -> bytes:
+    """Cache key for one chunk: its text hashed together with the model that embeds it."""
+    return hashlib.blake2b(f"{model_id}\0{content}".encode("utf-8"), digest_size=16).digest()
+
+def _encode_with_cache(embedding_model, documents: List[str], model_id: str) -> np.ndarray:
+    """Embed documents, encoding only chunks missing from the on-disk cache (stored as float16)."""
+    embeddings = np.empty((len(documents), embedding_model.get_sentence_embedding_dimension()), dtype=np.float32)
+    keys = [_embedding_key(doc, model_id) for doc in documents]
+    
+    con = sqlite3.connect(EMBEDDING_CACHE_DB)
+    try:
+        con.execute("CREATE TABLE IF NOT EXISTS embedding_cache (key BLOB PRIMARY KEY, vector BLOB)")
+        
+        cached = {}
+        distinct_keys = list(dict.fromkeys(keys))
+        for i in range(0, len(distinct_keys), 500):
+            batch = distinct_keys[i:i + 500]
+            cached.update(con.execute(
+                f"SELECT key, vector FROM embedding_cache WHERE key IN ({', '.join('?' * len(batch))})", batch
+            ).fetchall())
+        
+        # Rows still to encode, grouped by key so repeated chunks are encoded once
+        missing: Dict[bytes, List[int]] = {}
+        for i, key in enumerate(keys):
+            vector = cached.get(key)
+            if vector is not None and len(vector) == embeddings.shape[1] * 2:
+                embeddings[i] = np.frombuffer(vector, dtype=np.float16)
+            else:
+                missing.setdefault(key, []).append(i)
+        
+        print(f"   ♻️  {len(documents) - sum(map(len, missing.values()))} cached, {len(missing)} to encode")
+        if missing:
+            rows = [indices[0] for indices in missing.values()]
+            encoded = embedding_model.encode(
+                [documents[i] for i in rows],
+                batch_size=EMBEDDING_BATCH_SIZE,
+                convert_to_numpy=True,
+                # Unit vectors, matching the query side in rag_search
+                normalize_embeddings=True,
+                show_progress_bar=True
+            )
+            for vector, indices in zip(encoded, missing.values()):
+                embeddings[indices] = vector
+            with con:
+                con.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, vector) VALUES (?, ?)",
+                    zip(missing, (vector.astype(np.float16).tobytes() for vector in encoded))
+                )
+    finally:
+        con.close()
+    
+    return embeddings
+
 def initialize_knowledge_base():
     """Initialize ChromaDB with knowledge base documents."""
     print("🚀 Initializing RAG Knowledge Base")
@@ -178,65 +267,55 @@ def initialize_knowledge_base():
         print(f"⚠️  Note: {e}")
     
     # Create new collection
-    collection = client.create_collection(COLLECTION_NAME)
+    # Cosine space over the unit-normalised embeddings, so rag_search's
+    # 1 - distance is the cosine similarity
+    collection = client.create_collection(COLLECTION_NAME, metadata={"hnsw:space": "cosine"})
     print(f"✅ Created collection: {COLLECTION_NAME}")
     
-    # Initialize embedding model
-    print("🤖 Loading embedding model...")
-    embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-    print("✅ Embedding model loaded")
-    
-    # Process all knowledge documents
+    # Process all knowledge documents (embeddings are computed afterwards in one batched pass)
     all_documents = []
-    all_embeddings = []
     all_metadatas = []
     all_ids = []
     
-    total_files = 0
-    processed_files = 0
+    # Gather the files first so they can all be parsed in one worker pool
+    knowledge_files = []
     
     for knowledge_dir in KNOWLEDGE_DIRS:
         dir_path = PROJECT_ROOT / knowledge_dir
         
-        print(f"\n📁 Processing directory: {knowledge_dir}/")
+        print(f"\n📁 Scanning directory: {knowledge_dir}/")
         
         if not dir_path.exists():
             print(f"   ⚠️  Directory not found: {dir_path}")
             continue
         
-        # Process markdown files
         md_files = list(dir_path.rglob("*.md"))
         yaml_files = list(dir_path.rglob("*.yaml")) + list(dir_path.rglob("*.yml"))
         
-        all_files = md_files + yaml_files
-        total_files += len(all_files)
+        knowledge_files.extend(md_files + yaml_files)
+        print(f"   ✅ Found {len(md_files) + len(yaml_files)} files")
+    
+    total_files = len(knowledge_files)
+    processed_files = 0
+    
+    # Parse across cores. Done before the embedding model loads, so the
+    # workers fork from a small process; results are read back in file order
+    # to keep chunk ids and insertion order deterministic
+    print(f"\n📄 Processing {total_files} files...")
+    with ProcessPoolExecutor(max_workers=max(1, min(total_files, os.cpu_count() or 1))) as executor:
+        futures = [executor.submit(_parse_file, file_path) for file_path in knowledge_files]
         
-        for file_path in all_files:
+        for file_path, future in zip(knowledge_files, futures):
             print(f"   📄 Processing: {file_path.name}")
             
             try:
-                if file_path.suffix.lower() in ['.md']:
-                    # Process markdown
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    sections = extract_sections(content, file_path)
-                    
-                elif file_path.suffix.lower() in ['.yaml', '.yml']:
-                    # Process YAML
-                    sections = process_yaml_file(file_path)
-                    
-                else:
-                    continue
+                sections = future.result()
                 
                 for section in sections:
-                    # Generate embedding
-                    embedding = embedding_model.encode([section['content']])[0].tolist()
-                    
                     # Create unique ID
                     doc_id = f"{file_path.stem}_{section['section']}_{section['chunk_id']}"
                     
                     all_documents.append(section['content'])
-                    all_embeddings.append(embedding)
                     all_metadatas.append(section['metadata'])
                     all_ids.append(doc_id)
                 
@@ -246,15 +325,24 @@ def initialize_knowledge_base():
             except Exception as e:
                 print(f"      ❌ Error processing {file_path}: {e}")
     
+    # Initialize embedding model
+    print("\n🤖 Loading embedding model...")
+    embedding_model, backend = load_embedding_model()
+    print(f"✅ Embedding model loaded ({backend})")
+    
     # Add all documents to ChromaDB
     if all_documents:
+        print(f"\n🧮 Encoding {len(all_documents)} document chunks...")
+        all_embeddings = _encode_with_cache(embedding_model, all_documents, f"{embedding_model_name()}:{backend}")
+        
         print(f"\n💾 Adding {len(all_documents)} document chunks to database...")
         
         # Add in batches to avoid memory issues
-        batch_size = 100
+        batch_size = ADD_BATCH_SIZE
         for i in range(0, len(all_documents), batch_size):
             end_idx = min(i + batch_size, len(all_documents))
             
+            # A view into the float32 matrix; Chroma accepts NumPy embeddings directly
             collection.add(
                 ids=all_ids[i:end_idx],
                 embeddings=all_embeddings[i:end_idx],
@@ -4,31 +4,153 @@ Provides balance calculations and transaction history for customer accounts
 """
 
 from pathlib import Path
+import functools
 import duckdb
 import pandas as pd
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, List
 import os
 from crewai.tools import tool
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 LEDGER_DIR = PROJECT_ROOT / "ledgers"
+LEDGER_FILES = {
+    "spot": LEDGER_DIR / "spot_ledger.csv",
+    "margin": LEDGER_DIR / "margin_ledger.csv",
+}
+
+# One in-memory DuckDB database per process. The CSVs are ingested into native
+# tables once and re-ingested only when a file's mtime changes; each thread
+# gets its own cursor on the shared database, reused until the next ingest.
+# Each CSV is also converted to a Parquet copy next to it, sorted by customer
+# and newest first, so row-group min/max prune the per-customer queries and
+# their newest-first scans arrive mostly in order. Later ingests load that
+# copy instead of re-parsing CSV.
+_CON: Optional[duckdb.DuckDBPyConnection] = None
+_CON_LOCK = threading.Lock()
+_LOADED_MTIMES = None
+_GENERATION = 0
+_LOCAL = threading.local()
+
+def _ledger_mtimes():
+    return tuple(path.stat().st_mtime_ns if path.exists() else None for path in LEDGER_FILES.values())
+
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+# Per-(customer, asset) balances, rebuilt with each ingest of spot, so balance
+# lookups and the asset summary read a few rows instead of rescanning spot
+SPOT_BALANCES_DDL = """
+    CREATE OR REPLACE TABLE spot_balances AS
+    SELECT customer_id, asset,
+           SUM(amount * (CASE WHEN side='credit' THEN 1 ELSE -1 END)) as balance,
+           COUNT(*) as transaction_count,
+           MAX(timestamp) as last_activity
+    FROM spot
+    GROUP BY customer_id, asset
+    ORDER BY customer_id, asset;
+    CREATE INDEX idx_spot_balances_cust_asset ON spot_balances(customer_id, asset);
+"""
+
+def _ensure_parquet(con, csv_path: Path) -> str:
+    """Return a read_* table function for csv_path, preferring an up-to-date Parquet copy."""
+    parquet_path = csv_path.with_suffix(".parquet")
+    try:
+        if not parquet_path.exists() or parquet_path.stat().st_mtime_ns < csv_path.stat().st_mtime_ns:
+            con.execute(f"""
+                COPY (SELECT * FROM read_csv_auto('{csv_path}') ORDER BY customer_id, timestamp DESC)
+                TO '{parquet_path}' (FORMAT PARQUET, ROW_GROUP_SIZE {PARQUET_ROW_GROUP_SIZE});
+            """)
+        return f"read_parquet('{parquet_path}')"
+    except (duckdb.Error, OSError) as e:
+        print(f"Warning: Could not write Parquet copy of {csv_path.name}, reading CSV: {e}")
+        return f"read_csv_auto('{csv_path}')"
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values orjson/json don't handle natively (pandas NaT, NumPy scalars)."""
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+def _fetch_records(cursor) -> List[Dict[str, Any]]:
+    """Fetch an executed query's rows as dicts, without building a DataFrame."""
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def _records_json(records: List[Dict[str, Any]]) -> str:
+    """Serialize result rows as an indented JSON array of row objects."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            records, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    return json.dumps(records, default=_json_default, indent=2)
 
 def _get_connection():
-    """Create a DuckDB connection with ledger views registered."""
-    con = duckdb.connect()
-    
-    # Register CSV files as DuckDB views
-    spot_path = LEDGER_DIR / "spot_ledger.csv"
-    margin_path = LEDGER_DIR / "margin_ledger.csv"
+    """Return this thread's cursor on the shared DuckDB database with the ledger tables loaded."""
+    global _CON, _LOADED_MTIMES, _GENERATION
+    mtimes = _ledger_mtimes()
+    with _CON_LOCK:
+        if _CON is None:
+            _CON = duckdb.connect()
+        
+        if mtimes != _LOADED_MTIMES:
+            for name, path in LEDGER_FILES.items():
+                if path.exists():
+                    _CON.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM {_ensure_parquet(_CON, path)};")
+                else:
+                    _CON.execute(f"DROP TABLE IF EXISTS {name};")
+            
+            if LEDGER_FILES["spot"].exists():
+                _CON.execute(SPOT_BALANCES_DDL)
+            else:
+                _CON.execute("DROP TABLE IF EXISTS spot_balances;")
+            _LOADED_MTIMES = mtimes
+            _GENERATION += 1
+        
+        # A fresh cursor after each ingest
+        if getattr(_LOCAL, "generation", None) != _GENERATION:
+            _LOCAL.cursor = _CON.cursor()
+            _LOCAL.generation = _GENERATION
+        
+        return _LOCAL.cursor
+
+# Agents repeat balance lookups verbatim; results are cached per ingest
+# generation, so a ledger change (new mtime) makes earlier entries unreachable
+@functools.lru_cache(maxsize=256)
+def _ledger_balance(customer_id: str, asset: Optional[str], generation: int) -> str:
+    con = _get_connection()
     
-    if spot_path.exists():
-        con.execute(f"CREATE VIEW spot AS SELECT * FROM read_csv_auto('{spot_path}');")
+    if asset:
+        # Query specific asset balance
+        query = """
+            SELECT asset, balance, transaction_count, last_activity
+            FROM spot_balances
+            WHERE customer_id = $1 AND asset = $2;
+        """
+        result = _fetch_records(con.execute(query, [customer_id, asset]))
+    else:
+        # Query all asset balances
+        query = """
+            SELECT asset, balance, transaction_count, last_activity
+            FROM spot_balances
+            WHERE customer_id = $1
+            ORDER BY asset;
+        """
+        result = _fetch_records(con.execute(query, [customer_id]))
     
-    if margin_path.exists():
-        con.execute(f"CREATE VIEW margin AS SELECT * FROM read_csv_auto('{margin_path}');")
+    if not result:
+        return f"No balance found for customer {customer_id}" + (f" in asset {asset}" if asset else "")
     
-    return con
+    return _records_json(result)
 
 @tool("ledger_balance")
 def ledger_balance(customer_id: str, asset: str = None) -> str:
@@ -43,57 +165,9 @@ def ledger_balance(customer_id: str, asset: str = None) -> str:
         JSON string with balance information including transaction count and last activity
     """
     try:
-        con = _get_connection()
-        
-        if asset:
-            # Query specific asset balance
-            query = """
-                WITH all_txns AS (
-                    SELECT timestamp, customer_id, asset, 
-                           amount * (CASE WHEN side='credit' THEN 1 ELSE -1 END) as delta,
-                           tx_id
-                    FROM spot 
-                    WHERE customer_id = ? AND asset = ?
-                ),
-                balance_calc AS (
-                    SELECT asset, 
-                           SUM(delta) as balance,
-                           COUNT(*) as transaction_count,
-                           MAX(timestamp) as last_activity
-                    FROM all_txns 
-                    GROUP BY asset
-                )
-                SELECT * FROM balance_calc;
-            """
-            result = con.execute(query, [customer_id, asset]).df()
-        else:
-            # Query all asset balances
-            query = """
-                WITH all_txns AS (
-                    SELECT timestamp, customer_id, asset,
-                           amount * (CASE WHEN side='credit' THEN 1 ELSE -1 END) as delta,
-                           tx_id
-                    FROM spot 
-                    WHERE customer_id = ?
-                ),
-                balance_calc AS (
-                    SELECT asset,
-                           SUM(delta) as balance,
-                           COUNT(*) as transaction_count,
-                           MAX(timestamp) as last_activity
-                    FROM all_txns 
-                    GROUP BY asset
-                )
-                SELECT * FROM balance_calc ORDER BY asset;
-            """
-            result = con.execute(query, [customer_id]).df()
-        
-        con.close()
-        
-        if result.empty:
-            return f"No balance found for customer {customer_id}" + (f" in asset {asset}" if asset else "")
-        
-        return result.to_json(orient='records', indent=2)
+        # Reloads the ledgers (bumping _GENERATION) if any file changed
+        _get_connection()
+        return _ledger_balance(customer_id, asset, _GENERATION)
         
     except Exception as e:
         return f"Error querying ledger balance: {str(e)}"
@@ -114,34 +188,26 @@ def ledger_movements(customer_id: str, limit: int = 50) -> str:
         con = _get_connection()
         
         query = """
-            WITH txn_data AS (
-                SELECT timestamp, customer_id, asset, amount, side, tx_id, notes,
-                       amount * (CASE WHEN side='credit' THEN 1 ELSE -1 END) as delta
-                FROM spot 
-                WHERE customer_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ),
-            with_running_balance AS (
-                SELECT *,
-                       SUM(delta) OVER (
-                           PARTITION BY asset 
-                           ORDER BY timestamp DESC 
-                           ROWS UNBOUNDED PRECEDING
-                       ) as running_balance
-                FROM txn_data
-                ORDER BY timestamp DESC
-            )
-            SELECT * FROM with_running_balance;
+            SELECT timestamp, customer_id, asset, amount, side, tx_id, notes,
+                   amount * (CASE WHEN side='credit' THEN 1 ELSE -1 END) as delta
+            FROM spot 
+            WHERE customer_id = $1
+            ORDER BY timestamp DESC
+            LIMIT $2;
         """
         
-        result = con.execute(query, [customer_id, limit]).df()
-        con.close()
+        result = _fetch_records(con.execute(query, [customer_id, int(limit)]))
         
-        if result.empty:
+        # Running balance per asset over the newest-first rows; the slice is
+        # small, so a Python pass beats a DuckDB window over it
+        running: Dict[str, float] = {}
+        for row in result:
+            row["running_balance"] = running[row["asset"]] = running.get(row["asset"], 0) + row["delta"]
+        
+        if not result:
             return f"No transactions found for customer {customer_id}"
         
-        return result.to_json(orient='records', indent=2)
+        return _records_json(result)
         
     except Exception as e:
         return f"Error querying ledger movements: {str(e)}"
@@ -160,53 +226,25 @@ def ledger_asset_summary(asset: str = None) -> str:
     try:
         con = _get_connection()
         
-        if asset:
-            query = """
-                WITH all_txns AS (
-                    SELECT customer_id, asset,
-                           SUM(amount * (CASE WHEN side='credit' THEN 1 ELSE -1 END)) as customer_balance
-                    FROM spot 
-                    WHERE asset = ?
-                    GROUP BY customer_id, asset
-                )
-                SELECT asset,
-                       COUNT(*) as customer_count,
-                       SUM(customer_balance) as total_balance,
-                       MIN(customer_balance) as min_balance,
-                       MAX(customer_balance) as max_balance,
-                       AVG(customer_balance) as avg_balance
-                FROM all_txns 
-                WHERE customer_balance != 0
-                GROUP BY asset;
-            """
-            result = con.execute(query, [asset]).df()
-        else:
-            query = """
-                WITH all_txns AS (
-                    SELECT customer_id, asset,
-                           SUM(amount * (CASE WHEN side='credit' THEN 1 ELSE -1 END)) as customer_balance
-                    FROM spot 
-                    GROUP BY customer_id, asset
-                )
-                SELECT asset,
-                       COUNT(*) as customer_count, 
-                       SUM(customer_balance) as total_balance,
-                       MIN(customer_balance) as min_balance,
-                       MAX(customer_balance) as max_balance,
-                       AVG(customer_balance) as avg_balance
-                FROM all_txns 
-                WHERE customer_balance != 0
-                GROUP BY asset
-                ORDER BY asset;
-            """
-            result = con.execute(query).df()
-        
-        con.close()
+        # One query for both cases: a NULL asset matches every row
+        query = """
+            SELECT asset,
+                   COUNT(*) as customer_count,
+                   SUM(balance) as total_balance,
+                   MIN(balance) as min_balance,
+                   MAX(balance) as max_balance,
+                   AVG(balance) as avg_balance
+            FROM spot_balances 
+            WHERE asset = COALESCE($1, asset) AND balance != 0
+            GROUP BY asset
+            ORDER BY asset;
+        """
+        result = _fetch_records(con.execute(query, [asset or None]))
         
-        if result.empty:
+        if not result:
             return f"No data found" + (f" for asset {asset}" if asset else "")
         
-        return result.to_json(orient='records', indent=2)
+        return _records_json(result)
         
     except Exception as e:
         return f"Error querying asset summary: {str(e)}"
@@ -229,10 +267,10 @@ def ledger_withdrawal_history(customer_id: str = None) -> str:
             query = """
                 SELECT timestamp, customer_id, asset, amount, tx_id, notes
                 FROM spot 
-                WHERE side = 'debit' AND customer_id = ?
+                WHERE side = 'debit' AND customer_id = $1
                 ORDER BY timestamp DESC;
             """
-            result = con.execute(query, [customer_id]).df()
+            result = _fetch_records(con.execute(query, [customer_id]))
         else:
             query = """
                 SELECT timestamp, customer_id, asset, amount, tx_id, notes
@@ -240,14 +278,12 @@ def ledger_withdrawal_history(customer_id: str = None) -> str:
                 WHERE side = 'debit'
                 ORDER BY timestamp DESC;
             """
-            result = con.execute(query).df()
-        
-        con.close()
+            result = _fetch_records(con.execute(query))
         
-        if result.empty:
+        if not result:
             return f"No withdrawals found" + (f" for customer {customer_id}" if customer_id else "")
         
-        return result.to_json(orient='records', indent=2)
+        return _records_json(result)
         
     except Exception as e:
         return f"Error querying withdrawal history: {str(e)}"
@@ -268,11 +304,10 @@ def get_customer_transactions(customer_id: str) -> pd.DataFrame:
         query = """
             SELECT timestamp, customer_id, asset, amount, side, tx_id, notes
             FROM spot 
-            WHERE customer_id = ?
+            WHERE customer_id = $1
             ORDER BY timestamp;
         """
         result = con.execute(query, [customer_id]).df()
-        con.close()
         return result
     except Exception as e:
         print(f"Error in get_customer_transactions: {e}")
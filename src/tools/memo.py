@@ -0,0 +1,53 @@
+"""
+Tool Result Memoization - caches file-backed tool results per version of the file
+Agents repeat tool calls verbatim; a repeat against an unchanged file is a dict lookup
+"""
+
+import functools
+import inspect
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+def file_version(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of path, or None if it is missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def memoize_by_file(path: Path, maxsize: int = 256) -> Callable:
+    """
+    Cache a tool function's results by its arguments and the file_version() of path.
+
+    Apply it below @tool, so CrewAI still sees the original signature and
+    docstring. Results are cached as returned, error strings included: they
+    depend only on the arguments and the file, and the file is in the key.
+
+    Args:
+        path: Data file the tool reads; any change to it misses the cache
+        maxsize: Number of (arguments, file version) results kept
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.lru_cache(maxsize=maxsize)
+        def cached(version, args):
+            return func(*args)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Bind with defaults so f(x) and f(x, default) share an entry
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            try:
+                return cached(file_version(path), bound.args)
+            except TypeError:
+                # Unhashable arguments can't be cached
+                return func(*bound.args)
+
+        wrapper.cache_info = cached.cache_info
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+
+    return decorator
@@ -4,13 +4,22 @@ Provides knowledge retrieval with citations from legal documents and policies
 """
 
 import os
+import functools
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import json
 import re
+import threading
 from crewai.tools import tool
 
 try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import chromadb
     from chromadb import PersistentClient
     from sentence_transformers import SentenceTransformer
     CHROMADB_AVAILABLE = True
@@ -18,38 +27,158 @@ except ImportError:
     CHROMADB_AVAILABLE = False
     print("Warning: ChromaDB or sentence-transformers not available. RAG search will be limited.")
 
+from tools.embeddings import ensure_env, load_embedding_model
+
 # Get project root directory
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 CHROMA_DIR = PROJECT_ROOT / ".chroma"
 KNOWLEDGE_DIRS = ["knowledge", "policies", "catalogs"]
 
-# Initialize embedding model (will be loaded on first use)
+# Chroma 0.5 answers where_document $contains with a case-insensitive LIKE;
+# later releases match case-sensitively, so the pre-filter would drop matches
+CONTAINS_FOLDS_CASE = CHROMADB_AVAILABLE and tuple(
+    int(part) for part in re.findall(r"\d+", chromadb.__version__)[:2]
+) < (0, 6)
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result as indented JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, indent=2)
+
+# Initialize embedding model (loaded in the background at import, see below)
 _embedding_model = None
+_embedding_model_lock = threading.Lock()
 
 def _get_embedding_model():
     """Initialize embedding model on first use."""
     global _embedding_model
-    if _embedding_model is None and CHROMADB_AVAILABLE:
+    if _embedding_model is not None or not CHROMADB_AVAILABLE:
+        return _embedding_model
+    
+    # A call arriving during the background load waits for it instead of loading twice
+    with _embedding_model_lock:
+        if _embedding_model is not None:
+            return _embedding_model
         try:
-            _embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+            model, _ = load_embedding_model()
+            # The first encode pays one-off setup costs; take them here, off the request path
+            model.encode(["warmup"])
+            _embedding_model = model
         except Exception as e:
             print(f"Warning: Could not load embedding model: {e}")
             _embedding_model = None
     return _embedding_model
 
+# Load the model in the background at import so the first search doesn't pay
+# for it; RAG_PREWARM=0 (in the environment or .env) skips this in processes
+# that never search
+ensure_env()
+if CHROMADB_AVAILABLE and os.getenv("RAG_PREWARM", "1") != "0":
+    threading.Thread(target=_get_embedding_model, name="rag-embedding-prewarm", daemon=True).start()
+
+# Opened once per process; reopening re-reads Chroma's SQLite catalog and index state
+_chroma_client = None
+_chroma_client_lock = threading.Lock()
+
 def _get_chroma_client():
     """Get ChromaDB client with persistent storage."""
+    global _chroma_client
     if not CHROMADB_AVAILABLE:
         return None
     
+    with _chroma_client_lock:
+        if _chroma_client is None:
+            try:
+                # Ensure directory exists
+                CHROMA_DIR.mkdir(exist_ok=True)
+                _chroma_client = PersistentClient(path=str(CHROMA_DIR))
+            except Exception as e:
+                print(f"Warning: Could not initialize ChromaDB client: {e}")
+                return None
+    return _chroma_client
+
+# Collections resolved once per name; get_or_create_collection hits Chroma's
+# SQLite catalog on every call
+_collections = {}
+
+def _get_collection(client, name: str):
+    """Return the named collection, creating it on first use."""
+    collection = _collections.get(name)
+    if collection is None:
+        collection = _collections.setdefault(name, client.get_or_create_collection(name))
+    return collection
+
+# Rows per collection.get() page when walking a whole collection
+COLLECTION_PAGE_SIZE = 10_000
+
+def _iter_collection(collection, include: List[str], **filters):
+    """Yield collection.get() pages, so at most one page of rows is in memory at a time."""
+    offset = 0
+    while True:
+        page = collection.get(include=include, limit=COLLECTION_PAGE_SIZE, offset=offset, **filters)
+        if page["ids"]:
+            yield page
+        if len(page["ids"]) < COLLECTION_PAGE_SIZE:
+            return
+        offset += COLLECTION_PAGE_SIZE
+
+def _encode_query(embedding_model, query: str):
+    """Embed one query as a (1, dim) float32 array; Chroma takes NumPy embeddings directly."""
+    return embedding_model.encode([query], convert_to_numpy=True, normalize_embeddings=True)
+
+def _chroma_db_mtime():
+    """Modification time of Chroma's SQLite store; changes whenever the index is written."""
     try:
-        # Ensure directory exists
-        CHROMA_DIR.mkdir(exist_ok=True)
-        return PersistentClient(path=str(CHROMA_DIR))
-    except Exception as e:
-        print(f"Warning: Could not initialize ChromaDB client: {e}")
+        return (CHROMA_DIR / "chroma.sqlite3").stat().st_mtime_ns
+    except OSError:
         return None
 
+# Agents repeat queries verbatim; results are cached until the Chroma store changes
+@functools.lru_cache(maxsize=256)
+def _rag_search(query: str, k: int, collection_name: str, db_mtime) -> str:
+    client = _get_chroma_client()
+    embedding_model = _get_embedding_model()
+    
+    # Get or create collection
+    collection = _get_collection(client, collection_name)
+    
+    # Generate query embedding
+    query_embedding = _encode_query(embedding_model, query)
+    
+    # Search the collection
+    results = collection.query(
+        query_embeddings=query_embedding,
+        n_results=k,
+        include=["metadatas", "documents", "distances"]
+    )
+    
+    if not results["documents"] or not results["documents"][0]:
+        return f"No results found for query: '{query}'"
+    
+    # Format results
+    search_results = [
+        {
+            "rank": rank,
+            "text": document,
+            "metadata": metadata,
+            "similarity_score": 1 - distance,  # Convert distance to similarity
+            "citation": _format_citation(metadata)
+        }
+        for rank, (document, metadata, distance) in enumerate(
+            zip(results["documents"][0], results["metadatas"][0], results["distances"][0]), 1
+        )
+    ]
+    
+    response = {
+        "query": query,
+        "total_results": len(search_results),
+        "collection": collection_name,
+        "results": search_results
+    }
+    
+    return _dumps(response)
+
 @tool("rag_search")
 def rag_search(query: str, k: int = 5, collection_name: str = "knowledge_base") -> str:
     """
@@ -75,42 +204,7 @@ def rag_search(query: str, k: int = 5, collection_name: str = "knowledge_base")
         if embedding_model is None:
             return _fallback_search(query, k)
         
-        # Get or create collection
-        collection = client.get_or_create_collection(collection_name)
-        
-        # Generate query embedding
-        query_embedding = embedding_model.encode([query]).tolist()
-        
-        # Search the collection
-        results = collection.query(
-            query_embeddings=query_embedding,
-            n_results=k,
-            include=["metadatas", "documents", "distances"]
-        )
-        
-        if not results["documents"] or not results["documents"][0]:
-            return f"No results found for query: '{query}'"
-        
-        # Format results
-        search_results = []
-        for i in range(len(results["documents"][0])):
-            result = {
-                "rank": i + 1,
-                "text": results["documents"][0][i],
-                "metadata": results["metadatas"][0][i],
-                "similarity_score": 1 - results["distances"][0][i],  # Convert distance to similarity
-                "citation": _format_citation(results["metadatas"][0][i])
-            }
-            search_results.append(result)
-        
-        response = {
-            "query": query,
-            "total_results": len(search_results),
-            "collection": collection_name,
-            "results": search_results
-        }
-        
-        return json.dumps(response, indent=2)
+        return _rag_search(query, k, collection_name, _chroma_db_mtime())
         
     except Exception as e:
         return f"Error in RAG search: {str(e)}"
@@ -136,7 +230,7 @@ def search_by_document(document_name: str, query: str = None, collection_name: s
         if client is None:
             return "Could not connect to knowledge base"
         
-        collection = client.get_or_create_collection(collection_name)
+        collection = _get_collection(client, collection_name)
         
         if query:
             # Semantic search within specific document
@@ -144,7 +238,7 @@ def search_by_document(document_name: str, query: str = None, collection_name: s
             if embedding_model is None:
                 return "Embedding model not available"
             
-            query_embedding = embedding_model.encode([query]).tolist()
+            query_embedding = _encode_query(embedding_model, query)
             
             results = collection.query(
                 query_embeddings=query_embedding,
@@ -172,18 +266,20 @@ def search_by_document(document_name: str, query: str = None, collection_name: s
             return f"No content found in document '{document_name}'" + (f" for query '{query}'" if query else "")
         
         # Format results
-        document_results = []
-        for i in range(len(results["documents"][0])):
-            result = {
-                "section": i + 1,
-                "text": results["documents"][0][i],
-                "metadata": results["metadatas"][0][i],
-                "citation": _format_citation(results["metadatas"][0][i])
+        document_results = [
+            {
+                "section": section,
+                "text": document,
+                "metadata": metadata,
+                "citation": _format_citation(metadata)
             }
-            if query:  # Add similarity score for search results
-                result["similarity_score"] = 1 - results["distances"][0][i]
-            
-            document_results.append(result)
+            for section, (document, metadata) in enumerate(
+                zip(results["documents"][0], results["metadatas"][0]), 1
+            )
+        ]
+        if query:  # Add similarity score for search results
+            for result, distance in zip(document_results, results["distances"][0]):
+                result["similarity_score"] = 1 - distance
         
         response = {
             "document_name": document_name,
@@ -192,7 +288,7 @@ def search_by_document(document_name: str, query: str = None, collection_name: s
             "content": document_results
         }
         
-        return json.dumps(response, indent=2)
+        return _dumps(response)
         
     except Exception as e:
         return f"Error searching document: {str(e)}"
@@ -216,38 +312,41 @@ def list_knowledge_sources(collection_name: str = "knowledge_base") -> str:
         if client is None:
             return _list_files_fallback()
         
-        collection = client.get_or_create_collection(collection_name)
+        collection = _get_collection(client, collection_name)
         
-        # Get all documents
-        all_docs = collection.get(include=["metadatas"])
+        # Group by document title, a page of metadatas at a time
+        documents = {}
+        total_sections = 0
+        for page in _iter_collection(collection, ["metadatas"]):
+            total_sections += len(page["metadatas"])
+            for metadata in page["metadatas"]:
+                title = metadata.get("title", "unknown")
+                entry = documents.get(title)
+                if entry is None:
+                    # section_names is a dict used as an insertion-ordered set
+                    entry = documents[title] = {
+                        "title": title,
+                        "sections": 0,
+                        "path": metadata.get("path", "unknown"),
+                        "section_names": {}
+                    }
+                entry["sections"] += 1
+                entry["section_names"][metadata.get("section", "unknown")] = None
         
-        if not all_docs["metadatas"]:
+        if total_sections == 0:
             return "No documents found in knowledge base"
         
-        # Group by document title
-        documents = {}
-        for metadata in all_docs["metadatas"]:
-            title = metadata.get("title", "unknown")
-            if title not in documents:
-                documents[title] = {
-                    "title": title,
-                    "sections": 0,
-                    "path": metadata.get("path", "unknown"),
-                    "section_names": []
-                }
-            documents[title]["sections"] += 1
-            section = metadata.get("section", "unknown")
-            if section not in documents[title]["section_names"]:
-                documents[title]["section_names"].append(section)
+        for entry in documents.values():
+            entry["section_names"] = list(entry["section_names"])
         
         response = {
             "collection": collection_name,
             "total_documents": len(documents),
-            "total_sections": len(all_docs["metadatas"]),
+            "total_sections": total_sections,
             "documents": list(documents.values())
         }
         
-        return json.dumps(response, indent=2)
+        return _dumps(response)
         
     except Exception as e:
         return f"Error listing knowledge sources: {str(e)}"
@@ -273,27 +372,37 @@ def search_citations(citation_pattern: str, collection_name: str = "knowledge_ba
         if client is None:
             return "Could not connect to knowledge base"
         
-        collection = client.get_or_create_collection(collection_name)
-        
-        # Get all documents and search within text
-        all_docs = collection.get(include=["metadatas", "documents"])
+        collection = _get_collection(client, collection_name)
         
-        if not all_docs["documents"]:
+        if collection.count() == 0:
             return "No documents found in knowledge base"
         
-        # Search for pattern in document text
+        # On Chroma 0.5, $contains is a LIKE over its trigram full-text table,
+        # which SQLite answers from the index for ASCII terms of 3+ characters;
+        # LIKE folds ASCII case only and treats % and _ as wildcards, so
+        # candidates are re-checked below. Otherwise scan every document.
+        if CONTAINS_FOLDS_CASE and len(citation_pattern) >= 3 and citation_pattern.isascii():
+            filters = {"where_document": {"$contains": citation_pattern}}
+        else:
+            filters = {}
+        
+        # Search for pattern in document text (case-insensitive literal match),
+        # a page at a time; only the matches are kept
+        pattern_re = _literal_pattern(citation_pattern)
         matching_results = []
-        for i, (doc, metadata) in enumerate(zip(all_docs["documents"], all_docs["metadatas"])):
-            if citation_pattern.lower() in doc.lower():
-                # Extract context around the pattern
-                context = _extract_context(doc, citation_pattern)
-                matching_results.append({
-                    "document": metadata.get("title", "unknown"),
-                    "section": metadata.get("section", "unknown"),
-                    "path": metadata.get("path", "unknown"),
-                    "context": context,
-                    "citation": _format_citation(metadata)
-                })
+        for page in _iter_collection(collection, ["metadatas", "documents"], **filters):
+            for doc, metadata in zip(page["documents"], page["metadatas"]):
+                match = pattern_re.search(doc)
+                if match:
+                    # Extract context around the pattern
+                    context = _context_around(doc, match)
+                    matching_results.append({
+                        "document": metadata.get("title", "unknown"),
+                        "section": metadata.get("section", "unknown"),
+                        "path": metadata.get("path", "unknown"),
+                        "context": context,
+                        "citation": _format_citation(metadata)
+                    })
         
         if not matching_results:
             return f"No citations found matching pattern: '{citation_pattern}'"
@@ -304,14 +413,13 @@ def search_citations(citation_pattern: str, collection_name: str = "knowledge_ba
             "citations": matching_results
         }
         
-        return json.dumps(response, indent=2)
+        return _dumps(response)
         
     except Exception as e:
         return f"Error searching citations: {str(e)}"
 
 def _format_citation(metadata: Dict[str, Any]) -> str:
     """Format metadata into a proper citation."""
-    title = metadata.get("title", "unknown")
     section = metadata.get("section", "")
     path = metadata.get("path", "")
     
@@ -320,17 +428,14 @@ def _format_citation(metadata: Dict[str, Any]) -> str:
     else:
         return f"[{path}]"
 
-def _extract_context(text: str, pattern: str, context_size: int = 100) -> str:
-    """Extract context around a search pattern."""
-    pattern_lower = pattern.lower()
-    text_lower = text.lower()
-    
-    match_pos = text_lower.find(pattern_lower)
-    if match_pos == -1:
-        return text[:200] + "..." if len(text) > 200 else text
-    
-    start = max(0, match_pos - context_size)
-    end = min(len(text), match_pos + len(pattern) + context_size)
+def _literal_pattern(pattern: str) -> "re.Pattern":
+    """Case-insensitive literal matcher; scans the text in place instead of lowercasing a copy."""
+    return re.compile(re.escape(pattern), re.IGNORECASE)
+
+def _context_around(text: str, match: "re.Match", context_size: int = 100) -> str:
+    """Extract context around a search pattern match."""
+    start = max(0, match.start() - context_size)
+    end = min(len(text), match.end() + context_size)
     
     context = text[start:end]
     if start > 0:
@@ -340,11 +445,26 @@ def _extract_context(text: str, pattern: str, context_size: int = 100) -> str:
     
     return context
 
+# Fallback corpus: {path: (mtime, content)}, re-read only when a file changes
+_fallback_corpus = {}
+
+def _read_cached(file_path: Path) -> str:
+    """Return a knowledge file's text, from the cache while its mtime is unchanged."""
+    mtime = file_path.stat().st_mtime
+    cached = _fallback_corpus.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    _fallback_corpus[file_path] = (mtime, content)
+    return content
+
 def _fallback_search(query: str, k: int) -> str:
     """Fallback search using simple text matching when ChromaDB is not available."""
     try:
         results = []
         result_count = 0
+        query_re = _literal_pattern(query)
         
         # Search through knowledge directories
         for knowledge_dir in KNOWLEDGE_DIRS:
@@ -357,12 +477,12 @@ def _fallback_search(query: str, k: int) -> str:
                     break
                 
                 try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        content = f.read()
+                    content = _read_cached(file_path)
                     
                     # Simple text search
-                    if query.lower() in content.lower():
-                        context = _extract_context(content, query)
+                    match = query_re.search(content)
+                    if match:
+                        context = _context_around(content, match)
                         results.append({
                             "rank": result_count + 1,
                             "text": context,
@@ -390,7 +510,7 @@ def _fallback_search(query: str, k: int) -> str:
             "results": results
         }
         
-        return json.dumps(response, indent=2)
+        return _dumps(response)
         
     except Exception as e:
         return f"Error in fallback search: {str(e)}"
@@ -422,7 +542,7 @@ def _list_files_fallback() -> str:
             "documents": list(documents.values())
         }
         
-        return json.dumps(response, indent=2)
+        return _dumps(response)
         
     except Exception as e:
         return f"Error listing files: {str(e)}"
@@ -3,47 +3,275 @@ Wallet Graph Tool - NetworkX-based blockchain transaction analysis
 Provides path finding, flow analysis, and graph traversal for cryptocurrency transactions
 """
 
+import functools
+import numpy as np
 import pandas as pd
 import networkx as nx
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from crewai.tools import tool
+from tools.memo import file_version, memoize_by_file
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit: run the function as plain Python."""
+        return lambda func: func
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result as indented JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, indent=2)
+
 # Get project root directory
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 TX_FILE = PROJECT_ROOT / "mock_chain" / "tx.csv"
+TX_COLUMNS = ["from", "to", "asset", "amount", "fee", "tx_hash", "timestamp", "notes"]
+# Above this size tx.csv is parsed batch by batch instead of as one Arrow table
+TX_STREAM_BYTES = 256 * 1024 * 1024
+
+def _tx_file_key() -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of the transaction file, or None if it is missing."""
+    return file_version(TX_FILE)
+
+class _TxEdgeTable:
+    """
+    Transaction columns as parallel arrays, indexed by edge id (the tx.csv row).
+    
+    The graph itself only carries each edge's id; attributes are gathered
+    from here when a tool builds its output.
+    """
+    
+    FIELDS = ("asset", "amount", "fee", "tx_hash", "timestamp", "notes")
+    
+    def __init__(self, columns: Dict[str, list]):
+        self.from_addr = np.array(columns["from"], dtype=object)
+        self.to_addr = np.array(columns["to"], dtype=object)
+        self.asset = np.array(columns["asset"], dtype=object)
+        self.amount = np.array(columns["amount"], dtype=np.float64)
+        self.fee = np.array(columns["fee"], dtype=np.float64)
+        self.tx_hash = np.array(columns["tx_hash"], dtype=object)
+        self.timestamp = np.array(columns["timestamp"], dtype=object)
+        self.notes = np.array(columns["notes"], dtype=object)
+    
+    def __len__(self) -> int:
+        return len(self.asset)
+    
+    def records(self, eids, leading: Optional[Dict[str, list]] = None) -> List[Dict[str, Any]]:
+        """
+        Build one output dict per edge id: the leading columns first, then FIELDS.
+        
+        Args:
+            eids: Edge ids to gather
+            leading: Extra per-edge columns (e.g. "from", "to") placed before FIELDS
+        """
+        eids = np.asarray(eids, dtype=np.int64)
+        columns = dict(leading or {})
+        for name in self.FIELDS:
+            columns[name] = getattr(self, name)[eids].tolist()
+        names = list(columns)
+        return [dict(zip(names, values)) for values in zip(*columns.values())]
+    
 
-def _build_transaction_graph() -> nx.DiGraph:
+def _get_transaction_data() -> Tuple[nx.DiGraph, _TxEdgeTable]:
     """
-    Build a directed graph from blockchain transaction data.
+    Return the transaction graph and its edge table, rebuilt only when tx.csv changes.
+    
+    Both are shared between calls and must not be modified.
     
     Returns:
-        NetworkX DiGraph with transaction flows
+        (DiGraph whose edges carry only an "eid" attribute, _TxEdgeTable)
     """
-    if not TX_FILE.exists():
+    return _load_transaction_data(_tx_file_key())
+
+@functools.lru_cache(maxsize=1)
+def _load_transaction_data(file_key: Optional[Tuple[int, int]]) -> Tuple[nx.DiGraph, _TxEdgeTable]:
+    """
+    Build the directed transaction graph from blockchain transaction data.
+    
+    Args:
+        file_key: _tx_file_key() of the file being loaded (the cache key)
+    
+    Returns:
+        (topology DiGraph with an "eid" per edge, _TxEdgeTable of edge attributes)
+    """
+    if file_key is None:
         print(f"Warning: Transaction file not found at {TX_FILE}")
-        return nx.DiGraph()
+        return nx.DiGraph(), _TxEdgeTable({name: [] for name in TX_COLUMNS})
     
-    df = pd.read_csv(TX_FILE)
+    edges = _TxEdgeTable(_read_tx_columns())
     g = nx.DiGraph()
     
-    # Add edges with transaction data as attributes
-    for _, row in df.iterrows():
-        g.add_edge(
-            row["from"], 
-            row["to"],
-            asset=row["asset"],
-            amount=float(row["amount"]),
-            fee=float(row["fee"]),
-            tx_hash=row["tx_hash"],
-            timestamp=row["timestamp"],
-            notes=row["notes"]
+    # Topology only; a repeated (from, to) pair keeps its last row, as the
+    # attribute update did before
+    g.add_edges_from(
+        (from_addr, to_addr, {"eid": eid})
+        for eid, (from_addr, to_addr) in enumerate(zip(edges.from_addr.tolist(), edges.to_addr.tolist()))
+    )
+    
+    return g, edges
+
+def _read_tx_columns() -> Dict[str, list]:
+    """Read tx.csv as {column: list of native Python values}, amount/fee as floats."""
+    if PYARROW_AVAILABLE:
+        # Arrow's parser, straight to columns with no DataFrame. Types are
+        # fixed up front (timestamps stay ISO strings, as pandas leaves them)
+        # so a streamed file can't infer different types from its first batch
+        convert_options = pa_csv.ConvertOptions(
+            column_types={
+                name: "float64" if name in ("amount", "fee") else "string" for name in TX_COLUMNS
+            },
+            strings_can_be_null=True,
         )
+        # Memory-mapped, so Arrow parses straight out of the page cache
+        with pa.memory_map(str(TX_FILE)) as source:
+            if source.size() <= TX_STREAM_BYTES:
+                # Multithreaded parse of the whole file
+                table = pa_csv.read_csv(source, convert_options=convert_options)
+                return {name: table.column(name).to_pylist() for name in TX_COLUMNS}
+            
+            # Large file: stream record batches, so only one batch of Arrow
+            # data is alive next to the growing column lists
+            columns = {name: [] for name in TX_COLUMNS}
+            for batch in pa_csv.open_csv(source, convert_options=convert_options):
+                for name in TX_COLUMNS:
+                    columns[name].extend(batch.column(name).to_pylist())
+            return columns
     
-    return g
+    df = pd.read_csv(TX_FILE)
+    df["amount"] = df["amount"].astype(float)
+    df["fee"] = df["fee"].astype(float)
+    return {name: df[name].tolist() for name in TX_COLUMNS}
+
+class _AdjacencyIndex:
+    """
+    Integer CSR adjacency over the transaction graph, forward and reverse.
+    
+    Nodes are numbered in graph order and each node's edges keep NetworkX's
+    adjacency order, so traversals report edges exactly as g.successors() /
+    g.predecessors() would. For each CSR, *_targets and *_eids run parallel
+    to *_nbrs: the neighbour's address and the edge id.
+    """
+    
+    def __init__(self, g: nx.DiGraph, edges: _TxEdgeTable):
+        # The table the eids index into, kept here so both come from one tx.csv
+        self.edges = edges
+        self.idx_to_id = list(g.nodes())
+        self.id_to_idx = {node: i for i, node in enumerate(self.idx_to_id)}
+        self.fwd_indptr, self.fwd_nbrs, self.fwd_targets, self.fwd_eids = self._csr(g.succ)
+        self.rev_indptr, self.rev_nbrs, self.rev_targets, self.rev_eids = self._csr(g.pred)
+    
+    def _csr(self, adjacency):
+        indptr = np.zeros(len(self.idx_to_id) + 1, dtype=np.int32)
+        targets, eids = [], []
+        for i, node in enumerate(self.idx_to_id):
+            for neighbor, data in adjacency[node].items():
+                targets.append(neighbor)
+                eids.append(data["eid"])
+            indptr[i + 1] = len(targets)
+        nbrs = np.fromiter((self.id_to_idx[t] for t in targets), dtype=np.int32, count=len(targets))
+        return indptr, nbrs, targets, np.array(eids, dtype=np.int64)
+
+@functools.lru_cache(maxsize=1)
+def _adjacency_index(file_key: Optional[Tuple[int, int]]) -> _AdjacencyIndex:
+    return _AdjacencyIndex(*_load_transaction_data(file_key))
+
+def _get_adjacency_index() -> _AdjacencyIndex:
+    """CSR adjacency for the current tx.csv, built once per graph."""
+    return _adjacency_index(_tx_file_key())
+
+@njit(cache=True)
+def _bfs_csr(indptr, nbrs, src, max_depth):
+    """
+    Breadth-first search over a CSR adjacency.
+    
+    Returns:
+        (order, depth) - node indices in discovery order (src first), and each
+        node's BFS depth (-1 where unreached)
+    """
+    n = indptr.shape[0] - 1
+    depth = np.full(n, -1, np.int32)
+    order = np.empty(n, np.int32)
+    depth[src] = 0
+    order[0] = src
+    head, tail = 0, 1
+    while head < tail:
+        u = order[head]
+        head += 1
+        if depth[u] >= max_depth:
+            continue
+        for k in range(indptr[u], indptr[u + 1]):
+            v = nbrs[k]
+            if depth[v] < 0:
+                depth[v] = depth[u] + 1
+                order[tail] = v
+                tail += 1
+    return order[:tail], depth
+
+def _bfs_edges(index: _AdjacencyIndex, src: str, max_depth: int,
+               reverse: bool = False) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Breadth-first search from src, returning every edge it expands.
+    
+    Args:
+        index: Adjacency index to traverse
+        src: Wallet to start from (must be in the index)
+        max_depth: Maximum depth to traverse
+        reverse: Follow edges backwards (inward flows) instead of forwards
+    
+    Returns:
+        (edge records with from/to/depth in BFS order, wallets visited in BFS
+        order starting with src)
+    """
+    if reverse:
+        indptr, nbrs, targets, eids = index.rev_indptr, index.rev_nbrs, index.rev_targets, index.rev_eids
+    else:
+        indptr, nbrs, targets, eids = index.fwd_indptr, index.fwd_nbrs, index.fwd_targets, index.fwd_eids
+    
+    order, depths = _bfs_csr(indptr, nbrs, index.id_to_idx[src], max_depth)
+    order, depths = order.tolist(), depths.tolist()
+    
+    # Every edge of each wallet expanded by the BFS, as CSR positions
+    positions, currents, edge_depths = [], [], []
+    for current in order:
+        depth = depths[current]
+        if depth >= max_depth:
+            continue
+        start, end = indptr[current], indptr[current + 1]
+        positions.extend(range(start, end))
+        currents.extend([index.idx_to_id[current]] * (end - start))
+        edge_depths.extend([depth + 1] * (end - start))
+    
+    # Gather the edge attributes column by column
+    neighbors = [targets[k] for k in positions]
+    ends = {"from": neighbors, "to": currents} if reverse else {"from": currents, "to": neighbors}
+    edges_found = index.edges.records(eids[positions], {**ends, "depth": edge_depths})
+    visited = [index.idx_to_id[i] for i in order]
+    return edges_found, visited
 
 @tool("wallet_shortest_path")
+@memoize_by_file(TX_FILE)
 def wallet_shortest_path(source: str, target: str) -> str:
     """
     Find the shortest path between two wallet addresses.
@@ -56,7 +284,7 @@ def wallet_shortest_path(source: str, target: str) -> str:
         JSON string with path information including intermediate hops and transaction details
     """
     try:
-        g = _build_transaction_graph()
+        g, edges = _get_transaction_data()
         
         if source not in g.nodes():
             return f"Source wallet {source} not found in transaction graph"
@@ -65,32 +293,22 @@ def wallet_shortest_path(source: str, target: str) -> str:
             return f"Target wallet {target} not found in transaction graph"
         
         try:
-            path = nx.shortest_path(g, source, target)
+            # Unweighted, so a bidirectional BFS (expands ~2*b^(d/2) nodes, not b^d)
+            path = nx.bidirectional_shortest_path(g, source, target)
             
-            # Get transaction details for each hop
-            path_details = []
-            total_amount = 0
-            total_fees = 0
+            # Get transaction details for each hop: one adjacency lookup per hop
+            # for the edge id, then a column gather for all hops at once
+            eids = [g[from_addr][to_addr]["eid"] for from_addr, to_addr in zip(path, path[1:])]
+            path_details = edges.records(eids, {
+                "hop": list(range(1, len(eids) + 1)),
+                "from": path[:-1],
+                "to": path[1:]
+            })
             
-            for i in range(len(path) - 1):
-                from_addr = path[i]
-                to_addr = path[i + 1]
-                edge_data = g[from_addr][to_addr]
-                
-                path_details.append({
-                    "hop": i + 1,
-                    "from": from_addr,
-                    "to": to_addr,
-                    "asset": edge_data["asset"],
-                    "amount": edge_data["amount"],
-                    "fee": edge_data["fee"],
-                    "tx_hash": edge_data["tx_hash"],
-                    "timestamp": edge_data["timestamp"],
-                    "notes": edge_data["notes"]
-                })
-                
-                total_amount = edge_data["amount"]  # Amount after fees
-                total_fees += edge_data["fee"]
+            # The funds move along the chain, so the last hop's amount is what
+            # arrives (net of every fee); fees accumulate
+            total_amount = path_details[-1]["amount"] if path_details else 0
+            total_fees = sum(hop["fee"] for hop in path_details)
             
             result = {
                 "source": source,
@@ -103,7 +321,7 @@ def wallet_shortest_path(source: str, target: str) -> str:
                 "path_details": path_details
             }
             
-            return json.dumps(result, indent=2)
+            return _dumps(result)
             
         except nx.NetworkXNoPath:
             return f"No path found between {source} and {target}"
@@ -112,6 +330,7 @@ def wallet_shortest_path(source: str, target: str) -> str:
         return f"Error finding shortest path: {str(e)}"
 
 @tool("wallet_outward_hops") 
+@memoize_by_file(TX_FILE)
 def wallet_outward_hops(start_wallet: str, max_depth: int = 3) -> str:
     """
     Find all outward transaction hops from a starting wallet up to max_depth.
@@ -124,56 +343,26 @@ def wallet_outward_hops(start_wallet: str, max_depth: int = 3) -> str:
         JSON string with all reachable addresses and transaction paths
     """
     try:
-        g = _build_transaction_graph()
+        index = _get_adjacency_index()
         
-        if start_wallet not in g.nodes():
+        if start_wallet not in index.id_to_idx:
             return f"Wallet {start_wallet} not found in transaction graph"
         
-        # BFS traversal to find all reachable nodes within max_depth
-        visited = {start_wallet: 0}  # wallet -> depth
-        queue = [(start_wallet, 0)]
-        edges_found = []
+        # BFS over the integer adjacency to find all reachable nodes within max_depth
+        edges_found, visited = _bfs_edges(index, start_wallet, max_depth)
         
-        while queue:
-            current_wallet, depth = queue.pop(0)
-            
-            if depth >= max_depth:
-                continue
-            
-            # Explore all outgoing edges
-            for neighbor in g.successors(current_wallet):
-                edge_data = g[current_wallet][neighbor]
-                
-                # Record this edge
-                edges_found.append({
-                    "from": current_wallet,
-                    "to": neighbor,
-                    "depth": depth + 1,
-                    "asset": edge_data["asset"],
-                    "amount": edge_data["amount"],
-                    "fee": edge_data["fee"],
-                    "tx_hash": edge_data["tx_hash"],
-                    "timestamp": edge_data["timestamp"],
-                    "notes": edge_data["notes"]
-                })
-                
-                # Add to queue if not visited or found at greater depth
-                if neighbor not in visited or visited[neighbor] > depth + 1:
-                    visited[neighbor] = depth + 1
-                    queue.append((neighbor, depth + 1))
-        
-        # Organize results by depth
+        # Organize results by depth, collecting each depth's unique wallets in
+        # the same pass (a dict as an ordered set, so first-seen order)
         by_depth = {}
+        wallets_by_depth = {}
         for edge in edges_found:
             depth = edge["depth"]
             if depth not in by_depth:
                 by_depth[depth] = []
+                wallets_by_depth[depth] = {}
             by_depth[depth].append(edge)
-        
-        # Get unique wallets at each depth
-        wallets_by_depth = {}
-        for depth in by_depth:
-            wallets_by_depth[depth] = list(set([edge["to"] for edge in by_depth[depth]]))
+            wallets_by_depth[depth][edge["to"]] = None
+        wallets_by_depth = {depth: list(wallets) for depth, wallets in wallets_by_depth.items()}
         
         result = {
             "start_wallet": start_wallet,
@@ -182,15 +371,16 @@ def wallet_outward_hops(start_wallet: str, max_depth: int = 3) -> str:
             "total_wallets_reached": len(visited) - 1,  # Exclude start wallet
             "wallets_by_depth": wallets_by_depth,
             "edges_by_depth": by_depth,
-            "all_reachable_wallets": list(visited.keys())
+            "all_reachable_wallets": visited
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error finding outward hops: {str(e)}"
 
 @tool("wallet_inward_flows")
+@memoize_by_file(TX_FILE)
 def wallet_inward_flows(target_wallet: str, max_depth: int = 3) -> str:
     """
     Find all inward transaction flows to a target wallet up to max_depth.
@@ -203,43 +393,13 @@ def wallet_inward_flows(target_wallet: str, max_depth: int = 3) -> str:
         JSON string with all source addresses and transaction paths leading to target
     """
     try:
-        g = _build_transaction_graph()
+        index = _get_adjacency_index()
         
-        if target_wallet not in g.nodes():
+        if target_wallet not in index.id_to_idx:
             return f"Wallet {target_wallet} not found in transaction graph"
         
-        # Reverse BFS to find all paths leading to target
-        visited = {target_wallet: 0}
-        queue = [(target_wallet, 0)]
-        edges_found = []
-        
-        while queue:
-            current_wallet, depth = queue.pop(0)
-            
-            if depth >= max_depth:
-                continue
-            
-            # Explore all incoming edges
-            for predecessor in g.predecessors(current_wallet):
-                edge_data = g[predecessor][current_wallet]
-                
-                # Record this edge
-                edges_found.append({
-                    "from": predecessor,
-                    "to": current_wallet,
-                    "depth": depth + 1,
-                    "asset": edge_data["asset"],
-                    "amount": edge_data["amount"],
-                    "fee": edge_data["fee"],
-                    "tx_hash": edge_data["tx_hash"],
-                    "timestamp": edge_data["timestamp"],
-                    "notes": edge_data["notes"]
-                })
-                
-                # Add to queue if not visited
-                if predecessor not in visited or visited[predecessor] > depth + 1:
-                    visited[predecessor] = depth + 1
-                    queue.append((predecessor, depth + 1))
+        # Reverse BFS (over the reverse adjacency) to find all paths leading to target
+        edges_found, visited = _bfs_edges(index, target_wallet, max_depth, reverse=True)
         
         # Organize results by depth
         by_depth = {}
@@ -255,15 +415,16 @@ def wallet_inward_flows(target_wallet: str, max_depth: int = 3) -> str:
             "total_inbound_edges": len(edges_found),
             "total_source_wallets": len(visited) - 1,
             "edges_by_depth": by_depth,
-            "all_source_wallets": [w for w in visited.keys() if w != target_wallet]
+            "all_source_wallets": visited[1:]  # BFS order starts with the target
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error finding inward flows: {str(e)}"
 
 @tool("wallet_transaction_summary")
+@memoize_by_file(TX_FILE)
 def wallet_transaction_summary(wallet_address: str) -> str:
     """
     Get transaction summary for a specific wallet address.
@@ -275,40 +436,18 @@ def wallet_transaction_summary(wallet_address: str) -> str:
         JSON string with transaction statistics and connected wallets
     """
     try:
-        g = _build_transaction_graph()
+        index = _get_adjacency_index()
         
-        if wallet_address not in g.nodes():
+        node = index.id_to_idx.get(wallet_address)
+        if node is None:
             return f"Wallet {wallet_address} not found in transaction graph"
         
-        # Get all edges involving this wallet
-        outbound_edges = []
-        inbound_edges = []
-        
-        # Outbound transactions
-        for successor in g.successors(wallet_address):
-            edge_data = g[wallet_address][successor]
-            outbound_edges.append({
-                "to": successor,
-                "asset": edge_data["asset"],
-                "amount": edge_data["amount"],
-                "fee": edge_data["fee"],
-                "tx_hash": edge_data["tx_hash"],
-                "timestamp": edge_data["timestamp"],
-                "notes": edge_data["notes"]
-            })
+        # Outbound and inbound transactions: this wallet's CSR rows
+        start, end = index.fwd_indptr[node], index.fwd_indptr[node + 1]
+        outbound_edges = index.edges.records(index.fwd_eids[start:end], {"to": index.fwd_targets[start:end]})
         
-        # Inbound transactions
-        for predecessor in g.predecessors(wallet_address):
-            edge_data = g[predecessor][wallet_address]
-            inbound_edges.append({
-                "from": predecessor,
-                "asset": edge_data["asset"],
-                "amount": edge_data["amount"],
-                "fee": edge_data["fee"],
-                "tx_hash": edge_data["tx_hash"],
-                "timestamp": edge_data["timestamp"],
-                "notes": edge_data["notes"]
-            })
+        start, end = index.rev_indptr[node], index.rev_indptr[node + 1]
+        inbound_edges = index.edges.records(index.rev_eids[start:end], {"from": index.rev_targets[start:end]})
         
         # Calculate totals by asset
         outbound_totals = {}
@@ -326,15 +465,15 @@ def wallet_transaction_summary(wallet_address: str) -> str:
             "wallet_address": wallet_address,
             "total_outbound_transactions": len(outbound_edges),
             "total_inbound_transactions": len(inbound_edges),
-            "unique_outbound_wallets": len(set([e["to"] for e in outbound_edges])),
-            "unique_inbound_wallets": len(set([e["from"] for e in inbound_edges])),
+            "unique_outbound_wallets": len({e["to"] for e in outbound_edges}),
+            "unique_inbound_wallets": len({e["from"] for e in inbound_edges}),
             "outbound_totals_by_asset": outbound_totals,
             "inbound_totals_by_asset": inbound_totals,
             "outbound_transactions": outbound_edges,
             "inbound_transactions": inbound_edges
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error getting wallet summary: {str(e)}"
@@ -345,9 +484,18 @@ def get_transaction_graph() -> nx.DiGraph:
     Get the transaction graph for internal use by other tools.
     
     Returns:
-        NetworkX DiGraph with transaction data
+        NetworkX DiGraph with transaction data as edge attributes (a new graph
+        each call, built from the cached edge table)
     """
-    return _build_transaction_graph()
+    _, edges = _get_transaction_data()
+    g = nx.DiGraph()
+    g.add_edges_from(
+        (from_addr, to_addr, attrs)
+        for from_addr, to_addr, attrs in zip(
+            edges.from_addr.tolist(), edges.to_addr.tolist(), edges.records(np.arange(len(edges)))
+        )
+    )
+    return g
 
 if __name__ == "__main__":
     # Test the tools
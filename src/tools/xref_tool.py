@@ -3,18 +3,84 @@ Cross-Reference Tool - Wallet-to-entity mapping and identity resolution
 Provides entity resolution, confidence scoring, and relationship mapping for blockchain addresses
 """
 
+import threading
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from crewai.tools import tool
+from tools.memo import file_version, memoize_by_file
 import json
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow  # enables pandas' multithreaded CSV engine
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result as indented JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, indent=2)
+
 # Get project root directory
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 XREF_FILE = PROJECT_ROOT / "entities" / "xref_wallets.csv"
 
+# Parsed cross-reference data, reloaded only when the CSV's (mtime, size) changes:
+# the DataFrame for the aggregate tools, wallet -> first mapping row (and its
+# lowercased entity) for lookups, wallet -> its highest-confidence row for
+# resolution, the lowercased entity names (a NumPy string array) for entity
+# search, and the rows sorted by descending confidence (ties in file order) with the negated
+# confidences as an ascending array, so a confidence range is two binary searches
+_XREF_CACHE: Dict[str, Any] = {
+    "key": None, "df": None, "by_wallet": None, "entity_lower_by_wallet": None, "best_by_wallet": None,
+    "entity_lower": None,
+    "by_confidence": None, "neg_confidence": None,
+}
+_XREF_LOCK = threading.Lock()
+
+def _get_xref() -> Optional[Dict[str, Any]]:
+    """Return the cached xref data (the _XREF_CACHE fields), or None if the CSV is missing."""
+    key = file_version(XREF_FILE)
+    if key is None:
+        return None
+    
+    with _XREF_LOCK:
+        if _XREF_CACHE["key"] != key:
+            df = pd.read_csv(XREF_FILE, engine="pyarrow") if PYARROW_AVAILABLE else pd.read_csv(XREF_FILE)
+            entity_lower = df["entity"].fillna("").astype(str).str.lower().to_numpy(dtype=str)
+            by_wallet, entity_lower_by_wallet = {}, {}
+            for row, lowered in zip(df.to_dict("records"), entity_lower.tolist()):
+                if row["wallet"] not in by_wallet:
+                    by_wallet[row["wallet"]] = row
+                    entity_lower_by_wallet[row["wallet"]] = lowered
+            neg_confidence = -df["confidence"].to_numpy(dtype=float)
+            order = np.argsort(neg_confidence, kind="stable")
+            by_confidence = df.iloc[order].reset_index(drop=True)
+            # First row per wallet in confidence order: the earliest of its top-confidence rows
+            best_by_wallet = {}
+            for row in by_confidence.to_dict("records"):
+                best_by_wallet.setdefault(row["wallet"], row)
+            _XREF_CACHE.update(
+                key=key, df=df, by_wallet=by_wallet, entity_lower_by_wallet=entity_lower_by_wallet,
+                best_by_wallet=best_by_wallet, entity_lower=entity_lower,
+                by_confidence=by_confidence, neg_confidence=neg_confidence[order],
+            )
+        return dict(_XREF_CACHE)
+
 @tool("resolve_wallet")
+@memoize_by_file(XREF_FILE)
 def resolve_wallet(wallet_address: str) -> str:
     """
     Resolve a wallet address to its associated entity information.
@@ -26,21 +92,16 @@ def resolve_wallet(wallet_address: str) -> str:
         JSON string with entity information including confidence score and source
     """
     try:
-        if not XREF_FILE.exists():
+        xref = _get_xref()
+        if xref is None:
             return "Cross-reference file not found"
         
-        df = pd.read_csv(XREF_FILE)
-        match = df[df["wallet"] == wallet_address]
+        # Best match (highest confidence if multiple)
+        match = xref["best_by_wallet"].get(wallet_address)
         
-        if match.empty:
+        if match is None:
             return f"No entity mapping found for wallet {wallet_address}"
         
-        # Get the best match (highest confidence if multiple)
-        if len(match) > 1:
-            match = match.loc[match["confidence"].idxmax()]
-        else:
-            match = match.iloc[0]
-        
         result = {
             "wallet_address": wallet_address,
             "entity": match["entity"],
@@ -50,12 +111,13 @@ def resolve_wallet(wallet_address: str) -> str:
             "resolution_quality": _get_confidence_level(match["confidence"])
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error resolving wallet: {str(e)}"
 
 @tool("find_entity_wallets")
+@memoize_by_file(XREF_FILE)
 def find_entity_wallets(entity_name: str) -> str:
     """
     Find all wallet addresses associated with an entity.
@@ -67,29 +129,32 @@ def find_entity_wallets(entity_name: str) -> str:
         JSON string with all associated wallet addresses
     """
     try:
-        if not XREF_FILE.exists():
+        xref = _get_xref()
+        if xref is None:
             return "Cross-reference file not found"
         
-        df = pd.read_csv(XREF_FILE)
+        df = xref["df"]
         
-        # Search for entity name (case-insensitive partial match)
-        matches = df[df["entity"].str.contains(entity_name, case=False, na=False)]
+        # Search for entity name (case-insensitive partial match) over the
+        # pre-lowercased names, as a literal substring
+        matches = df[np.char.find(xref["entity_lower"], entity_name.lower()) >= 0]
         
         if matches.empty:
             return f"No wallets found for entity '{entity_name}'"
         
         # Group by entity for exact matches
         entity_wallets = {}
-        for _, row in matches.iterrows():
-            entity = row["entity"]
+        for entity, wallet, wallet_type, confidence, source in matches[
+            ["entity", "wallet", "type", "confidence", "source"]
+        ].itertuples(index=False, name=None):
             if entity not in entity_wallets:
                 entity_wallets[entity] = []
             
             entity_wallets[entity].append({
-                "wallet": row["wallet"],
-                "type": row["type"],
-                "confidence": float(row["confidence"]),
-                "source": row["source"]
+                "wallet": wallet,
+                "type": wallet_type,
+                "confidence": float(confidence),
+                "source": source
             })
         
         result = {
@@ -99,12 +164,13 @@ def find_entity_wallets(entity_name: str) -> str:
             "entity_wallet_mapping": entity_wallets
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error finding entity wallets: {str(e)}"
 
 @tool("get_wallet_type_summary")
+@memoize_by_file(XREF_FILE)
 def get_wallet_type_summary() -> str:
     """
     Get summary of wallet types and their distribution in the cross-reference data.
@@ -113,10 +179,11 @@ def get_wallet_type_summary() -> str:
         JSON string with wallet type statistics and examples
     """
     try:
-        if not XREF_FILE.exists():
+        xref = _get_xref()
+        if xref is None:
             return "Cross-reference file not found"
         
-        df = pd.read_csv(XREF_FILE)
+        df = xref["df"]
         
         # Type distribution
         type_counts = df["type"].value_counts().to_dict()
@@ -138,12 +205,13 @@ def get_wallet_type_summary() -> str:
             "examples_by_type": type_examples
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error getting wallet type summary: {str(e)}"
 
 @tool("validate_wallet_mapping")
+@memoize_by_file(XREF_FILE)
 def validate_wallet_mapping(wallet_address: str, expected_entity: str) -> str:
     """
     Validate if a wallet address is correctly mapped to an expected entity.
@@ -156,13 +224,13 @@ def validate_wallet_mapping(wallet_address: str, expected_entity: str) -> str:
         JSON string with validation results and confidence assessment
     """
     try:
-        if not XREF_FILE.exists():
+        xref = _get_xref()
+        if xref is None:
             return "Cross-reference file not found"
         
-        df = pd.read_csv(XREF_FILE)
-        match = df[df["wallet"] == wallet_address]
+        row = xref["by_wallet"].get(wallet_address)
         
-        if match.empty:
+        if row is None:
             result = {
                 "wallet_address": wallet_address,
                 "expected_entity": expected_entity,
@@ -170,17 +238,21 @@ def validate_wallet_mapping(wallet_address: str, expected_entity: str) -> str:
                 "confidence": 0.0,
                 "message": f"No mapping found for wallet {wallet_address}"
             }
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         
         # Check if expected entity matches
-        actual_entity = match.iloc[0]["entity"]
-        confidence = float(match.iloc[0]["confidence"])
-        source = match.iloc[0]["source"]
+        actual_entity = row["entity"]
+        confidence = float(row["confidence"])
+        source = row["source"]
         
-        if actual_entity.lower() == expected_entity.lower():
+        # The mapped entity was lowercased once at load time
+        actual_lower = xref["entity_lower_by_wallet"][wallet_address]
+        expected_lower = expected_entity.lower()
+        
+        if actual_lower == expected_lower:
             status = "EXACT_MATCH"
             message = f"Wallet correctly mapped to {actual_entity}"
-        elif expected_entity.lower() in actual_entity.lower() or actual_entity.lower() in expected_entity.lower():
+        elif actual_lower and (expected_lower in actual_lower or actual_lower in expected_lower):
             status = "PARTIAL_MATCH"
             message = f"Partial match: expected '{expected_entity}', found '{actual_entity}'"
         else:
@@ -198,61 +270,64 @@ def validate_wallet_mapping(wallet_address: str, expected_entity: str) -> str:
             "quality_assessment": _get_confidence_level(confidence)
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error validating wallet mapping: {str(e)}"
 
 @tool("search_by_confidence")
-def search_by_confidence(min_confidence: float = 0.0, max_confidence: float = 1.0) -> str:
+@memoize_by_file(XREF_FILE)
+def search_by_confidence(min_confidence: float = 0.0, max_confidence: float = 1.0, limit: int = 100) -> str:
     """
     Find wallet mappings within a specific confidence range.
     
     Args:
         min_confidence: Minimum confidence score (0.0 to 1.0)
         max_confidence: Maximum confidence score (0.0 to 1.0)
+        limit: Maximum number of mappings to list (default 100); counts cover all matches
     
     Returns:
         JSON string with wallet mappings in the specified confidence range
     """
     try:
-        if not XREF_FILE.exists():
+        xref = _get_xref()
+        if xref is None:
             return "Cross-reference file not found"
         
-        df = pd.read_csv(XREF_FILE)
-        
-        # Filter by confidence range
-        filtered = df[(df["confidence"] >= min_confidence) & (df["confidence"] <= max_confidence)]
+        # Rows are presorted by descending confidence, so the range and each
+        # confidence category are contiguous slices found by binary search
+        neg = xref["neg_confidence"]
+        lo = int(np.searchsorted(neg, -max_confidence, side="left"))
+        hi, high_end, medium_end = np.searchsorted(neg, [-min_confidence, -0.8, -0.5], side="right").tolist()
         
-        if filtered.empty:
+        if hi <= lo:
             return f"No wallet mappings found with confidence between {min_confidence} and {max_confidence}"
         
-        # Sort by confidence (descending)
-        filtered = filtered.sort_values("confidence", ascending=False)
-        
-        # Group by confidence level categories
-        confidence_categories = {
-            "high_confidence": filtered[filtered["confidence"] >= 0.8],
-            "medium_confidence": filtered[(filtered["confidence"] >= 0.5) & (filtered["confidence"] < 0.8)],
-            "low_confidence": filtered[filtered["confidence"] < 0.5]
+        high_end = min(max(high_end, lo), hi)
+        medium_end = min(max(medium_end, high_end), hi)
+        category_counts = {
+            "high_confidence": high_end - lo,
+            "medium_confidence": medium_end - high_end,
+            "low_confidence": hi - medium_end
         }
         
-        category_counts = {k: len(v) for k, v in confidence_categories.items()}
+        filtered = xref["by_confidence"].iloc[lo:hi]
         
         result = {
             "confidence_range": {"min": min_confidence, "max": max_confidence},
-            "total_mappings": len(filtered),
+            "total_mappings": hi - lo,
             "confidence_distribution": category_counts,
             "average_confidence": round(filtered["confidence"].mean(), 3),
-            "mappings": filtered.to_dict('records')
+            "mappings": filtered.head(max(int(limit), 0)).to_dict('records')
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error searching by confidence: {str(e)}"
 
 @tool("get_source_analysis")
+@memoize_by_file(XREF_FILE)
 def get_source_analysis() -> str:
     """
     Analyze the sources of wallet-entity mappings and their reliability.
@@ -261,10 +336,11 @@ def get_source_analysis() -> str:
         JSON string with source analysis and reliability metrics
     """
     try:
-        if not XREF_FILE.exists():
+        xref = _get_xref()
+        if xref is None:
             return "Cross-reference file not found"
         
-        df = pd.read_csv(XREF_FILE)
+        df = xref["df"]
         
         # Source distribution
         source_counts = df["source"].value_counts().to_dict()
@@ -275,11 +351,11 @@ def get_source_analysis() -> str:
         # Source reliability ranking
         source_reliability = source_confidence.sort_values("mean", ascending=False)
         
-        # Examples for each source type
+        # Examples for each source type: first two rows per source, in one groupby pass
         source_examples = {}
-        for source in df["source"].unique():
-            source_data = df[df["source"] == source].head(2)
-            source_examples[source] = source_data[["wallet", "entity", "type", "confidence"]].to_dict('records')
+        examples = df.groupby("source", sort=False).head(2)[["source", "wallet", "entity", "type", "confidence"]]
+        for row in examples.to_dict('records'):
+            source_examples.setdefault(row.pop("source"), []).append(row)
         
         result = {
             "total_sources": len(source_counts),
@@ -290,7 +366,7 @@ def get_source_analysis() -> str:
             "recommendations": _generate_source_recommendations(source_confidence)
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
         
     except Exception as e:
         return f"Error analyzing sources: {str(e)}"
@@ -339,16 +415,14 @@ def get_entity_mapping(wallet_address: str) -> Optional[Dict[str, Any]]:
         Dictionary with entity information or None if not found
     """
     try:
-        if not XREF_FILE.exists():
+        xref = _get_xref()
+        if xref is None:
             return None
         
-        df = pd.read_csv(XREF_FILE)
-        match = df[df["wallet"] == wallet_address]
-        
-        if match.empty:
-            return None
+        row = xref["by_wallet"].get(wallet_address)
         
-        return match.iloc[0].to_dict()
+        # A copy, so callers can't modify the cached row
+        return dict(row) if row is not None else None
     except Exception as e:
         print(f"Error in get_entity_mapping: {e}")
         return None
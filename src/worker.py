@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tool Worker - Long-lived tool execution process for the interactive demo
+Imports the compliance tools once and serves newline-delimited JSON requests
+over stdin/stdout, so each command no longer pays for a fresh interpreter.
+
+Also runs a single tool from argv: worker.py <tool> [args...]
+Each argument is decoded as JSON when it parses (5 -> int) and kept as a
+plain string otherwise (C123, 0xabc).
+"""
+
+import sys
+import json
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Approximate market prices used to value crypto balances in USD
+DEFAULT_PRICES = {"BTC": 45000.0, "ETH": 2800.0, "USD": 1.0}
+CRYPTO_NAMES = {"BTC": "Bitcoin (BTC)", "ETH": "Ethereum (ETH)"}
+
+def portfolio_summary(prices: Dict[str, float] = None) -> str:
+    """Pre-aggregated portfolio totals for the demo's /portfolio tables."""
+    import pandas as pd
+    from tools.ledger_query import ledger_asset_summary
+    from tools.claims_repo import claims_reconciliation_summary
+
+    prices = prices or DEFAULT_PRICES
+    assets = pd.DataFrame(json.loads(ledger_asset_summary.run()))
+    claims_stats = json.loads(claims_reconciliation_summary.run()).get("overall_stats", {})
+
+    # Value every asset in one vectorised pass instead of branching per row
+    assets["value"] = assets["total_balance"] * assets["asset"].map(prices).fillna(0.0)
+    crypto = assets[assets["asset"].isin(list(CRYPTO_NAMES))]
+    fiat = assets[assets["asset"] == "USD"]
+    largest = assets.loc[assets["total_balance"].idxmax()]
+
+    result = {
+        "crypto_total": float(crypto["value"].sum()),
+        "crypto_holdings": int(crypto["customer_count"].sum()),
+        "usd_total": float(fiat["total_balance"].sum()),
+        "usd_holdings": len(fiat),
+        "total_customers": int(assets["customer_count"].sum()),
+        "crypto_details": [
+            {"name": CRYPTO_NAMES[row.asset], "quantity": float(row.total_balance), "value": float(row.value)}
+            for row in crypto.itertuples()
+        ],
+        "largest_asset": {"asset": largest["asset"], "balance": float(largest["total_balance"])},
+        "total_claims": claims_stats.get("total_claims", 0),
+        "unreconciled_claims": claims_stats.get("status_breakdown", {}).get("unreconciled", 0)
+    }
+    return json.dumps(result, indent=2)
+
+def load_tools() -> Dict[str, Any]:
+    """Import the compliance tools and return them keyed by tool name."""
+    from tools.ledger_query import (
+        ledger_balance, ledger_movements, ledger_asset_summary, ledger_withdrawal_history
+    )
+    from tools.claims_repo import (
+        list_open_claims, get_claim_details, claims_by_customer, claims_reconciliation_summary
+    )
+    from tools.wallet_graph import wallet_transaction_summary, wallet_outward_hops, wallet_inward_flows
+    from tools.xref_tool import resolve_wallet
+    from tools.rag_search import rag_search, list_knowledge_sources, search_citations
+
+    return {
+        "ledger_balance": ledger_balance,
+        "ledger_movements": ledger_movements,
+        "ledger_asset_summary": ledger_asset_summary,
+        "ledger_withdrawal_history": ledger_withdrawal_history,
+        "list_open_claims": list_open_claims,
+        "get_claim_details": get_claim_details,
+        "claims_by_customer": claims_by_customer,
+        "claims_reconciliation_summary": claims_reconciliation_summary,
+        "wallet_transaction_summary": wallet_transaction_summary,
+        "wallet_outward_hops": wallet_outward_hops,
+        "wallet_inward_flows": wallet_inward_flows,
+        "resolve_wallet": resolve_wallet,
+        "rag_search": rag_search,
+        "list_knowledge_sources": list_knowledge_sources,
+        "search_citations": search_citations,
+        "portfolio_summary": portfolio_summary,
+    }
+
+def handle_request(tools: Dict[str, Any], request: dict) -> dict:
+    """Run a single tool request (or a batch of them) and return the response payload."""
+    if "batch" in request:
+        # Independent calls in one round trip, run side by side
+        batch = request["batch"]
+        if not batch:
+            return {"ok": True, "results": []}
+        with ThreadPoolExecutor(max_workers=len(batch)) as pool:
+            results = list(pool.map(lambda item: handle_request(tools, item), batch))
+        return {"ok": True, "results": results}
+
+    name = request.get("tool")
+    args = request.get("args", [])
+
+    if name == "ping":
+        return {"ok": True, "result": "pong"}
+
+    tool = tools.get(name)
+    if tool is None:
+        return {"ok": False, "error": f"Unknown tool: {name}"}
+
+    try:
+        # CrewAI tools expose .run(); worker helpers are plain functions
+        run = getattr(tool, "run", tool)
+        return {"ok": True, "result": run(*args)}
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+def serve(tools: Dict[str, Any], stdin, stdout):
+    """Read one JSON request per line and write one JSON response per line."""
+    stdout.write(json.dumps({"ok": True, "result": "ready"}) + "\n")
+    stdout.flush()
+
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            response = handle_request(tools, json.loads(line))
+        except Exception as e:
+            traceback.print_exc()
+            response = {"ok": False, "error": f"Invalid request: {e}"}
+
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+def _parse_arg(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+if __name__ == "__main__":
+    # Tools print warnings to stdout (some at import time); keep the protocol
+    # stream clean by sending anything they print to stderr instead.
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    if len(sys.argv) > 1:
+        request = {"tool": sys.argv[1], "args": [_parse_arg(arg) for arg in sys.argv[2:]]}
+        protocol_out.write(json.dumps(handle_request(load_tools(), request)) + "\n")
+        protocol_out.flush()
+    else:
+        serve(load_tools(), sys.stdin, protocol_out)